@@ -0,0 +1,218 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import functools
+import signal
+
+from django.conf import settings
+from django.db import connection
+from pika.adapters.asyncio_connection import AsyncioConnection
+
+
+class AsyncConsumer:
+    # Consumes the classify and the train queues on a single connection from an asyncio event loop.
+    # Classifying and training run in an executor each, so the event loop keeps answering the
+    # heartbeats of the broker, while the prefetch count bounds the messages waiting for them.
+
+    def __init__(self, command, loop=None):
+        self.command = command
+        self.logger = command.logger
+        self.loop = loop or asyncio.new_event_loop()
+        self.connection = None
+        self.channel_classify = None
+        self.channel_train = None
+        self.consumer_tags = dict()
+        self.stopping = False
+
+        self.executor_classify = ThreadPoolExecutor(max_workers=1, thread_name_prefix='classify')
+        self.batch = list()
+        self.batch_timeout = None
+        self.batches_classifying = set()
+
+        self.executor_train = ThreadPoolExecutor(max_workers=1, thread_name_prefix='train')
+        self.training = None
+        # the train messages received since the last training started
+        self.train_bodies = list()
+        self.train_delivery_tag = None
+
+    def run(self):
+        for signal_number in (signal.SIGINT, signal.SIGTERM):
+            self.loop.add_signal_handler(signal_number, self.stop)
+
+        self.connection = AsyncioConnection(
+            self.command.get_connection_parameters(),
+            on_open_callback=self.on_connection_open,
+            on_open_error_callback=self.on_connection_open_error,
+            on_close_callback=self.on_connection_closed,
+            custom_ioloop=self.loop
+        )
+
+        try:
+            self.loop.run_forever()
+        finally:
+            self.executor_classify.shutdown()
+            self.executor_train.shutdown()
+            self.loop.close()
+
+    def stop(self):
+        if self.stopping:
+            return
+
+        # no new messages are delivered, the ones received are classified and acknowledged first
+        self.stopping = True
+        self.logger.info('Stopping the classifier consumers...')
+        for channel, consumer_tag in self.consumer_tags.values():
+            if channel.is_open:
+                channel.basic_cancel(consumer_tag=consumer_tag)
+        self.flush_batch()
+        self.close_when_idle()
+
+    def close_when_idle(self):
+        if not self.stopping or self.batches_classifying or self.training is not None:
+            return
+
+        if self.connection is not None and self.connection.is_open:
+            self.connection.close()
+        else:
+            self.loop.stop()
+
+    def on_connection_open(self, connection_open):
+        connection_open.channel(on_open_callback=self.on_channel_classify_open)
+        connection_open.channel(on_open_callback=self.on_channel_train_open)
+
+    def on_connection_open_error(self, connection_open, error):
+        self.logger.error('Classifier could not connect to the broker due to "%s"', str(error))
+        self.loop.stop()
+
+    def on_connection_closed(self, connection_closed, reply_code, reply_text):
+        if not self.stopping:
+            self.logger.error('Classifier lost the connection to the broker due to "%s"', reply_text)
+        self.loop.stop()
+
+    def on_channel_classify_open(self, channel):
+        self.channel_classify = channel
+        # one batch is classified while the next one is received
+        self.consume(channel, settings.QUEUE_NAME_CLASSIFY, self.on_classify_message, 2 * settings.CLASSIFY_BATCH_SIZE)
+
+    def on_channel_train_open(self, channel):
+        self.channel_train = channel
+        # the train messages are all received, to be merged in a single training
+        self.consume(channel, settings.QUEUE_NAME_TRAIN, self.on_train_message, 0)
+
+    def consume(self, channel, queue, callback, prefetch_count):
+        def on_qos_ok(frame):
+            if not self.stopping:
+                self.consumer_tags[queue] = (channel, channel.basic_consume(callback, queue=queue))
+
+        def on_queue_declare_ok(frame):
+            channel.basic_qos(on_qos_ok, prefetch_count=prefetch_count)
+
+        channel.queue_declare(on_queue_declare_ok, queue=queue, durable=True)
+
+    def on_classify_message(self, channel, method, properties, body):
+        if self.command.classifier is None:
+            self.logger.warning('Classifier was not ready when started to classify.')
+            # wait for classifier's training before the message is delivered again
+            self.loop.call_later(10, self.command.reject_queue_item, channel, method)
+            return
+
+        queue_item = self.command.decode_queue_item(channel, method, properties, body)
+        if queue_item is None:
+            return
+
+        self.batch.append((method.delivery_tag,) + queue_item)
+        if len(self.batch) >= settings.CLASSIFY_BATCH_SIZE:
+            self.flush_batch()
+        elif len(self.batch) == 1:
+            # flush an incomplete batch when no more messages arrive in time
+            self.batch_timeout = self.loop.call_later(settings.CLASSIFY_BATCH_MAX_WAIT, self.flush_batch)
+
+    def flush_batch(self):
+        if self.batch_timeout is not None:
+            self.batch_timeout.cancel()
+            self.batch_timeout = None
+
+        if not self.batch:
+            return
+
+        batch = self.batch
+        self.batch = list()
+
+        future = self.loop.run_in_executor(self.executor_classify, self.classify_batch, batch)
+        self.batches_classifying.add(future)
+        future.add_done_callback(functools.partial(self.on_batch_classified, batch))
+
+    def classify_batch(self, batch):
+        try:
+            return self.command.classify_batch(batch)
+        finally:
+            # the executor thread does not keep an idle database connection
+            connection.close()
+
+    def on_batch_classified(self, batch, future):
+        self.batches_classifying.discard(future)
+        delivery_tag = batch[-1][0]
+
+        items = None
+        if future.exception() is not None:
+            self.logger.error('Classifier failed to classify due to "%s"', str(future.exception()))
+        else:
+            items = future.result()
+
+        # the batches are classified in order, so acknowledging up to the last one is safe
+        if items is None:
+            self.command.reject_queue_items(self.channel_classify, delivery_tag)
+        elif self.command.acknowledge_queue_items(self.channel_classify, delivery_tag):
+            self.command.log_classified(items)
+
+        self.close_when_idle()
+
+    def on_train_message(self, channel, method, properties, body):
+        self.train_bodies.append(body)
+        self.train_delivery_tag = method.delivery_tag
+        self.start_training()
+
+    def start_training(self):
+        if self.training is not None or not self.train_bodies or self.stopping:
+            return
+
+        news_item_ids = self.command.get_train_news_item_ids(self.train_bodies)
+        delivery_tag = self.train_delivery_tag
+        self.train_bodies = list()
+
+        self.training = self.loop.run_in_executor(self.executor_train, self.train, news_item_ids)
+        self.training.add_done_callback(functools.partial(self.on_trained, delivery_tag))
+
+    def train(self, news_item_ids):
+        try:
+            return self.command.train(news_item_ids)
+        finally:
+            connection.close()
+
+    def on_trained(self, delivery_tag, future):
+        trained = False
+        if future.exception() is not None:
+            self.logger.error('Classifier failed to train due to "%s"', str(future.exception()))
+        else:
+            trained = future.result()
+
+        if not trained:
+            # wait for the database before the messages are delivered again, no training starts meanwhile
+            # so the messages received later are not acknowledged along with them
+            self.training = self.loop.call_later(10, self.on_train_failed, delivery_tag)
+            return
+
+        self.training = None
+        # the messages are acknowledged once trained, so they are delivered again after a crash
+        if self.channel_train is not None and self.channel_train.is_open:
+            self.channel_train.basic_ack(delivery_tag=delivery_tag, multiple=True)
+
+        self.start_training()
+        self.close_when_idle()
+
+    def on_train_failed(self, delivery_tag):
+        self.training = None
+        if self.channel_train is not None and self.channel_train.is_open:
+            self.command.reject_queue_items(self.channel_train, delivery_tag)
+
+        self.start_training()
+        self.close_when_idle()
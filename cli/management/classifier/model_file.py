@@ -0,0 +1,153 @@
+from contextlib import contextmanager
+import hashlib
+import json
+import mmap
+import os
+import struct
+import tempfile
+
+import numpy
+
+from cli.management.classifier.naive_bayes import NaiveBayes
+from cli.management.classifier.training_set import TrainingSet
+
+
+# The naive bayes classifier on disk: a fixed size prefix, a JSON header describing the blocks that
+# follow and then the blocks themselves. The arrays are aligned and stored in native byte order,
+# so they are mapped to memory as they are, shared by every process loading the same file.
+
+MAGIC = b'OJAHNB'
+FORMAT_VERSION = 1
+PREFIX = struct.Struct('<6sHQ')
+ALIGNMENT = 64
+ARRAYS = ('label_counts', 'word_counts', 'base', 'delta')
+
+
+def is_model_file(filepath):
+    try:
+        with open(filepath, 'rb') as file:
+            return file.read(len(MAGIC)) == MAGIC
+    except OSError:
+        return False
+
+
+def get_training_set_hash(labeled_titles):
+    # the digests of the labeled titles are summed, so the hash does not depend on their order
+    # without sorting a copy of the training set
+    digest = 0
+    for labeled_title in labeled_titles:
+        digest += int.from_bytes(hashlib.sha256(json.dumps(labeled_title).encode()).digest(), 'big')
+    return '{:064x}'.format(digest % (1 << 256))
+
+
+def dump(classifier, filepath):
+    blocks = list()
+    for name in ARRAYS:
+        array = numpy.ascontiguousarray(getattr(classifier, name))
+        blocks.append((name, array.tobytes(), {'dtype': array.dtype.str, 'shape': array.shape}))
+    blocks.append(('vocabulary', '\n'.join(classifier.vocabulary).encode(), dict()))
+
+    training_set = classifier.training_set
+    if training_set is not None:
+        news_items = [
+            [news_item_id, sorted(labeled_titles)]
+            for news_item_id, labeled_titles in training_set.news_items.items()
+        ]
+        blocks.append(('training_set', json.dumps(news_items).encode(), dict()))
+
+    header = {
+        'labels': classifier.labels,
+        'training_set_hash': get_training_set_hash(training_set.labeled_titles) \
+            if training_set is not None else None,
+        'blocks': dict()
+    }
+
+    # the offsets depend on the header length, which depends on the offsets
+    header_length = 0
+    while True:
+        size = get_aligned(PREFIX.size + header_length)
+        for name, data, description in blocks:
+            header['blocks'][name] = dict(description, offset=size, size=len(data))
+            size = get_aligned(size + len(data))
+        header_data = json.dumps(header).encode()
+        if len(header_data) <= header_length:
+            break
+        header_length = len(header_data) + 64
+
+    with atomic_file(filepath) as file:
+        file.write(PREFIX.pack(MAGIC, FORMAT_VERSION, header_length))
+        file.write(header_data.ljust(header_length))
+        for name, data, _ in blocks:
+            file.seek(header['blocks'][name]['offset'])
+            file.write(data)
+        file.truncate(size)
+
+
+@contextmanager
+def atomic_file(filepath):
+    # written next to the previous file and renamed over it, so a crash never leaves it truncated
+    directory = os.path.dirname(os.path.abspath(filepath))
+    file = tempfile.NamedTemporaryFile(dir=directory, prefix='.', delete=False)
+    try:
+        with file:
+            yield file
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(file.name, filepath)
+    except BaseException:
+        os.unlink(file.name)
+        raise
+
+
+def load(filepath, with_training_set=True):
+    with open(filepath, 'rb') as file:
+        buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    try:
+        magic, format_version, header_length = PREFIX.unpack_from(buffer)
+    except struct.error as ex_struct:
+        raise ValueError(str(ex_struct))
+    if magic != MAGIC or format_version != FORMAT_VERSION:
+        raise ValueError('Unsupported classifier file format.')
+
+    # a file cut or written by another version can have a valid header missing what is read from it
+    try:
+        header = json.loads(buffer[PREFIX.size:PREFIX.size + header_length].decode())
+        blocks = header['blocks']
+        if any(block['offset'] + block['size'] > len(buffer) for block in blocks.values()):
+            raise ValueError('Classifier file is truncated.')
+
+        arrays = dict()
+        for name in ARRAYS:
+            block = blocks[name]
+            dtype = numpy.dtype(block['dtype'])
+            arrays[name] = numpy.frombuffer(
+                buffer, dtype=dtype, count=block['size'] // dtype.itemsize, offset=block['offset']
+            ).reshape(block['shape'])
+
+        words = get_block(buffer, blocks['vocabulary']).decode()
+        vocabulary = {word: column for column, word in enumerate(words.split('\n') if words else [])}
+
+        classifier = NaiveBayes(
+            header['labels'], vocabulary, arrays['label_counts'], arrays['word_counts'],
+            base=arrays['base'], delta=arrays['delta']
+        )
+
+        if with_training_set and 'training_set' in blocks:
+            classifier.training_set = TrainingSet()
+            for news_item_id, labeled_titles in json.loads(get_block(buffer, blocks['training_set']).decode()):
+                classifier.training_set.set_news_item(
+                    news_item_id, [tuple(labeled_title) for labeled_title in labeled_titles]
+                )
+    except (KeyError, IndexError, TypeError, AttributeError) as ex_header:
+        raise ValueError('Classifier file is not valid: {}'.format(repr(ex_header)))
+
+    return classifier
+
+
+def get_block(buffer, block):
+    return buffer[block['offset']:block['offset'] + block['size']]
+
+
+def get_aligned(offset):
+    return -(-offset // ALIGNMENT) * ALIGNMENT
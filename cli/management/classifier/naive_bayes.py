@@ -0,0 +1,131 @@
+from array import array
+from itertools import chain
+
+import numpy
+
+from cli.management.classifier.text_normalizer import get_text_normalizer
+
+# the word counts of a training are accumulated in chunks of this many words, to bound their memory
+UPDATE_CHUNK_SIZE = 1000000
+
+
+class NaiveBayes:
+    # Same model as the TextBlob / NLTK naive bayes classifier with "contains(word)" features:
+    # every word of the vocabulary is a boolean feature, probabilities are estimated with the
+    # expected likelihood estimation. The absent words are folded into a per label constant,
+    # so classifying a title only costs as much as the words it contains.
+
+    def __init__(self, labels, vocabulary, label_counts, word_counts, tokenizer=None, base=None, delta=None):
+        self.labels = list(labels)
+        self.vocabulary = vocabulary
+        self.label_counts = numpy.asarray(label_counts, dtype=numpy.int64)
+        self.word_counts = numpy.asarray(word_counts, dtype=numpy.int64).reshape(
+            len(self.labels), len(self.vocabulary)
+        )
+        # the titles are normalized the same way for training and classification
+        self.tokenizer = tokenizer or get_text_normalizer().tokenize
+        # the training set the classifier was trained with, to update it incrementally
+        self.training_set = None
+        self.base = base
+        self.delta = delta
+        if base is None or delta is None:
+            self.compute()
+
+    @classmethod
+    def train(cls, labeled_titles, tokenizer=None):
+        classifier = cls(list(), dict(), list(), numpy.zeros((0, 0)), tokenizer)
+        return classifier.update(labeled_titles, list())
+
+    def update(self, labeled_titles_added, labeled_titles_removed):
+        # returns a new classifier, so the current one can keep classifying meanwhile
+        labels = {label: row for row, label in enumerate(self.labels)}
+        vocabulary = dict(self.vocabulary)
+        label_counts = list(self.label_counts)
+        word_counts = numpy.array(self.word_counts, dtype=numpy.int64)
+        # compact arrays of machine integers, an entry per word of every title, added in chunks
+        rows = array('q')
+        columns = array('q')
+        values = array('q')
+
+        for value, labeled_titles in ((1, labeled_titles_added), (-1, labeled_titles_removed)):
+            for title, label in labeled_titles:
+                row = labels.setdefault(label, len(labels))
+                if row == len(label_counts):
+                    label_counts.append(0)
+                label_counts[row] += value
+
+                for word in set(self.tokenizer(title)):
+                    rows.append(row)
+                    columns.append(vocabulary.setdefault(word, len(vocabulary)))
+                    values.append(value)
+
+                if len(rows) >= UPDATE_CHUNK_SIZE:
+                    word_counts = self.add_word_counts(word_counts, labels, vocabulary, rows, columns, values)
+                    rows, columns, values = array('q'), array('q'), array('q')
+
+        word_counts = self.add_word_counts(word_counts, labels, vocabulary, rows, columns, values)
+
+        # labels and words left without titles are dropped, as a full training would not know them
+        label_counts = numpy.asarray(label_counts, dtype=numpy.int64)
+        rows_kept = label_counts > 0
+        word_counts = word_counts[rows_kept]
+        columns_kept = word_counts.sum(axis=0) > 0
+        words = [word for word, kept in zip(vocabulary, columns_kept) if kept]
+
+        return self.__class__(
+            [label for label, kept in zip(labels, rows_kept) if kept],
+            {word: column for column, word in enumerate(words)},
+            label_counts[rows_kept],
+            word_counts[:, columns_kept],
+            self.tokenizer
+        )
+
+    @staticmethod
+    def add_word_counts(word_counts, labels, vocabulary, rows, columns, values):
+        # the labels and the words found since the last chunk get their rows and columns
+        word_counts = numpy.pad(word_counts, (
+            (0, len(labels) - word_counts.shape[0]),
+            (0, len(vocabulary) - word_counts.shape[1])
+        ))
+        numpy.add.at(word_counts, (rows, columns), values)
+        return word_counts
+
+    def compute(self):
+        label_counts = self.label_counts.astype(numpy.float64)[:, None]
+        titles_count = label_counts.sum()
+
+        prior = numpy.log(
+            (label_counts[:, 0] + 0.5) / (titles_count + 0.5 * len(self.labels))
+        )
+        # a word seen in every title never gets the "absent" value, so it has a single bin
+        bins = 1 + (self.word_counts.sum(axis=0) < titles_count)
+        denominator = label_counts + 0.5 * bins
+        log_present = numpy.log((self.word_counts + 0.5) / denominator)
+        log_absent = numpy.log((label_counts - self.word_counts + 0.5) / denominator)
+
+        self.base = prior + log_absent.sum(axis=1)
+        # one row per word, so that the words of a title are gathered from contiguous memory
+        self.delta = numpy.ascontiguousarray((log_present - log_absent).T)
+
+    def get_indices(self, title):
+        vocabulary = self.vocabulary
+        return [vocabulary[word] for word in set(self.tokenizer(title)) if word in vocabulary]
+
+    def classify(self, title):
+        if not self.labels:
+            return None
+
+        scores = self.base + self.delta[self.get_indices(title)].sum(axis=0)
+        return self.labels[int(scores.argmax())]
+
+    def classify_many(self, titles):
+        if not self.labels:
+            return [None] * len(titles)
+
+        indices = [self.get_indices(title) for title in titles]
+        lengths = numpy.fromiter((len(index) for index in indices), dtype=numpy.int64, count=len(indices))
+        columns = numpy.fromiter(chain.from_iterable(indices), dtype=numpy.int64, count=int(lengths.sum()))
+
+        scores = numpy.tile(self.base, (len(titles), 1))
+        numpy.add.at(scores, numpy.repeat(numpy.arange(len(titles)), lengths), self.delta[columns])
+        return [self.labels[index] for index in scores.argmax(axis=1)]
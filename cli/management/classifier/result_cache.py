@@ -0,0 +1,38 @@
+from collections import OrderedDict
+import threading
+
+
+class ResultCache:
+    # The least recently used classifications, by normalized title and classifier version.
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self.results = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self.lock:
+            result = self.results.get(key)
+            if result is None:
+                self.misses += 1
+                return None
+
+            self.results.move_to_end(key)
+            self.hits += 1
+            return result
+
+    def set(self, key, result):
+        if not self.maxsize:
+            return
+
+        with self.lock:
+            self.results[key] = result
+            self.results.move_to_end(key)
+            if len(self.results) > self.maxsize:
+                self.results.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.results.clear()
@@ -0,0 +1,55 @@
+from functools import lru_cache
+import re
+
+from django.conf import settings
+from nltk.corpus import stopwords
+
+
+TOKEN_PATTERN = re.compile(r"[^\W_]+(?:'[^\W_]+)*")
+
+# the negations change the sentiment of a title, so they are kept
+STOPWORDS_WHITELISTED = [
+    'above', 'out', 'off', 'again', 'against', 'why', 'few', 'more', 'most', 'no', 'nor',
+    'not', 'only', 'don', 'don\'t', 'should', 'should\'ve', 'ain', 'aren', 'aren\'t',
+    'couldn', 'couldn\'t', 'didn', 'didn\'t', 'doesn', 'doesn\'t', 'hadn', 'hadn\'t',
+    'hasn', 'hasn\'t', 'haven', 'haven\'t', 'isn', 'isn\'t', 'mightn', 'mightn\'t',
+    'needn', 'needn\'t', 'shan', 'shan\'t', 'shouldn', 'shouldn\'t', 'wasn', 'wasn\'t',
+    'weren', 'weren\'t', 'won', 'won\'t', 'wouldn', 'wouldn\'t'
+]
+
+text_normalizer = None
+
+
+def get_stopwords():
+    return [
+        stopword for stopword in stopwords.words('english')
+        if stopword not in STOPWORDS_WHITELISTED
+    ]
+
+
+def get_text_normalizer():
+    global text_normalizer
+    if text_normalizer is None:
+        text_normalizer = TextNormalizer(get_stopwords(), settings.CLASSIFIER_TOKEN_CACHE_SIZE)
+    return text_normalizer
+
+
+class TextNormalizer:
+    # Turns a title into the words the classifier learns from and classifies with:
+    # lowercase, without punctuation and without stopwords.
+
+    def __init__(self, stopwords_blacklisted, cache_size=0):
+        self.stopwords = frozenset(stopwords_blacklisted)
+        self.tokenize = self.get_tokens
+        if cache_size:
+            self.tokenize = lru_cache(maxsize=cache_size)(self.get_tokens)
+
+    def get_tokens(self, title):
+        stopwords_blacklisted = self.stopwords
+        return tuple(
+            token for token in TOKEN_PATTERN.findall(title.lower())
+            if token not in stopwords_blacklisted
+        )
+
+    def normalize(self, title):
+        return ' '.join(self.tokenize(title))
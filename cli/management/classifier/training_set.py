@@ -0,0 +1,52 @@
+from collections import Counter
+
+
+class TrainingSet:
+    # The labeled titles the classifier learns from, grouped by the news item they come from.
+    # The same labeled title of different news items is learnt once, so it is counted to know
+    # when the last news item having it is gone.
+    # Every labeled title of the corpus is kept in memory, and in the classifier file, because
+    # forgetting a title needs its words, and a deleted news item cannot be read back from the
+    # database. The memory grows with the corpus, which the editors and the neutral news items
+    # keep small next to the news items.
+
+    def __init__(self):
+        self.news_items = dict()
+        self.labeled_titles = Counter()
+
+    def add(self, news_item_id, labeled_title):
+        labeled_titles = self.news_items.get(news_item_id, frozenset())
+        if labeled_title in labeled_titles:
+            return False
+
+        self.news_items[news_item_id] = labeled_titles | {labeled_title}
+        self.labeled_titles[labeled_title] += 1
+        # only the first news item having the labeled title adds it to the classifier
+        return self.labeled_titles[labeled_title] == 1
+
+    def get_news_item(self, news_item_id):
+        return self.news_items.get(news_item_id, frozenset())
+
+    def set_news_item(self, news_item_id, labeled_titles):
+        labeled_titles = frozenset(labeled_titles)
+        labeled_titles_previous = self.news_items.pop(news_item_id, frozenset())
+        if labeled_titles:
+            self.news_items[news_item_id] = labeled_titles
+
+        labeled_titles_added = list()
+        for labeled_title in labeled_titles - labeled_titles_previous:
+            self.labeled_titles[labeled_title] += 1
+            if self.labeled_titles[labeled_title] == 1:
+                labeled_titles_added.append(labeled_title)
+
+        labeled_titles_removed = list()
+        for labeled_title in labeled_titles_previous - labeled_titles:
+            self.labeled_titles[labeled_title] -= 1
+            if self.labeled_titles[labeled_title] == 0:
+                del self.labeled_titles[labeled_title]
+                labeled_titles_removed.append(labeled_title)
+
+        return labeled_titles_added, labeled_titles_removed
+
+    def get_labeled_titles(self):
+        return list(self.labeled_titles)
@@ -0,0 +1,115 @@
+import abc
+import argparse
+import datetime
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import dateparse, timezone
+
+from core.messaging.classify_message import ClassifyMessage
+from core.messaging.publisher import publisher
+from core.models.newsitem import NewsItem
+
+
+def parse_since(value):
+    try:
+        since = dateparse.parse_datetime(value)
+        if since is None:
+            date = dateparse.parse_date(value)
+            since = date and datetime.datetime.combine(date, datetime.time())
+    except ValueError:
+        since = None
+
+    if since is None:
+        raise argparse.ArgumentTypeError('Invalid date "{}".'.format(value))
+
+    if timezone.is_naive(since):
+        since = timezone.make_aware(since)
+    return since
+
+
+class RequeueCommand(BaseCommand, metaclass=abc.ABCMeta):
+    # Re-queues for classification the news items of get_news_items, newest first. The ids are
+    # paginated by key, so only a chunk of news items is in memory at once, whatever the table size.
+
+    is_self_train = False
+    message_found = 'Found news items that are going to be re-classified.'
+    message_not_found = 'No news items found.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, help='Maximum number of news items re-queued')
+        parser.add_argument(
+            '--since',
+            type=parse_since,
+            help='Only re-queue the news items added since this date (YYYY-MM-DD or ISO 8601)'
+        )
+        parser.add_argument('--rate', type=float, help='Maximum number of news items re-queued per second')
+
+    @abc.abstractmethod
+    def get_news_items(self):
+        pass
+
+    def handle(self, *args, **options):
+        limit = options.get('limit')
+        since = options.get('since')
+        rate = options.get('rate')
+
+        news_items = self.get_news_items()
+        if since is not None:
+            news_items = news_items.filter(added_at__gte=since)
+
+        chunk_size = settings.QUEUE_REQUEUE_CHUNK_SIZE
+        if rate:
+            # a chunk is published at once, so it is kept small enough to be spread over a second
+            chunk_size = min(chunk_size, max(1, int(rate)))
+
+        started_at = time.monotonic()
+        count = 0
+        try:
+            for chunk in self.iterate_chunks(news_items, chunk_size, limit):
+                if not count:
+                    self.logger.info(self.message_found)
+
+                publisher.publish_many(
+                    settings.QUEUE_NAME_CLASSIFY,
+                    [ClassifyMessage.encode(NewsItem(id=id, title=title), self.is_self_train) for id, title in chunk],
+                    {'x-is-self-train': self.is_self_train}
+                )
+                count += len(chunk)
+                self.logger.info('Re-queued %s news items so far...', count)
+
+                if rate:
+                    delay = count / rate - (time.monotonic() - started_at)
+                    if delay > 0:
+                        time.sleep(delay)
+        finally:
+            publisher.close()
+
+        if not count:
+            self.logger.info(self.message_not_found)
+            return
+
+        self.logger.info(
+            'Successfully re-queued %s news items in %.1f seconds!', count, time.monotonic() - started_at
+        )
+
+    @staticmethod
+    def iterate_chunks(news_items, chunk_size, limit=None):
+        news_items = news_items.order_by('-id').values_list('id', 'title')
+        last_id = None
+        remaining = limit
+
+        while remaining is None or remaining > 0:
+            size = chunk_size if remaining is None else min(chunk_size, remaining)
+            chunk_news_items = news_items if last_id is None else news_items.filter(id__lt=last_id)
+            chunk = list(chunk_news_items[:size])
+            if not chunk:
+                return
+
+            yield chunk
+            last_id = chunk[-1][0]
+            if remaining is not None:
+                remaining -= len(chunk)
+            if len(chunk) < size:
+                return
@@ -0,0 +1,141 @@
+import datetime
+import logging
+import random
+import statistics
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import DatabaseError, connection, transaction
+from django.utils import timezone
+
+from core.models.corpus import Corpus
+from core.models.newsitem import NewsItem
+from core.models.newsitem_daily_metric import NewsItemDailyMetric
+from core.models.source import Source
+
+WORDS = (
+    'dog', 'school', 'storm', 'community', 'award', 'prices', 'fire', 'garden', 'home', 'rescue', 'city',
+    'team', 'wins', 'record', 'volunteers', 'hospital', 'market', 'children', 'river', 'festival'
+)
+
+
+class Command(BaseCommand):
+    help = 'Time and explain the queries run on the hot paths, optionally on a synthetic dataset'
+
+    def __init__(self):
+        super(Command, self).__init__()
+        self.logger = logging.getLogger('web')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--news-items',
+            type=int,
+            default=0,
+            help='Number of synthetic news items inserted before, and rolled back after the benchmark'
+        )
+        parser.add_argument('--repeat', type=int, default=5, help='Number of times each query is run')
+
+    def handle(self, *args, **options):
+        news_items_count = options.get('news_items') or 0
+        repeat = max(1, options.get('repeat') or 1)
+
+        # the synthetic dataset never outlives the benchmark
+        with transaction.atomic():
+            if news_items_count:
+                self.seed(news_items_count)
+
+            for name, sql, params in self.get_queries():
+                self.benchmark(name, sql, params, repeat)
+
+            transaction.set_rollback(True)
+
+    def benchmark(self, name, sql, params, repeat):
+        self.stdout.write('== {}'.format(name))
+        try:
+            # a failed query does not abort the ones after it
+            with transaction.atomic(), connection.cursor() as cursor:
+                durations = list()
+                for _ in range(repeat):
+                    started_at = time.perf_counter()
+                    cursor.execute(sql, params)
+                    cursor.fetchall()
+                    durations.append(time.perf_counter() - started_at)
+
+                cursor.execute('{} {}'.format(connection.ops.explain_query_prefix(), sql), params)
+                plan = cursor.fetchall()
+        except DatabaseError as ex_query:
+            self.stdout.write('failed due to "{}"'.format(str(ex_query).strip()))
+            return
+
+        self.stdout.write('median {:.2f} ms over {} runs'.format(statistics.median(durations) * 1000, repeat))
+        for row in plan:
+            self.stdout.write('  ' + ' | '.join(str(column) for column in row))
+
+    @staticmethod
+    def get_queries():
+        now = timezone.now()
+        source = Source.objects.order_by('id').first()
+        date_range = {
+            'date_from': (now - datetime.timedelta(days=30)).strftime('%Y-%m-%d 00:00:00'),
+            'date_to': now.strftime('%Y-%m-%d 23:59:59')
+        }
+
+        querysets = (
+            ('NewsItem.exists', NewsItem.objects.filter(
+                title='foo', added_at__gt=now - datetime.timedelta(hours=24), source=source
+            ).values('id')[:1]),
+            ('NewsItem.find_latest_added_at', NewsItem.objects.filter(
+                title__in=['foo', 'bar'], added_at__gt=now - datetime.timedelta(hours=24), source=source
+            ).values('title')),
+            ('NewsItem.find_positive', NewsItem.find_positive(
+                settings.SENTIMENT_POLARITY_THRESHOLD, settings.WEB_NEWS_ITEMS_COUNT
+            )),
+            ('NewsItem.find_negative', NewsItem.find_negative(settings.SENTIMENT_POLARITY_THRESHOLD)),
+            ('NewsItem.find_neutral', NewsItem.find_neutral()),
+            ('classify_requeue chunk', NewsItem.objects.filter(score=None).order_by('-id').values_list(
+                'id', 'title'
+            )[:settings.QUEUE_REQUEUE_CHUNK_SIZE]),
+            ('admin published news items', NewsItem.objects.filter(published=True).order_by('-added_at')[:100]),
+            ('training corpora', Corpus.objects.filter(active=True).values_list(
+                'news_item_id', 'news_item__title', 'positive'
+            )),
+            ('NewsItemMetric.get_accuracy', NewsItemDailyMetric.filter_date_range(date_range).order_by('date')),
+        )
+        return [(name, ) + queryset.query.sql_with_params() for name, queryset in querysets]
+
+    def seed(self, news_items_count):
+        # the same dataset for the same size, so runs before and after a migration compare
+        generator = random.Random(news_items_count)
+        now = timezone.now()
+
+        sources = [Source(name='benchmark {}'.format(index), url='https://example.com/{}'.format(index))
+                   for index in range(20)]
+        Source.objects.bulk_create(sources)
+        sources = list(Source.objects.filter(name__startswith='benchmark '))
+
+        batch_size = settings.RSS_CRAWL_INSERT_BATCH_SIZE
+        for index in range(0, news_items_count, batch_size):
+            news_items = list()
+            for _ in range(min(batch_size, news_items_count - index)):
+                # a tenth is not scored yet, half of the positive ones are published
+                score = generator.choice((None, 0, 0, 0, 0, 1, 1, 1, 1, 1))
+                news_items.append(NewsItem(
+                    title=' '.join(generator.sample(WORDS, 6)),
+                    description='',
+                    source=generator.choice(sources),
+                    url='https://example.com/',
+                    score=score,
+                    published=score == 1 and generator.random() < 0.5,
+                    added_at=now - datetime.timedelta(seconds=generator.randrange(2 * 365 * 24 * 3600))
+                ))
+            NewsItem.objects.bulk_create(news_items, batch_size=batch_size)
+
+        # a few percent of the news items are corrected by the editors
+        news_item_ids = NewsItem.objects.values_list('id', flat=True)
+        corpora = [
+            Corpus(news_item_id=news_item_id, positive=generator.random() < 0.5, active=generator.random() < 0.9)
+            for news_item_id in news_item_ids.iterator() if generator.random() < 0.03
+        ]
+        Corpus.objects.bulk_create(corpora, batch_size=batch_size)
+        self.logger.info('Seeded %s news items and %s corpora.', news_items_count, len(corpora))
@@ -1,25 +1,30 @@
 import logging
+import multiprocessing
 import os
 import pickle
-from random import shuffle
-import re
 import threading
 import time
 
 from django.conf import settings
 from django.core.exceptions import FieldDoesNotExist, FieldError, ValidationError
 from django.core.management.base import BaseCommand
-from django.core import serializers
 from django.core.serializers.base import DeserializationError
 from django.db import utils, connection
-from nltk.corpus import stopwords
 import pika
 from pika.exceptions import AMQPChannelError, AMQPConnectionError, ChannelClosed, \
 ConnectionClosed, DuplicateConsumerTag, NoFreeChannels
 from textblob.classifiers import NaiveBayesClassifier
 
+from core.messaging.classify_message import ClassifyMessage
+from core.messaging.train_message import TrainMessage
 from core.models.corpus import Corpus
 from core.models.newsitem import NewsItem
+from cli.management.classifier import model_file
+from cli.management.classifier.async_consumer import AsyncConsumer
+from cli.management.classifier.naive_bayes import NaiveBayes
+from cli.management.classifier.result_cache import ResultCache
+from cli.management.classifier.text_normalizer import get_text_normalizer
+from cli.management.classifier.training_set import TrainingSet
 from cli.management.handlers.publish_handler import PublishHandler
 from cli.management.handlers.corpus_handler import CorpusHandler
 
@@ -27,31 +32,54 @@ from cli.management.handlers.corpus_handler import CorpusHandler
 class Command(BaseCommand):
     help = 'Perform sentiment analysis on news items'
     classifier = None
+    classifier_version = 0
+    # shared with the worker processes, set to the version of the classifier whenever it is retrained
+    model_version = None
+    worker_model_version = 0
 
     def __init__(self):
         super(Command, self).__init__()
         self.logger = logging.getLogger('web')
+        self.batch = list()
+        self.result_cache = ResultCache(settings.CLASSIFY_RESULT_CACHE_SIZE)
+        # held while training, so a worker is never forked with a lock of the train thread taken
+        self.train_lock = threading.Lock()
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=settings.CLASSIFY_WORKERS,
+            help='Number of processes consuming the classify queue'
+        )
+        parser.add_argument(
+            '--asyncio',
+            action='store_true',
+            default=settings.CLASSIFY_ASYNCIO,
+            help='Consume both queues on a single connection from an asyncio event loop'
+        )
 
     def handle(self, *args, **options):
+        workers = options.get('workers') or settings.CLASSIFY_WORKERS
+
         try:
             channel = self.get_channel()
-            if channel:
-                channel.queue_purge(queue=settings.QUEUE_NAME_TRAIN)
 
             should_train_classifier = True
             if os.path.isfile(settings.CLASSIFIER_DUMP_FILEPATH):
                 should_train_classifier = False
 
                 self.logger.info('Classifier dump found!')
-                try:
-                    self.classifier = pickle.load(open(settings.CLASSIFIER_DUMP_FILEPATH, 'rb'))
-                except EOFError as eof_error:
+                self.classifier = self.load_classifier()
+                if self.classifier is None:
                     should_train_classifier = True
-                    self.logger.error('Could not load dump because of: {}'.format(str(eof_error)))
             else:
                 self.logger.info('Classifier dump not found.')
 
             if should_train_classifier:
+                # a full training covers the pending training requests, unlike a loaded dump
+                if channel:
+                    channel.queue_purge(queue=settings.QUEUE_NAME_TRAIN)
                 self.classifier = self.get_classifier()
 
         except (utils.Error, utils.DataError, utils.DatabaseError) as ex_db:
@@ -60,14 +88,92 @@ class Command(BaseCommand):
 
         self.logger.info('Classifier is ready!')
 
+        if workers > 1:
+            self.supervise(workers)
+            return
+
+        if options.get('asyncio', settings.CLASSIFY_ASYNCIO):
+            AsyncConsumer(self).run()
+            return
+
         thread_classify = threading.Thread(target=self.classify_consumer, args=(), name='classify')
         thread_classify.start()
 
         thread_train = threading.Thread(target=self.train_consumer, args=(), name='train')
         thread_train.start()
 
+    def supervise(self, workers):
+        self.model_version = multiprocessing.Value('i', 0)
+
+        # the forked workers must not share the database connection of the supervisor
+        connection.close()
+
+        processes = dict()
+        try:
+            # the first workers are forked before the train thread exists
+            self.supervise_workers(processes, workers)
+
+            thread_train = threading.Thread(target=self.train_consumer, args=(), name='train')
+            thread_train.start()
+
+            while True:
+                time.sleep(settings.CLASSIFY_WORKERS_SUPERVISE_INTERVAL)
+                self.supervise_workers(processes, workers)
+        finally:
+            for process in processes.values():
+                process.terminate()
+
+    def supervise_workers(self, processes, workers):
+        for index in range(workers):
+            process = processes.get(index)
+            if process is not None and process.is_alive():
+                continue
+
+            if process is not None:
+                self.logger.warning(
+                    'Classify worker #%s exited with code %s, restarting.', index, process.exitcode
+                )
+
+            # the classifier is inherited by the forked worker, not loaded again
+            process = multiprocessing.get_context('fork').Process(
+                target=self.classify_worker, args=(), name='classify-{}'.format(index), daemon=True
+            )
+            with self.train_lock:
+                process.start()
+            processes[index] = process
+
+    def classify_worker(self):
+        self.worker_model_version = self.model_version.value
+        self.classify_consumer()
+
+    def reload_classifier(self):
+        model_version = self.model_version.value
+        if model_version == self.worker_model_version:
+            return
+
+        # only the supervisor updates the classifier, so the workers do not need its training set
+        classifier = self.load_classifier(with_training_set=False)
+        if classifier is not None:
+            self.classifier = classifier
+            self.classifier_version = model_version
+            self.result_cache.clear()
+            self.worker_model_version = model_version
+            self.logger.info('Reloaded classifier version %s.', model_version)
+
+    def load_classifier(self, with_training_set=True):
+        try:
+            if model_file.is_model_file(settings.CLASSIFIER_DUMP_FILEPATH):
+                return model_file.load(settings.CLASSIFIER_DUMP_FILEPATH, with_training_set)
+            # the textblob classifier is pickled
+            return pickle.load(open(settings.CLASSIFIER_DUMP_FILEPATH, 'rb'))
+        except (EOFError, OSError, ValueError, pickle.UnpicklingError) as ex_load:
+            self.logger.error('Could not load dump because of: {}'.format(str(ex_load)))
+            return None
+
     def classify_consumer(self):
-        channel = self.get_consumer(settings.QUEUE_NAME_CLASSIFY, self.classify_decorator)
+        channel = self.get_consumer(
+            settings.QUEUE_NAME_CLASSIFY, self.classify_decorator, settings.CLASSIFY_BATCH_SIZE
+        )
         try:
             channel.start_consuming()
         except (
@@ -86,13 +192,17 @@ class Command(BaseCommand):
         ) as ex_consume:
             self.logger.error(str(ex_consume))
 
+    @staticmethod
+    def get_connection_parameters():
+        return pika.ConnectionParameters(
+            host=settings.QUEUE_HOSTNAME,
+            heartbeat_interval=600,
+            blocked_connection_timeout=300
+        )
+
     def get_channel(self):
         try:
-            params = pika.ConnectionParameters(
-                host=settings.QUEUE_HOSTNAME,
-                heartbeat_interval=600,
-                blocked_connection_timeout=300
-            )
+            params = self.get_connection_parameters()
             connection = pika.BlockingConnection(params)
             channel = connection.channel()
         except (
@@ -104,14 +214,14 @@ class Command(BaseCommand):
 
         return channel
 
-    def get_consumer(self, queue, callback):
+    def get_consumer(self, queue, callback, prefetch_count=1):
         try:
             channel = self.get_channel()
             if channel is None:
                 return None
 
             channel.queue_declare(queue=queue, durable=True)
-            channel.basic_qos(prefetch_count=1)
+            channel.basic_qos(prefetch_count=prefetch_count)
             channel.basic_consume(callback, queue=queue)
         except DuplicateConsumerTag as ex_consumer:
             self.logger.error(str(ex_consumer))
@@ -122,111 +232,304 @@ class Command(BaseCommand):
     def get_classifier(self):
         self.logger.info('Training classifier...')
 
-        stopwords_blacklisted = self.get_stopwords()
-        stopwords_pattern = re.compile(r'\b(' + r'|'.join(stopwords_blacklisted) + r')\b\s*')
+        # the labeled titles are read in chunks and learnt once each, the training set keeps them all
+        training_set = TrainingSet()
+        labeled_titles = (
+            labeled_title for news_item_id, labeled_title in self.get_training_items()
+            if training_set.add(news_item_id, labeled_title)
+        )
+
+        classifier = self.train_classifier(labeled_titles)
+        if isinstance(classifier, NaiveBayes):
+            classifier.training_set = training_set
 
-        corpora_classified = list()
-        for corpus in Corpus.objects.filter(active=True):
-            title = stopwords_pattern.sub('', corpus.news_item.title)
-            corpora_classified.append((title, corpus.get_classification()))
+        self.dump_classifier(classifier)
+        return classifier
 
-        for news_item in NewsItem.find_neutral():
-            title = stopwords_pattern.sub('', news_item.title)
-            corpora_classified.append((title, 'neu'))
+    def update_classifier(self, classifier, news_item_ids):
+        self.logger.info('Updating classifier with %s news items...', len(news_item_ids))
+
+        # the news items not found any more are removed from the training set
+        training_items = {news_item_id: set() for news_item_id in news_item_ids}
+        for news_item_id, labeled_title in self.get_training_items(news_item_ids):
+            training_items[news_item_id].add(labeled_title)
+
+        training_set = classifier.training_set
+        labeled_titles_previous = {
+            news_item_id: training_set.get_news_item(news_item_id) for news_item_id in training_items
+        }
+        labeled_titles_added = list()
+        labeled_titles_removed = list()
+        for news_item_id, labeled_titles in training_items.items():
+            added, removed = training_set.set_news_item(news_item_id, labeled_titles)
+            labeled_titles_added.extend(added)
+            labeled_titles_removed.extend(removed)
 
-        corpora_classified = list(set(corpora_classified))
-        shuffle(corpora_classified)
+        try:
+            classifier = classifier.update(labeled_titles_added, labeled_titles_removed)
+            classifier.training_set = training_set
+            self.dump_classifier(classifier)
+        except Exception:
+            # the training set is shared with the current classifier, which keeps what it learnt, so
+            # the news items are found changed again when their messages are delivered again
+            for news_item_id, labeled_titles in labeled_titles_previous.items():
+                training_set.set_news_item(news_item_id, labeled_titles)
+            raise
 
-        classifier = NaiveBayesClassifier(corpora_classified)
+        return classifier
 
+    def dump_classifier(self, classifier):
         self.logger.info('Dumping classifier.')
-        pickle.dump(classifier, open(settings.CLASSIFIER_DUMP_FILEPATH, 'wb'))
+        if isinstance(classifier, NaiveBayes):
+            model_file.dump(classifier, settings.CLASSIFIER_DUMP_FILEPATH)
+        else:
+            with model_file.atomic_file(settings.CLASSIFIER_DUMP_FILEPATH) as file:
+                pickle.dump(classifier, file)
         self.logger.info('Classifier dumped!')
 
-        return classifier
+    @staticmethod
+    def train_classifier(labeled_titles, backend=None):
+        backend = backend or settings.CLASSIFIER_BACKEND
+        if backend == 'textblob':
+            return NaiveBayesClassifier(list(labeled_titles))
+        return NaiveBayes.train(labeled_titles)
+
+    def get_training_items(self, news_item_ids=None):
+        text_normalizer = get_text_normalizer()
+
+        corpora = Corpus.objects.filter(active=True)
+        if news_item_ids is not None:
+            corpora = corpora.filter(news_item_id__in=news_item_ids)
+        corpora = corpora.values_list('news_item_id', 'news_item__title', 'positive')
+        for news_item_id, title, positive in corpora.iterator(chunk_size=settings.CLASSIFIER_TRAINING_CHUNK_SIZE):
+            yield news_item_id, (text_normalizer.normalize(title), 'pos' if positive else 'neg')
+
+        news_items_neutral = NewsItem.find_neutral(news_item_ids).values_list('id', 'title')
+        for news_item_id, title in news_items_neutral.iterator(chunk_size=settings.CLASSIFIER_TRAINING_CHUNK_SIZE):
+            yield news_item_id, (text_normalizer.normalize(title), 'neu')
 
     def classify_decorator(self, channel, method, properties, body):
         self.classify_callback(channel, method, properties, body)
-        connection.close()
+        # close the connection once the batch is written, instead of keeping it idle
+        if not self.batch:
+            connection.close()
         return
 
     def classify_callback(self, channel, method, properties, body):
         if self.classifier:
-            try:
-                queue_items = serializers.deserialize('json', body)
-            except DeserializationError as ex_deserialize:
-                self.reject_queue_item(channel, method)
-                self.logger.error('Classifier failed to deserialize body.')
+            queue_item = self.decode_queue_item(channel, method, properties, body)
+            if queue_item is None:
                 return
 
-            try:
-                queue_item = next(queue_items).object
-                is_self_train = properties.headers['x-is-self-train']
-            except (StopIteration, RuntimeError) as ex_item:
-                self.reject_queue_item(channel, method)
-                self.logger.error('Classifier failed to get object from deserialized body.')
-                return
+            self.batch.append((method.delivery_tag,) + queue_item)
+
+            if len(self.batch) >= settings.CLASSIFY_BATCH_SIZE:
+                self.flush_batch(channel)
+            elif len(self.batch) == 1:
+                # flush an incomplete batch when no more messages arrive in time
+                channel.connection.add_timeout(
+                    settings.CLASSIFY_BATCH_MAX_WAIT,
+                    lambda: self.flush_batch_decorator(channel)
+                )
+        else:
+            self.reject_queue_item(channel, method)
+            self.logger.warning('Classifier was not ready when started to classify.')
+            # sleep to wait for classifier's training
+            # basic_consume() will call this method again as we nacked
+            time.sleep(10)
+
+    def decode_queue_item(self, channel, method, properties, body):
+        try:
+            return ClassifyMessage.decode(body, properties.headers)
+        except DeserializationError as ex_deserialize:
+            self.reject_queue_item(channel, method)
+            self.logger.error('Classifier failed to deserialize body.')
+        except (StopIteration, RuntimeError, KeyError) as ex_item:
+            self.reject_queue_item(channel, method)
+            self.logger.error('Classifier failed to get object from deserialized body.')
+        return None
+
+    def flush_batch_decorator(self, channel):
+        self.flush_batch(channel)
+        connection.close()
+
+    def flush_batch(self, channel):
+        if not self.batch:
+            return
+
+        batch = self.batch
+        self.batch = list()
+        delivery_tag = batch[-1][0]
+
+        items = self.classify_batch(batch)
+        if items is None:
+            self.reject_queue_items(channel, delivery_tag)
+            return
 
-            self.logger.info('Classifying #%s...', queue_item.id)
-            classification = self.classifier.classify(queue_item.title)
+        if self.acknowledge_queue_items(channel, delivery_tag):
+            self.log_classified(items)
 
+    def classify_batch(self, batch):
+        # a worker process picks up the classifier retrained by the supervisor
+        if self.model_version is not None:
+            self.reload_classifier()
+
+        # the version is read first, so a result is never cached with the version of a newer classifier
+        classifier_version = self.classifier_version
+        classifier = self.classifier
+        if classifier is None:
+            self.logger.warning('Classifier was not ready when started to classify.')
+            return None
+
+        self.logger.info('Classifying %s news items...', len(batch))
+
+        items_publish = list()
+        items_corpus = list()
+        titles = [queue_item.title for _, queue_item, _ in batch]
+        classifications = self.classify_titles(classifier, classifier_version, titles)
+
+        for (_, queue_item, is_self_train), classification in zip(batch, classifications):
             # self training will create corpus, crawl will update the news item
-            handler = CorpusHandler() if is_self_train else PublishHandler()
+            if is_self_train:
+                items_corpus.append((queue_item, classification))
+            else:
+                items_publish.append((queue_item, classification))
 
-            try:
-                handler.run(queue_item, classification)
-            except (FieldDoesNotExist, FieldError, ValidationError) as ex_save:
-                self.reject_queue_item(channel, method)
-                self.logger.error('Classifier could not handle the item due to "%s"', str(ex_save))
-                return
+        try:
+            PublishHandler().run_many(items_publish)
+            CorpusHandler().run_many(items_corpus)
+        except (FieldDoesNotExist, FieldError, ValidationError) as ex_save:
+            self.logger.error('Classifier could not handle the item due to "%s"', str(ex_save))
+            return None
 
-            try:
-                channel.basic_ack(delivery_tag=method.delivery_tag)
-            except (
-                    AMQPConnectionError, AMQPChannelError, ChannelClosed,
-                    ConnectionClosed, NoFreeChannels
-            ) as ex_ack:
-                self.reject_queue_item(channel, method)
-                self.logger.error('Classifier could not acknowledge item due to "%s"', str(ex_ack))
-                return
+        return items_publish + items_corpus
 
+    def acknowledge_queue_items(self, channel, delivery_tag):
+        try:
+            channel.basic_ack(delivery_tag=delivery_tag, multiple=True)
+        except (
+                AMQPConnectionError, AMQPChannelError, ChannelClosed,
+                ConnectionClosed, NoFreeChannels
+        ) as ex_ack:
+            self.reject_queue_items(channel, delivery_tag)
+            self.logger.error('Classifier could not acknowledge item due to "%s"', str(ex_ack))
+            return False
+
+        return True
+
+    def log_classified(self, items):
+        for queue_item, classification in items:
             self.logger.info(
                 'Classified #%s "%s" as "%s"!', queue_item.id, queue_item.title, classification
             )
+        self.logger.info(
+            'Classification cache hits: %s, misses: %s.', self.result_cache.hits, self.result_cache.misses
+        )
+
+    def classify_titles(self, classifier, classifier_version, titles):
+        text_normalizer = get_text_normalizer()
+        titles = [text_normalizer.normalize(title) for title in titles]
+
+        classifications = dict()
+        for title in titles:
+            if title not in classifications:
+                classifications[title] = self.result_cache.get((title, classifier_version))
+
+        # only the titles not classified before by this classifier, once each
+        titles_missing = [title for title, classification in classifications.items() if classification is None]
+        if hasattr(classifier, 'classify_many'):
+            classifications_missing = classifier.classify_many(titles_missing)
         else:
-            self.reject_queue_item(channel, method)
-            self.logger.warning('Classifier was not ready when started to classify.')
-            # sleep to wait for classifier's training
-            # basic_consume() will call this method again as we nacked
-            time.sleep(10)
+            classifications_missing = [classifier.classify(title) for title in titles_missing]
+
+        for title, classification in zip(titles_missing, classifications_missing):
+            classifications[title] = classification
+            self.result_cache.set((title, classifier_version), classification)
+
+        return [classifications[title] for title in titles]
 
     def train_callback(self, channel, method, properties, body):
-        channel.queue_purge(queue=settings.QUEUE_NAME_TRAIN)
+        with self.train_lock:
+            self.train_messages(channel, method, body)
+
+    def train_messages(self, channel, method, body):
+        # the pending messages are merged, to train once for all of them
+        bodies = [body]
+        delivery_tag = method.delivery_tag
+        while True:
+            method_pending, _, body_pending = channel.basic_get(queue=settings.QUEUE_NAME_TRAIN)
+            if method_pending is None:
+                break
+            bodies.append(body_pending)
+            delivery_tag = method_pending.delivery_tag
+
+        # the messages are acknowledged once trained, so they are delivered again after a failure or a crash
+        if not self.train(self.get_train_news_item_ids(bodies)):
+            self.reject_queue_items(channel, delivery_tag)
+            # wait for the database before the messages are delivered again
+            time.sleep(10)
+            return
+
+        try:
+            channel.basic_ack(delivery_tag=delivery_tag, multiple=True)
+        except (
+                AMQPConnectionError, AMQPChannelError, ChannelClosed, ConnectionClosed,
+                NoFreeChannels
+        ) as ex_ack:
+            self.logger.error('Classifier could not acknowledge train messages due to "%s"', str(ex_ack))
+
+    def get_train_news_item_ids(self, bodies):
+        news_item_ids = set()
+        for body in bodies:
+            try:
+                news_item_ids_message = TrainMessage.decode(body)
+            except DeserializationError as ex_deserialize:
+                self.logger.error('Classifier failed to deserialize train body.')
+                continue
+
+            # a message without news items asks for a full retrain
+            if news_item_ids_message is None:
+                return None
+            news_item_ids.update(news_item_ids_message)
 
-        self.classifier = None
+        return news_item_ids
+
+    def train(self, news_item_ids):
+        if news_item_ids is not None and not news_item_ids:
+            return True
+
+        # only the vectorized classifier can be updated, the textblob one is always retrained
+        classifier = self.classifier
+        should_update_classifier = news_item_ids is not None and isinstance(classifier, NaiveBayes) \
+            and getattr(classifier, 'training_set', None) is not None
+
+        # the current classifier keeps classifying until the new one is ready
         self.logger.info('train_callback(): Starting training...')
         try:
-            self.classifier = self.get_classifier()
+            if should_update_classifier:
+                classifier = self.update_classifier(classifier, news_item_ids)
+            else:
+                classifier = self.get_classifier()
             self.logger.info('train_callback(): Finished training!')
         except (utils.Error, utils.DataError, utils.DatabaseError) as ex_db:
             self.logger.error('Failed to train the classifier.')
-
-    @staticmethod
-    def get_stopwords():
-        stopwords_whitelisted = [
-            'above', 'out', 'off', 'again', 'against', 'why', 'few', 'more', 'most', 'no', 'nor',
-            'not', 'only', 'don', 'don\'t', 'should', 'should\'ve', 'ain', 'aren', 'aren\'t',
-            'couldn', 'couldn\'t', 'didn', 'didn\'t', 'doesn', 'doesn\'t', 'hadn', 'hadn\'t',
-            'hasn', 'hasn\'t', 'haven', 'haven\'t', 'isn', 'isn\'t', 'mightn', 'mightn\'t',
-            'needn', 'needn\'t', 'shan', 'shan\'t', 'shouldn', 'shouldn\'t', 'wasn', 'wasn\'t',
-            'weren', 'weren\'t', 'won', 'won\'t', 'wouldn', 'wouldn\'t'
-        ]
-
-        stopwords_diff = [
-            stopword for stopword in stopwords.words('english') \
-            if stopword not in stopwords_whitelisted
-        ]
-        return stopwords_diff
+            return False
+        except OSError as ex_dump:
+            self.logger.error('Failed to dump the classifier due to "%s"', str(ex_dump))
+            return False
+
+        self.swap_classifier(classifier)
+        return True
+
+    def swap_classifier(self, classifier):
+        # a batch being classified keeps the classifier it started with
+        self.classifier = classifier
+        self.classifier_version += 1
+        self.result_cache.clear()
+        if self.model_version is not None:
+            with self.model_version.get_lock():
+                self.model_version.value = self.classifier_version
+        self.logger.info('Swapped in classifier version %s.', self.classifier_version)
 
     def reject_queue_item(self, channel, method):
         try:
@@ -236,3 +539,12 @@ class Command(BaseCommand):
                 NoFreeChannels
         ) as ex_ack:
             self.logger.error('Classifier could not nack message.')
+
+    def reject_queue_items(self, channel, delivery_tag):
+        try:
+            channel.basic_nack(delivery_tag=delivery_tag, multiple=True)
+        except (
+                AMQPConnectionError, AMQPChannelError, ChannelClosed, ConnectionClosed,
+                NoFreeChannels
+        ) as ex_ack:
+            self.logger.error('Classifier could not nack messages.')
@@ -0,0 +1,23 @@
+import logging
+
+from django.core.management.base import BaseCommand
+from django.conf import settings
+
+from core.messaging.publisher import publisher
+from core.messaging.train_message import TrainMessage
+
+
+class Command(BaseCommand):
+    help = 'Queue a full retrain of the classifier'
+
+    def __init__(self):
+        super(Command, self).__init__()
+        self.logger = logging.getLogger('web')
+
+    def handle(self, *args, **options):
+        try:
+            publisher.publish(settings.QUEUE_NAME_TRAIN, TrainMessage.encode())
+        finally:
+            publisher.close()
+
+        self.logger.info('Successfully queued a full retrain of the classifier!')
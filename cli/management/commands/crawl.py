@@ -1,13 +1,19 @@
+from concurrent.futures import ThreadPoolExecutor
+import datetime
 from dateutil.parser import parse
+import hashlib
+import http.client
 import logging
+import urllib.error
+import urllib.request
 
-from django.core.management.base import BaseCommand
 from django.conf import settings
-from django.core import serializers
+from django.core.management.base import BaseCommand
 from django.utils import timezone
 import feedparser
-import pika
 
+from core.messaging.classify_message import ClassifyMessage
+from core.messaging.publisher import publisher
 from core.models.source import Source
 from core.models.newsitem import NewsItem
 
@@ -22,9 +28,16 @@ class Command(BaseCommand):
 
     def add_arguments(self, parser):
         parser.add_argument('name', nargs='?', type=str)
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=settings.RSS_CRAWL_CONCURRENCY,
+            help='Number of feeds downloaded in parallel'
+        )
 
     def handle(self, *args, **options):
         name = options['name']
+        concurrency = options.get('concurrency') or settings.RSS_CRAWL_CONCURRENCY
 
         if name:
             sources = Source.objects.filter(name=name)
@@ -35,28 +48,75 @@ class Command(BaseCommand):
             self.logger.error('No source(s) found.')
             return
 
-        connection = pika.BlockingConnection(
-            pika.ConnectionParameters(host=settings.QUEUE_HOSTNAME)
-        )
-        channel = connection.channel()
-        channel.queue_declare(queue=settings.QUEUE_NAME_CLASSIFY, durable=True)
-
+        sources = [source for source in sources if not source.pending or source.is_stale()]
         for source in sources:
-            if not source.pending or source.is_stale():
-                self.crawl(source, channel)
+            source.crawling()
+
+        # feeds are downloaded in parallel, but parsed and stored in the order of the sources
+        try:
+            with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+                responses = executor.map(self.fetch, sources)
+                for source, response in zip(sources, responses):
+                    self.crawl(source, response)
+        finally:
+            publisher.close()
+
+    def fetch(self, source):
+        self.logger.info('Fetching \'%s\'...', source.name)
 
-    def crawl(self, source, channel):
-        source.crawling()
+        headers = source.get_conditional_headers()
+        headers['User-Agent'] = settings.RSS_CRAWL_USER_AGENT
 
+        try:
+            request = urllib.request.Request(source.url, headers=headers)
+            with urllib.request.urlopen(request, timeout=settings.RSS_CRAWL_TIMEOUT) as response:
+                return {
+                    'status': response.status,
+                    'content': response.read(),
+                    'etag': response.headers.get('ETag'),
+                    'last_modified': response.headers.get('Last-Modified')
+                }
+        except urllib.error.HTTPError as ex_http:
+            # the publisher confirmed that the feed did not change since our last crawl
+            if ex_http.code == 304:
+                return {
+                    'status': 304,
+                    'content': None,
+                    'etag': ex_http.headers.get('ETag') or source.etag,
+                    'last_modified': ex_http.headers.get('Last-Modified') or source.last_modified
+                }
+            self.logger.error('Could not fetch \'%s\' due to "%s"', source.name, str(ex_http))
+            return None
+        except (OSError, ValueError, http.client.HTTPException) as ex_fetch:
+            self.logger.error('Could not fetch \'%s\' due to "%s"', source.name, str(ex_fetch))
+            return None
+
+    def crawl(self, source, response):
         self.logger.info('Crawling \'%s\'...', source.name)
 
+        if response is None:
+            self.logger.error('Could not crawl \'%s\'.', source.name)
+            return
+
+        content_hash = None
+        if response['content'] is not None:
+            content_hash = hashlib.sha256(response['content']).hexdigest()
+
+        source.etag = response['etag']
+        source.last_modified = response['last_modified']
+
+        if response['status'] == 304 or content_hash == source.content_hash:
+            source.crawled()
+            self.logger.info('Feed of \'%s\' was not modified.', source.name)
+            return
+
         try:
-            feedparser.USER_AGENT = settings.RSS_CRAWL_USER_AGENT
-            feed = feedparser.parse(source.url)
+            feed = feedparser.parse(response['content'])
         except RuntimeError:
             self.logger.error('Could not crawl \'%s\'.', source.name)
             return
 
+        entries = list()
         for entry in feed['entries']:
             if 'published' in entry:
                 pass
@@ -65,8 +125,27 @@ class Command(BaseCommand):
             else:
                 entry['published'] = timezone.now().isoformat()
 
-            if NewsItem.exists(entry['title'], parse(entry['published']), source):
+            added_at = parse(entry['published'])
+            if timezone.is_naive(added_at):
+                added_at = timezone.make_aware(added_at)
+            entries.append((entry, added_at))
+
+        # a single query finds which of the entries were already stored during the last 24 hours
+        latest_added_at = dict()
+        if entries:
+            latest_added_at = NewsItem.find_latest_added_at(
+                [entry['title'] for entry, _ in entries],
+                min(added_at for _, added_at in entries) - datetime.timedelta(hours=24),
+                source
+            )
+
+        news_items = list()
+        for entry, added_at in entries:
+            title = entry['title'].lower()
+            if title in latest_added_at and \
+                    latest_added_at[title] > added_at - datetime.timedelta(hours=24):
                 continue
+            latest_added_at[title] = max(added_at, latest_added_at.get(title, added_at))
 
             description = entry['summary'] if 'summary' in entry else entry['title']
 
@@ -76,20 +155,23 @@ class Command(BaseCommand):
             news_item.url = entry['link']
             news_item.source = source
             news_item.score = None
-            news_item.added_at = parse(entry['published'])
-            news_item.save()
-
-            body = serializers.serialize('json', [news_item])
-            channel.basic_publish(
-                exchange='',
-                routing_key=settings.QUEUE_NAME_CLASSIFY,
-                body=body,
-                properties=pika.BasicProperties(
-                    delivery_mode=2,
-                    headers={'x-is-self-train': False}
-                )
-            )
+            news_item.added_at = added_at
+            news_items.append(news_item)
+
+        news_items = NewsItem.bulk_insert(news_items, settings.RSS_CRAWL_INSERT_BATCH_SIZE)
+        self.enqueue(news_items)
 
+        source.content_hash = content_hash
         source.crawled()
 
         self.logger.info('Successfully crawled \'%s\'!', source.name)
+
+    def enqueue(self, news_items):
+        if not news_items:
+            return
+
+        publisher.publish_many(
+            settings.QUEUE_NAME_CLASSIFY,
+            (ClassifyMessage.encode(news_item, False) for news_item in news_items),
+            {'x-is-self-train': False}
+        )
@@ -0,0 +1,29 @@
+import logging
+
+from django.core.management.base import BaseCommand
+
+from core.models.newsitem_daily_metric import NewsItemDailyMetric
+from cli.management.commands._requeue import parse_since
+
+
+class Command(BaseCommand):
+    help = 'Count again the daily metrics of the news items, from the first news item or a date on'
+
+    def __init__(self):
+        super(Command, self).__init__()
+        self.logger = logging.getLogger('web')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--since',
+            type=parse_since,
+            help='Only count the days since this date (YYYY-MM-DD or ISO 8601)'
+        )
+
+    def handle(self, *args, **options):
+        since = options.get('since')
+        date_from = NewsItemDailyMetric.get_date(since) if since else None
+
+        self.logger.info('Backfilling the daily metrics...')
+        days = NewsItemDailyMetric.backfill(date_from)
+        self.logger.info('Successfully backfilled the daily metrics of %s days!', days)
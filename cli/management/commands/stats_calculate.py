@@ -1,10 +1,12 @@
-from datetime import datetime
+from datetime import datetime, timedelta
 import logging
-import pika
 
 from django.conf import settings
 from django.core.management.base import BaseCommand
+from django.db.models import Max
+from django.utils import timezone
 
+from core.messaging.publisher import publisher
 from core.models.newsitem import NewsItem
 from core.models.corpus import Corpus
 from core.models.newsitem_metric import NewsItemMetric
@@ -19,9 +21,40 @@ class Command(BaseCommand):
         super(Command, self).__init__()
         self.logger = logging.getLogger('web')
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--full',
+            action='store_true',
+            help='Count all the news items again, instead of the ones added since the last stats'
+        )
+
+    @staticmethod
+    def count_news_items(full=False):
+        news_item_id_max = NewsItem.objects.aggregate(id_max=Max('id'))['id_max'] or 0
+        # the news items of the crawl transactions still running may be committed after ones with a
+        # greater id, so the most recent ids are counted again by every run until they settle
+        news_item_id_settled = max(news_item_id_max - settings.STATS_NEWS_ITEMS_RECOUNT_IDS, 0)
+        statistic = None
+        if not full:
+            statistic = Statistic.objects.exclude(news_items_settled_count=None).order_by('-id').first()
+
+        if statistic is None:
+            news_items_settled_count = NewsItem.objects.filter(id__lte=news_item_id_settled).count()
+        else:
+            # the news items are never deleted but by the editors, which the full count run daily makes up for
+            news_item_id_settled = max(news_item_id_settled, statistic.news_item_id_settled)
+            news_items_settled_count = statistic.news_items_settled_count + NewsItem.objects.filter(
+                id__gt=statistic.news_item_id_settled,
+                id__lte=news_item_id_settled
+            ).count()
+
+        news_items_count = news_items_settled_count + NewsItem.objects.filter(id__gt=news_item_id_settled).count()
+        return news_items_count, news_item_id_settled, news_items_settled_count
+
     def handle(self, *args, **options):
         self.logger.info('Pre-calculating stats!')
 
+        full = options.get('full')
         now = datetime.now()
 
         news_item_metric = NewsItemMetric()
@@ -31,23 +64,19 @@ class Command(BaseCommand):
                 now.year, int(now.month), int(now.day)
             )
         })
-        accuracy_total = round(accuracy_total)
+        if accuracy_total is not None:
+            accuracy_total = round(accuracy_total)
 
-        news_items_count = NewsItem.objects.all().count()
+        news_items_count, news_item_id_settled, news_items_settled_count = self.count_news_items(full)
         news_items_not_scored_count = NewsItem.objects.filter(score=None).count()
         corpora_count = Corpus.objects.filter(active=True).count()
         sources_count = Source.objects.filter(active=True).count()
 
         # news_items pending classification
-        connection = pika.BlockingConnection(pika.ConnectionParameters(host=settings.QUEUE_HOSTNAME))
-        channel = connection.channel()
-        queue = channel.queue_declare(
-            queue=settings.QUEUE_NAME_CLASSIFY,
-            durable=True,
-            exclusive=False,
-            auto_delete=False
-        )
-        pending_classify_count = queue.method.message_count
+        try:
+            pending_classify_count = publisher.get_message_count(settings.QUEUE_NAME_CLASSIFY)
+        finally:
+            publisher.close()
 
         statistic = Statistic()
         statistic.accuracy_total = accuracy_total
@@ -56,6 +85,14 @@ class Command(BaseCommand):
         statistic.news_items_not_scored_count = news_items_not_scored_count
         statistic.corpora_count = corpora_count
         statistic.sources_count = sources_count
+        statistic.news_item_id_settled = news_item_id_settled
+        statistic.news_items_settled_count = news_items_settled_count
         statistic.save()
+        Statistic.set_latest(statistic)
+
+        # only the latest stats are shown, the ones of every minute are not kept for long
+        Statistic.objects.filter(
+            created_at__lt=timezone.now() - timedelta(days=settings.STATS_RETENTION_DAYS)
+        ).delete()
 
         self.logger.info('Stats pre-calculated!')
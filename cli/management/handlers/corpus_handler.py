@@ -1,12 +1,28 @@
 from core.models.corpus import Corpus
+from core.models.newsitem_daily_metric import NewsItemDailyMetric
 
 
 class CorpusHandler:
 
     def run(self, queue_item, classification):
+        corpus = self.create(queue_item, classification)
+        if corpus:
+            corpus.save()
+            NewsItemDailyMetric.refresh_news_items([queue_item.id])
+
+    def run_many(self, items):
+        corpora = [self.create(queue_item, classification) for queue_item, classification in items]
+        corpora = [corpus for corpus in corpora if corpus]
+        if corpora:
+            Corpus.objects.bulk_create(corpora)
+            NewsItemDailyMetric.refresh_news_items([corpus.news_item_id for corpus in corpora])
+
+    @staticmethod
+    def create(queue_item, classification):
         if classification == 'pos':
             corpus = Corpus()
             corpus.news_item = queue_item
             corpus.positive = True
             corpus.active = False
-            corpus.save()
+            return corpus
+        return None
@@ -1,11 +1,44 @@
 from django.conf import settings
 
+from core import news_cache
+from core.messaging.publisher import publisher
+from core.messaging.train_message import TrainMessage
+from core.models.newsitem import NewsItem
+from core.models.newsitem_daily_metric import NewsItemDailyMetric
+
 
 class PublishHandler:
 
     def run(self, queue_item, classification):
+        self.classify(queue_item, classification)
+        queue_item.save(update_fields=['score', 'published'])
+        NewsItemDailyMetric.refresh_news_items([queue_item.id])
+        if queue_item.published:
+            news_cache.invalidate()
+        self.enqueue_neutral([queue_item])
+
+    def run_many(self, items):
+        queue_items = [self.classify(queue_item, classification) for queue_item, classification in items]
+        if queue_items:
+            NewsItem.objects.bulk_update(queue_items, ['score', 'published'])
+            NewsItemDailyMetric.refresh_news_items([queue_item.id for queue_item in queue_items])
+        if any(queue_item.published for queue_item in queue_items):
+            news_cache.invalidate()
+        self.enqueue_neutral(queue_items)
+
+    @staticmethod
+    def enqueue_neutral(queue_items):
+        # the positive news items left unpublished are trained as neutral
+        news_item_ids = [
+            queue_item.id for queue_item in queue_items if queue_item.score == 1 and not queue_item.published
+        ]
+        if news_item_ids:
+            publisher.publish(settings.QUEUE_NAME_TRAIN, TrainMessage.encode(news_item_ids))
+
+    @staticmethod
+    def classify(queue_item, classification):
         queue_item.score = 1 if classification == 'pos' else 0
         queue_item.published = False
         if settings.AUTO_PUBLISH and classification == 'pos':
             queue_item.published = True
-        queue_item.save()
+        return queue_item
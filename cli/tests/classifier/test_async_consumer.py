@@ -0,0 +1,165 @@
+import asyncio
+import mock
+
+from django.conf import settings
+from django.test import TestCase, override_settings
+
+from core.messaging.classify_message import ClassifyMessage
+from core.messaging.train_message import TrainMessage
+from core.models.newsitem import NewsItem
+from cli.management.classifier.async_consumer import AsyncConsumer
+from cli.management.commands import classify
+
+
+@override_settings(CLASSIFY_BATCH_SIZE=2)
+class AsyncConsumerTestCase(TestCase):
+    def setUp(self):
+        self.command = classify.Command()
+        self.command.logger = mock.MagicMock()
+        self.command.classifier = mock.MagicMock()
+        self.command.classify_batch = mock.MagicMock(side_effect=lambda batch: [
+            (queue_item, 'pos') for _, queue_item, _ in batch
+        ])
+        self.command.train = mock.MagicMock(return_value=True)
+
+        self.loop = asyncio.new_event_loop()
+        self.consumer = AsyncConsumer(self.command, self.loop)
+        self.consumer.channel_classify = mock.MagicMock()
+        self.consumer.channel_train = mock.MagicMock()
+
+        news_item = NewsItem()
+        news_item.title = 'foo'
+        news_item.save()
+        self.body = ClassifyMessage.encode(news_item, False)
+
+    def tearDown(self):
+        self.consumer.executor_classify.shutdown()
+        self.consumer.executor_train.shutdown()
+        self.loop.close()
+
+    def wait(self, futures):
+        futures = [future for future in futures if future is not None]
+        if futures:
+            self.loop.run_until_complete(asyncio.wait(futures))
+        # run the callbacks of the futures done
+        self.loop.run_until_complete(asyncio.sleep(0))
+
+    def deliver(self, callback, channel, delivery_tag, body):
+        method = mock.MagicMock()
+        method.delivery_tag = delivery_tag
+        callback(channel, method, mock.MagicMock(), body)
+
+    def test_on_classify_message_classifies_full_batch_in_executor_and_acknowledges_it(self):
+        channel = self.consumer.channel_classify
+
+        self.deliver(self.consumer.on_classify_message, channel, 1, self.body)
+        # the batch is not full yet
+        self.assertEquals(1, len(self.consumer.batch))
+        self.assertEquals(0, len(self.consumer.batches_classifying))
+
+        self.deliver(self.consumer.on_classify_message, channel, 2, self.body)
+        self.wait(list(self.consumer.batches_classifying))
+
+        self.command.classify_batch.assert_called_once()
+        self.assertEquals(2, len(self.command.classify_batch.call_args[0][0]))
+        channel.basic_ack.assert_called_once_with(delivery_tag=2, multiple=True)
+        self.assertEquals([], self.consumer.batch)
+        self.assertEquals(None, self.consumer.batch_timeout)
+
+    def test_flush_batch_classifies_incomplete_batch(self):
+        channel = self.consumer.channel_classify
+        self.deliver(self.consumer.on_classify_message, channel, 1, self.body)
+        self.assertNotEquals(None, self.consumer.batch_timeout)
+
+        # what the scheduled timeout calls
+        self.consumer.flush_batch()
+        self.wait(list(self.consumer.batches_classifying))
+
+        channel.basic_ack.assert_called_once_with(delivery_tag=1, multiple=True)
+
+    def test_on_batch_classified_rejects_batch_when_classification_fails(self):
+        channel = self.consumer.channel_classify
+        self.command.classify_batch = mock.MagicMock(return_value=None)
+
+        self.deliver(self.consumer.on_classify_message, channel, 1, self.body)
+        self.deliver(self.consumer.on_classify_message, channel, 2, self.body)
+        self.wait(list(self.consumer.batches_classifying))
+
+        channel.basic_ack.assert_not_called()
+        channel.basic_nack.assert_called_once_with(delivery_tag=2, multiple=True)
+
+    def test_on_classify_message_rejects_message_that_is_not_json(self):
+        channel = self.consumer.channel_classify
+
+        self.deliver(self.consumer.on_classify_message, channel, 1, 'foo')
+
+        channel.basic_nack.assert_called_once_with(delivery_tag=1)
+        self.assertEquals([], self.consumer.batch)
+
+    def test_on_train_message_merges_messages_received_while_training(self):
+        channel = self.consumer.channel_train
+
+        self.deliver(self.consumer.on_train_message, channel, 1, TrainMessage.encode([1]))
+        training = self.consumer.training
+        # received while the first training runs
+        self.deliver(self.consumer.on_train_message, channel, 2, TrainMessage.encode([2]))
+        self.deliver(self.consumer.on_train_message, channel, 3, TrainMessage.encode([3]))
+        self.wait([training])
+        self.wait([self.consumer.training])
+
+        self.assertEquals([mock.call({1}), mock.call({2, 3})], self.command.train.call_args_list)
+        self.assertEquals(
+            [mock.call(delivery_tag=1, multiple=True), mock.call(delivery_tag=3, multiple=True)],
+            channel.basic_ack.call_args_list
+        )
+
+    def test_on_trained_rejects_messages_after_delay_when_training_fails(self):
+        channel = self.consumer.channel_train
+        self.command.train = mock.MagicMock(side_effect=[False, True])
+        self.loop.call_later = mock.MagicMock()
+
+        self.deliver(self.consumer.on_train_message, channel, 1, TrainMessage.encode([1]))
+        self.wait([self.consumer.training])
+        # received while waiting to reject the failed messages
+        self.deliver(self.consumer.on_train_message, channel, 2, TrainMessage.encode([2]))
+
+        self.command.train.assert_called_once_with({1})
+        channel.basic_ack.assert_not_called()
+        channel.basic_nack.assert_not_called()
+        self.assertEquals(10, self.loop.call_later.call_args[0][0])
+
+        # what the scheduled delay calls
+        self.loop.call_later.call_args[0][1](*self.loop.call_later.call_args[0][2:])
+        self.wait([self.consumer.training])
+
+        channel.basic_nack.assert_called_once_with(delivery_tag=1, multiple=True)
+        self.assertEquals([mock.call({1}), mock.call({2})], self.command.train.call_args_list)
+        channel.basic_ack.assert_called_once_with(delivery_tag=2, multiple=True)
+
+    def test_on_trained_does_not_acknowledge_messages_when_training_raises(self):
+        channel = self.consumer.channel_train
+        self.command.train = mock.MagicMock(side_effect=OSError('foo'))
+        self.loop.call_later = mock.MagicMock()
+
+        self.deliver(self.consumer.on_train_message, channel, 1, TrainMessage.encode([1]))
+        self.wait([self.consumer.training])
+
+        channel.basic_ack.assert_not_called()
+        self.loop.call_later.assert_called_once()
+        self.command.logger.error.assert_called_once()
+
+    def test_stop_cancels_consumers_and_closes_connection_once_batch_is_acknowledged(self):
+        channel = self.consumer.channel_classify
+        self.consumer.consumer_tags[settings.QUEUE_NAME_CLASSIFY] = (channel, 'foo')
+        self.consumer.connection = mock.MagicMock()
+        self.deliver(self.consumer.on_classify_message, channel, 1, self.body)
+
+        self.consumer.stop()
+        # the connection stays open while the batch is classified
+        channel.basic_cancel.assert_called_once_with(consumer_tag='foo')
+        self.consumer.connection.close.assert_not_called()
+
+        self.wait(list(self.consumer.batches_classifying))
+
+        channel.basic_ack.assert_called_once_with(delivery_tag=1, multiple=True)
+        self.consumer.connection.close.assert_called_once()
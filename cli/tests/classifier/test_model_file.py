@@ -0,0 +1,110 @@
+import json
+import os
+import shutil
+import tempfile
+
+from django.test import TestCase
+
+from cli.management.classifier import model_file
+from cli.management.classifier.naive_bayes import NaiveBayes
+from cli.management.classifier.training_set import TrainingSet
+
+
+class ModelFileTestCase(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.filepath = os.path.join(self.directory, 'dump.bin')
+
+        self.training_set = TrainingSet()
+        self.training_set.set_news_item(1, [('rescue dog finds home', 'pos')])
+        self.training_set.set_news_item(2, [('storm destroys homes', 'neg')])
+        self.training_set.set_news_item(3, [('dog wins award', 'pos'), ('dog wins award', 'neg')])
+        self.classifier = NaiveBayes.train(self.training_set.get_labeled_titles())
+        self.classifier.training_set = self.training_set
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_load_returns_classifier_dumped(self):
+        model_file.dump(self.classifier, self.filepath)
+
+        classifier = model_file.load(self.filepath)
+
+        self.assertTrue(model_file.is_model_file(self.filepath))
+        self.assertEquals(self.classifier.labels, classifier.labels)
+        self.assertEquals(self.classifier.vocabulary, classifier.vocabulary)
+        self.assertEquals(self.classifier.word_counts.tolist(), classifier.word_counts.tolist())
+        self.assertEquals(self.classifier.delta.tolist(), classifier.delta.tolist())
+        self.assertEquals(self.classifier.classify('dog home'), classifier.classify('dog home'))
+        self.assertEquals(self.training_set.news_items, classifier.training_set.news_items)
+        self.assertEquals(self.training_set.labeled_titles, classifier.training_set.labeled_titles)
+
+    def test_load_maps_the_arrays_of_the_file_read_only(self):
+        model_file.dump(self.classifier, self.filepath)
+
+        classifier = model_file.load(self.filepath, with_training_set=False)
+
+        self.assertFalse(classifier.delta.flags.writeable)
+        self.assertEquals(None, classifier.training_set)
+        # an update does not write to the mapped file
+        classifier_updated = classifier.update([('dog home', 'neg')], list())
+        self.assertEquals(3, classifier_updated.label_counts[classifier_updated.labels.index('neg')])
+
+    def test_load_returns_empty_classifier_dumped(self):
+        model_file.dump(NaiveBayes.train(list()), self.filepath)
+
+        classifier = model_file.load(self.filepath)
+
+        self.assertEquals(None, classifier.classify('foo'))
+
+    def test_load_raises_value_error_when_file_is_truncated(self):
+        model_file.dump(self.classifier, self.filepath)
+        with open(self.filepath, 'r+b') as file:
+            file.truncate(os.path.getsize(self.filepath) // 2)
+
+        with self.assertRaises(ValueError):
+            model_file.load(self.filepath)
+
+    def test_load_raises_value_error_when_header_misses_blocks(self):
+        header = json.dumps({'labels': ['pos'], 'blocks': {'vocabulary': {'offset': 0, 'size': 0}}}).encode()
+        with open(self.filepath, 'wb') as file:
+            file.write(model_file.PREFIX.pack(model_file.MAGIC, model_file.FORMAT_VERSION, len(header)))
+            file.write(header)
+
+        with self.assertRaises(ValueError):
+            model_file.load(self.filepath)
+
+    def test_load_raises_value_error_when_header_is_not_an_object(self):
+        header = json.dumps(['foo']).encode()
+        with open(self.filepath, 'wb') as file:
+            file.write(model_file.PREFIX.pack(model_file.MAGIC, model_file.FORMAT_VERSION, len(header)))
+            file.write(header)
+
+        with self.assertRaises(ValueError):
+            model_file.load(self.filepath)
+
+    def test_load_raises_value_error_when_file_is_not_a_model_file(self):
+        with open(self.filepath, 'wb') as file:
+            file.write(b'foo')
+
+        self.assertFalse(model_file.is_model_file(self.filepath))
+        with self.assertRaises(ValueError):
+            model_file.load(self.filepath)
+
+    def test_dump_keeps_previous_file_when_writing_fails(self):
+        model_file.dump(self.classifier, self.filepath)
+
+        with self.assertRaises(RuntimeError):
+            with model_file.atomic_file(self.filepath) as file:
+                file.write(b'foo')
+                raise RuntimeError('foo')
+
+        # the previous file is intact and no temporary file is left behind
+        self.assertEquals(self.classifier.labels, model_file.load(self.filepath).labels)
+        self.assertEquals(['dump.bin'], os.listdir(self.directory))
+
+    def test_get_training_set_hash_does_not_depend_on_order(self):
+        self.assertEquals(
+            model_file.get_training_set_hash([('foo', 'pos'), ('bar', 'neg')]),
+            model_file.get_training_set_hash([('bar', 'neg'), ('foo', 'pos')])
+        )
@@ -0,0 +1,67 @@
+from django.test import TestCase
+from textblob.classifiers import NaiveBayesClassifier
+
+from cli.management.classifier import naive_bayes
+from cli.management.classifier.naive_bayes import NaiveBayes
+from cli.management.classifier.text_normalizer import get_text_normalizer
+
+
+class NaiveBayesTestCase(TestCase):
+    def setUp(self):
+        # retain the original imported values
+        naive_bayes.UPDATE_CHUNK_SIZE_real = naive_bayes.UPDATE_CHUNK_SIZE
+
+        self.training_set = [
+            ('rescue dog finds home', 'pos'),
+            ('volunteers rebuild school', 'pos'),
+            ('community garden blooms again', 'pos'),
+            ('dog wins award for bravery', 'pos'),
+            ('storm destroys homes', 'neg'),
+            ('school closed after fire', 'neg'),
+            ('prices rise again', 'neg'),
+            ('fire destroys community hall', 'neg'),
+            ('award ceremony cancelled', 'neutral'),
+        ]
+        self.titles = [
+            'dog rescued from fire',
+            'community school wins award',
+            'storm again',
+            'nothing known here',
+            '',
+        ]
+
+    def tearDown(self):
+        # revert the values to the original imported
+        naive_bayes.UPDATE_CHUNK_SIZE = naive_bayes.UPDATE_CHUNK_SIZE_real
+
+    def test_classify_returns_same_class_as_textblob_classifier(self):
+        classifier = NaiveBayes.train(self.training_set)
+        # textblob tokenizes strings with punkt, so give it the same tokens
+        tokenize = get_text_normalizer().tokenize
+        textblob_classifier = NaiveBayesClassifier([(tokenize(title), label) for title, label in self.training_set])
+
+        for title in self.titles:
+            self.assertEquals(textblob_classifier.classify(tokenize(title)), classifier.classify(title))
+
+    def test_classify_many_returns_same_classes_as_classify(self):
+        classifier = NaiveBayes.train(self.training_set)
+
+        self.assertEquals([classifier.classify(title) for title in self.titles], classifier.classify_many(self.titles))
+
+    def test_classify_returns_none_when_trained_without_corpora(self):
+        classifier = NaiveBayes.train([])
+
+        self.assertEquals(None, classifier.classify('foo'))
+        self.assertEquals([None, None], classifier.classify_many(['foo', 'bar']))
+
+    def test_train_returns_same_model_when_words_are_counted_in_chunks(self):
+        classifier = NaiveBayes.train(self.training_set)
+        # a chunk is added every few titles
+        naive_bayes.UPDATE_CHUNK_SIZE = 5
+
+        # the method being tested
+        classifier_chunked = NaiveBayes.train(self.training_set)
+
+        self.assertEquals(classifier.labels, classifier_chunked.labels)
+        self.assertEquals(classifier.vocabulary, classifier_chunked.vocabulary)
+        self.assertEquals(classifier.word_counts.tolist(), classifier_chunked.word_counts.tolist())
@@ -0,0 +1,42 @@
+from django.test import TestCase
+
+from cli.management.classifier.result_cache import ResultCache
+
+
+class ResultCacheTestCase(TestCase):
+    def test_get_returns_result_set_and_counts_hits_and_misses(self):
+        result_cache = ResultCache(2)
+
+        self.assertEquals(None, result_cache.get(('foo', 1)))
+        result_cache.set(('foo', 1), 'pos')
+
+        self.assertEquals('pos', result_cache.get(('foo', 1)))
+        self.assertEquals(None, result_cache.get(('foo', 2)))
+        self.assertEquals(1, result_cache.hits)
+        self.assertEquals(2, result_cache.misses)
+
+    def test_set_evicts_least_recently_used_result(self):
+        result_cache = ResultCache(2)
+        result_cache.set(('foo', 1), 'pos')
+        result_cache.set(('bar', 1), 'neg')
+        result_cache.get(('foo', 1))
+
+        result_cache.set(('baz', 1), 'neu')
+
+        self.assertEquals('pos', result_cache.get(('foo', 1)))
+        self.assertEquals(None, result_cache.get(('bar', 1)))
+        self.assertEquals('neu', result_cache.get(('baz', 1)))
+
+    def test_set_does_nothing_when_cache_is_disabled(self):
+        result_cache = ResultCache(0)
+        result_cache.set(('foo', 1), 'pos')
+
+        self.assertEquals(None, result_cache.get(('foo', 1)))
+
+    def test_clear_removes_all_results(self):
+        result_cache = ResultCache(2)
+        result_cache.set(('foo', 1), 'pos')
+
+        result_cache.clear()
+
+        self.assertEquals(None, result_cache.get(('foo', 1)))
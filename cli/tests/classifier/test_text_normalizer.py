@@ -0,0 +1,37 @@
+from django.test import TestCase
+
+from cli.management.classifier import text_normalizer
+from cli.management.classifier.text_normalizer import TextNormalizer
+
+
+class TextNormalizerTestCase(TestCase):
+    def test_get_stopwords_returns_not_filtered_stopword(self):
+        stopwords = text_normalizer.get_stopwords()
+        self.assertTrue('ourselves' in stopwords)
+
+    def test_get_stopwords_does_not_return_filtered_stopword(self):
+        stopwords = text_normalizer.get_stopwords()
+        self.assertFalse('against' in stopwords)
+
+    def test_tokenize_returns_lowercase_words_without_punctuation_and_stopwords(self):
+        normalizer = TextNormalizer(['when', 'then', 'the'])
+
+        self.assertEquals(('foo', 'bar', "isn't", 'baz'), normalizer.tokenize('When Foo, then bar: The isn\'t baz!'))
+
+    def test_normalize_returns_tokens_joined(self):
+        normalizer = TextNormalizer(['when', 'then'])
+
+        self.assertEquals('foo bar', normalizer.normalize('when foo then bar'))
+        # normalizing a normalized title changes nothing
+        self.assertEquals('foo bar', normalizer.normalize(normalizer.normalize('when foo then bar')))
+
+    def test_tokenize_caches_tokens_of_repeated_titles(self):
+        normalizer = TextNormalizer(['when'], cache_size=10)
+
+        normalizer.tokenize('when foo')
+        normalizer.tokenize('when foo')
+
+        self.assertEquals(1, normalizer.tokenize.cache_info().hits)
+
+    def test_get_text_normalizer_builds_the_normalizer_once(self):
+        self.assertIs(text_normalizer.get_text_normalizer(), text_normalizer.get_text_normalizer())
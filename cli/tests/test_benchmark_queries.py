@@ -0,0 +1,27 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from core.models.corpus import Corpus
+from core.models.newsitem import NewsItem
+from core.models.source import Source
+
+
+class CommandTestCase(TestCase):
+
+    def test_handle_explains_queries_on_synthetic_dataset_and_rolls_it_back(self):
+        stdout = StringIO()
+
+        # the method being tested
+        call_command('benchmark_queries', news_items=50, repeat=1, stdout=stdout)
+
+        output = stdout.getvalue()
+        self.assertIn('== NewsItem.exists', output)
+        self.assertIn('== NewsItem.find_positive', output)
+        self.assertIn('== NewsItemMetric.get_accuracy', output)
+        self.assertIn('median', output)
+        # the synthetic dataset was removed
+        self.assertEquals(0, NewsItem.objects.count())
+        self.assertEquals(0, Corpus.objects.count())
+        self.assertEquals(0, Source.objects.count())
@@ -1,17 +1,29 @@
 import mock
+import os
+import shutil
+import tempfile
 from pika.exceptions import ChannelClosed, DuplicateConsumerTag, NoFreeChannels
 
 from django.conf import settings
 from django.core import serializers
 from django.core.serializers.base import DeserializationError
 from django.db.utils import DatabaseError
-from django.test import TestCase
+from django.test import TestCase, override_settings
 
+from core.messaging.classify_message import ClassifyMessage
+from core.messaging.train_message import TrainMessage
 from core.models.corpus import Corpus
 from core.models.newsitem import NewsItem
 from cli.management.commands import classify
+from cli.management.handlers import publish_handler
 
 
+@override_settings(CACHES={
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+    # not the file based caches shared with the running application
+    'news': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'news'},
+    'stats': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'stats'},
+})
 class CommandTestCase(TestCase):
 
     command = None
@@ -26,7 +38,18 @@ class CommandTestCase(TestCase):
 
     def setUp(self):
         # retain the original imported packages
-        classify.serializers_real = classify.serializers
+        classify.ClassifyMessage.decode_real = classify.ClassifyMessage.decode
+        classify.threading.Thread_real = classify.threading.Thread
+        publish_handler.publisher_real = publish_handler.publisher
+        classify.time_real = classify.time
+
+        # mock the publisher of the train messages of the neutral news items
+        publish_handler.publisher = mock.MagicMock()
+
+        # the classifier is dumped to a directory of the test, not to the one mounted in the classifier container
+        self.directory = tempfile.mkdtemp()
+        self.settings_dump = override_settings(CLASSIFIER_DUMP_FILEPATH=os.path.join(self.directory, 'dump.bin'))
+        self.settings_dump.enable()
 
         # mock the tread target methods
         self.thread_classify = mock.MagicMock()
@@ -49,11 +72,15 @@ class CommandTestCase(TestCase):
         classify.NaiveBayesClassifier = mock.MagicMock()
 
         classify.settings.AUTO_PUBLISH = False
+        classify.settings.CLASSIFY_BATCH_SIZE = 1
+        classify.settings.CLASSIFIER_BACKEND = 'naive_bayes'
 
         # a fake news item to be used as classification input
         news_item = NewsItem()
         news_item.title = 'foo'
-        self.serialized_news_item = serializers.serialize('json', [news_item])
+        news_item.save()
+        self.serialized_news_item = ClassifyMessage.encode(news_item, False)
+        self.serialized_news_item_legacy = serializers.serialize('json', [news_item])
 
         news_item = NewsItem()
         news_item.title = 'foo'
@@ -68,20 +95,28 @@ class CommandTestCase(TestCase):
 
     def tearDown(self):
         # revert the packages to the original imported
-        classify.serializers = classify.serializers_real
+        classify.ClassifyMessage.decode = classify.ClassifyMessage.decode_real
+        classify.threading.Thread = classify.threading.Thread_real
+        publish_handler.publisher = publish_handler.publisher_real
+        classify.time = classify.time_real
+        self.settings_dump.disable()
+        shutil.rmtree(self.directory)
 
         # revert class properties to the initial values
         self.command.classifier = None
+        self.command.model_version = None
+        self.command.classifier_version = 0
 
     def test_handle_fails_when_classifier_training_fails(self):
-        # force method to raise an exception
-        self.command.get_classifier = mock.MagicMock(side_effect=DatabaseError('foo'))
+        # force the query of the corpora to raise an exception
+        self.command.get_training_items = mock.MagicMock(side_effect=DatabaseError('foo'))
 
         # call the method being tested
         self.command.handle()
 
         # starting of training the classifier and failure are logged
-        self.logger.info.assert_called_once_with('Training classifier...')
+        self.logger.info.assert_any_call('Classifier dump not found.')
+        self.logger.info.assert_called_with('Training classifier...')
         self.logger.error.assert_called_once_with('Failed to train the classifier.')
         # threads not started
         self.thread_classify.assert_not_called()
@@ -91,7 +126,6 @@ class CommandTestCase(TestCase):
         # mock methods
         channel = mock.MagicMock()
         self.command.get_channel = mock.MagicMock(return_value=channel)
-        self.command.get_classifier = mock.MagicMock()
 
         # call the method being tested
         self.command.handle()
@@ -107,6 +141,125 @@ class CommandTestCase(TestCase):
         self.thread_classify.start.assert_called_once()
         self.thread_train.start.assert_called_once()
 
+    def test_handle_supervises_worker_processes_when_workers_option_is_set(self):
+        self.command.get_channel = mock.MagicMock(return_value=mock.MagicMock())
+        self.command.get_classifier = mock.MagicMock()
+        self.command.supervise = mock.MagicMock()
+
+        # call the method being tested
+        self.command.handle(workers=2)
+
+        # the workers are supervised instead of starting the classify thread
+        self.command.supervise.assert_called_once_with(2)
+        self.thread_classify.start.assert_not_called()
+
+    def test_handle_runs_asyncio_consumer_when_asyncio_option_is_set(self):
+        self.command.get_channel = mock.MagicMock(return_value=mock.MagicMock())
+        self.command.get_classifier = mock.MagicMock()
+        async_consumer_real = classify.AsyncConsumer
+        classify.AsyncConsumer = mock.MagicMock()
+
+        try:
+            # call the method being tested
+            self.command.handle(asyncio=True)
+
+            # both queues are consumed by the asyncio consumer instead of the threads
+            classify.AsyncConsumer.assert_called_once_with(self.command)
+            classify.AsyncConsumer.return_value.run.assert_called_once()
+            self.thread_classify.start.assert_not_called()
+            self.thread_train.start.assert_not_called()
+        finally:
+            classify.AsyncConsumer = async_consumer_real
+
+    def test_supervise_workers_starts_missing_and_restarts_exited_workers(self):
+        classify.multiprocessing_real = classify.multiprocessing
+        context = mock.MagicMock()
+        classify.multiprocessing = mock.MagicMock()
+        classify.multiprocessing.get_context = mock.MagicMock(return_value=context)
+
+        # a running and an exited worker
+        process_alive = mock.MagicMock()
+        process_alive.is_alive = mock.MagicMock(return_value=True)
+        process_exited = mock.MagicMock()
+        process_exited.is_alive = mock.MagicMock(return_value=False)
+        processes = {0: process_alive, 1: process_exited}
+
+        try:
+            # call the method being tested
+            self.command.supervise_workers(processes, 3)
+        finally:
+            classify.multiprocessing = classify.multiprocessing_real
+
+        # the exited worker was replaced and the missing one started
+        self.assertEquals(2, context.Process.call_count)
+        self.assertEquals(process_alive, processes[0])
+        self.assertEquals(context.Process.return_value, processes[1])
+        self.assertEquals(context.Process.return_value, processes[2])
+        self.logger.warning.assert_called_once()
+
+    def test_supervise_forks_first_workers_before_starting_train_thread(self):
+        calls = list()
+        self.command.supervise_workers = mock.MagicMock(side_effect=lambda processes, workers: calls.append('fork'))
+        # the supervisor starts only the train thread, which is the first thread mocked
+        self.thread_classify.start = mock.MagicMock(side_effect=lambda: calls.append('train'))
+        classify.multiprocessing_real = classify.multiprocessing
+        classify.multiprocessing = mock.MagicMock()
+        # stop supervising after the first interval
+        classify.time = mock.MagicMock()
+        classify.time.sleep = mock.MagicMock(side_effect=KeyboardInterrupt())
+
+        try:
+            with self.assertRaises(KeyboardInterrupt):
+                # call the method being tested
+                self.command.supervise(2)
+        finally:
+            classify.multiprocessing = classify.multiprocessing_real
+
+        self.assertEquals(['fork', 'train'], calls)
+
+    def test_supervise_workers_does_not_fork_while_training(self):
+        classify.multiprocessing_real = classify.multiprocessing
+        context = mock.MagicMock()
+        classify.multiprocessing = mock.MagicMock()
+        classify.multiprocessing.get_context = mock.MagicMock(return_value=context)
+        context.Process.return_value.start = mock.MagicMock(
+            side_effect=lambda: self.assertFalse(self.command.train_lock.acquire(blocking=False))
+        )
+
+        try:
+            # call the method being tested
+            self.command.supervise_workers(dict(), 1)
+        finally:
+            classify.multiprocessing = classify.multiprocessing_real
+
+        # the worker was forked holding the lock of the training
+        context.Process.return_value.start.assert_called_once()
+        self.assertFalse(self.command.train_lock.locked())
+
+    def test_reload_classifier_loads_dump_when_supervisor_retrained_the_classifier(self):
+        self.command.model_version = mock.MagicMock()
+        self.command.model_version.value = 2
+        self.command.worker_model_version = 1
+        self.command.load_classifier = mock.MagicMock(return_value='foo')
+
+        # call the method being tested
+        self.command.reload_classifier()
+
+        # the new classifier is used from now on
+        self.assertEquals('foo', self.command.classifier)
+        self.assertEquals(2, self.command.worker_model_version)
+
+    def test_reload_classifier_does_nothing_when_classifier_is_up_to_date(self):
+        self.command.model_version = mock.MagicMock()
+        self.command.model_version.value = 1
+        self.command.worker_model_version = 1
+        self.command.load_classifier = mock.MagicMock()
+
+        # call the method being tested
+        self.command.reload_classifier()
+
+        self.command.load_classifier.assert_not_called()
+
     def test_classify_consumer_handles_exception_when_starting_consuming_the_queue(self):
         # mock channel and force to raise an exception
         channel = mock.MagicMock()
@@ -119,7 +272,9 @@ class CommandTestCase(TestCase):
         self.command.classify_consumer()
 
         # the queue consumer was tried to get fetched
-        self.command.get_consumer.assert_called_once_with(settings.QUEUE_NAME_CLASSIFY, self.command.classify_decorator)
+        self.command.get_consumer.assert_called_once_with(
+            settings.QUEUE_NAME_CLASSIFY, self.command.classify_decorator, settings.CLASSIFY_BATCH_SIZE
+        )
         # consuming messages from queue was started
         channel.start_consuming.assert_called_once()
         # error was logged
@@ -135,7 +290,9 @@ class CommandTestCase(TestCase):
         self.command.classify_consumer()
 
         # the queue consumer was tried to get fetched
-        self.command.get_consumer.assert_called_once_with(settings.QUEUE_NAME_CLASSIFY, self.command.classify_decorator)
+        self.command.get_consumer.assert_called_once_with(
+            settings.QUEUE_NAME_CLASSIFY, self.command.classify_decorator, settings.CLASSIFY_BATCH_SIZE
+        )
         # consuming messages from queue was started
         channel.start_consuming.assert_called_once()
         # no error was logged
@@ -275,27 +432,21 @@ class CommandTestCase(TestCase):
         self.assertNotEquals(None, channel)
 
     def test_get_classifier_returns_empty_naive_bayes_classifier_when_no_corpora(self):
-        # mock the shuffle list method
-        classify.shuffle = mock.MagicMock()
-        # regenerate the command class being tested as we mocked an extra module above
-        self.command = classify.Command()
-
+        classify.settings.CLASSIFIER_BACKEND = 'textblob'
+        # the mocked textblob classifier cannot be pickled
+        self.command.dump_classifier = mock.MagicMock()
         # call the method being tested
         classifier = self.command.get_classifier()
 
-        # shuffled an empty list of corpora
-        classify.shuffle.assert_called_once_with([])
         # a classifier with empty corpora was created
         classify.NaiveBayesClassifier.assert_called_once_with([])
         # the method returned a non-empty result
         self.assertTrue(classifier != None)
 
     def test_get_classifier_returns_naive_bayes_classifier_with_corpora_when_corpora_exist(self):
-        # mock the shuffle list method
-        classify.shuffle = mock.MagicMock()
-        # regenerate the command class being tested as we mocked an extra module above
-        self.command = classify.Command()
-
+        classify.settings.CLASSIFIER_BACKEND = 'textblob'
+        # the mocked textblob classifier cannot be pickled
+        self.command.dump_classifier = mock.MagicMock()
         # create a dummy news item and corpus
         news_item = NewsItem()
         news_item.title = 'foo'
@@ -309,19 +460,59 @@ class CommandTestCase(TestCase):
         # call the method being tested
         classifier = self.command.get_classifier()
 
-        # shuffled the corpora
-        classify.shuffle.assert_called_once_with([('foo', 'pos')])
         # a classifier with corpora was created
         classify.NaiveBayesClassifier.assert_called_once_with([('foo', 'pos')])
         # the method returned a non-empty result
         self.assertTrue(classifier != None)
 
-    def test_get_classifier_uses_unique_corpora(self):
-        # mock the shuffle list method
-        classify.shuffle = mock.MagicMock()
-        # regenerate the command class being tested as we mocked an extra module above
-        self.command = classify.Command()
+    def test_get_classifier_returns_vectorized_naive_bayes_classifier_by_default(self):
+        # create dummy news items and corpora of both classes
+        for title, positive in (('foo bar', True), ('baz qux', False)):
+            news_item = NewsItem()
+            news_item.title = title
+            news_item.save()
+
+            corpus = Corpus()
+            corpus.news_item = news_item
+            corpus.positive = positive
+            corpus.save()
+
+        # call the method being tested
+        classifier = self.command.get_classifier()
+
+        # the textblob classifier was not used
+        classify.NaiveBayesClassifier.assert_not_called()
+        self.assertIsInstance(classifier, classify.NaiveBayes)
+        self.assertEquals('pos', classifier.classify('foo'))
+        self.assertEquals('neg', classifier.classify('qux'))
+
+    def test_get_training_items_loads_corpora_and_neutral_news_items_with_one_query_each(self):
+        for title, positive in (('foo', True), ('bar', False), ('baz', True)):
+            news_item = NewsItem()
+            news_item.title = title
+            news_item.save()
+
+            corpus = Corpus()
+            corpus.news_item = news_item
+            corpus.positive = positive
+            corpus.save()
+
+        news_item_neutral = NewsItem()
+        news_item_neutral.title = 'qux'
+        news_item_neutral.score = 1
+        news_item_neutral.save()
 
+        # call the method being tested
+        with self.assertNumQueries(2):
+            training_items = list(self.command.get_training_items())
+
+        self.assertEquals(
+            [('foo', 'pos'), ('bar', 'neg'), ('baz', 'pos'), ('qux', 'neu')],
+            [labeled_title for _, labeled_title in training_items]
+        )
+        self.assertEquals((news_item_neutral.id, ('qux', 'neu')), training_items[-1])
+
+    def test_get_classifier_uses_unique_corpora(self):
         # create dummy news items and corpora with same title and classification
         for index in range(1, 3):
             news_item = NewsItem()
@@ -340,15 +531,10 @@ class CommandTestCase(TestCase):
         # call the method being tested
         classifier = self.command.get_classifier()
 
-        # shuffled the corpora with only one of the identical corpora
-        classify.shuffle.assert_called_once_with([('foo', 'pos')])
+        # trained with only one of the identical corpora
+        self.assertEquals([('foo', 'pos')], classifier.training_set.get_labeled_titles())
 
     def test_get_classifier_uses_corpora_clean_of_stopwords(self):
-        # mock the shuffle list method
-        classify.shuffle = mock.MagicMock()
-        # regenerate the command class being tested as we mocked an extra module above
-        self.command = classify.Command()
-
         # create dummy news item (having title that contains stopwords) and corpora
         news_item = NewsItem()
         news_item.title = 'when foo then bar'
@@ -362,8 +548,8 @@ class CommandTestCase(TestCase):
         # call the method being tested
         classifier = self.command.get_classifier()
 
-        # shuffled the corpora with only one of the identical corpora
-        classify.shuffle.assert_called_once_with([('foo bar', 'pos')])
+        # trained with the title clean of stopwords
+        self.assertEquals([('foo bar', 'pos')], classifier.training_set.get_labeled_titles())
 
     def test_classify_decorator_closes_connection(self):
         # mock the consumer callback parameters
@@ -405,7 +591,7 @@ class CommandTestCase(TestCase):
 
     def test_classify_callback_handles_exceptions_when_message_is_not_json(self):
         # mock the deserialize method and force it to raise an exception
-        classify.serializers.deserialize = mock.MagicMock(side_effect=DeserializationError('foo'))
+        classify.ClassifyMessage.decode = mock.MagicMock(side_effect=DeserializationError('foo'))
         # regenerate the command class being tested as we mocked an extra module above
         self.command = classify.Command()
         # make it look like there is a trained classifier
@@ -456,7 +642,7 @@ class CommandTestCase(TestCase):
 
     def test_classify_callback_classifies_negative_queue_item_and_saves_on_database(self):
         # make it look like there is a trained classifier that will return a negative class
-        self.command.classifier = mock.MagicMock()
+        self.command.classifier = mock.MagicMock(spec=['classify'])
         self.command.classifier.classify = mock.MagicMock(return_value='neg')
         # the supposed body of the enqueued item
 
@@ -483,7 +669,7 @@ class CommandTestCase(TestCase):
 
     def test_classify_callback_classifies_positive_queue_item_and_saves_on_database(self):
         # make it look like there is a trained classifier that will return a negative class
-        self.command.classifier = mock.MagicMock()
+        self.command.classifier = mock.MagicMock(spec=['classify'])
         self.command.classifier.classify = mock.MagicMock(return_value='pos')
 
         # call the method being tested
@@ -499,6 +685,10 @@ class CommandTestCase(TestCase):
         self.assertEquals('foo', news_items[0].title)
         self.assertEquals(1.00, news_items[0].score)
         self.assertEquals(False, news_items[0].published)
+        # the classifier is trained with the unpublished positive news item as neutral
+        publish_handler.publisher.publish.assert_called_once_with(
+            settings.QUEUE_NAME_TRAIN, TrainMessage.encode([news_items[0].id])
+        )
         # un-acknowledged the item got from the queue
         self.channel.basic_ack.assert_called_once()
         # info was logged that the classification was successful
@@ -514,7 +704,7 @@ class CommandTestCase(TestCase):
         self.command = classify.Command()
 
         # make it look like there is a trained classifier that will return a negative class
-        self.command.classifier = mock.MagicMock()
+        self.command.classifier = mock.MagicMock(spec=['classify'])
         self.command.classifier.classify = mock.MagicMock(return_value='neg')
 
         # call the method being tested
@@ -546,7 +736,7 @@ class CommandTestCase(TestCase):
         self.command = classify.Command()
 
         # make it look like there is a trained classifier that will return a negative class
-        self.command.classifier = mock.MagicMock()
+        self.command.classifier = mock.MagicMock(spec=['classify'])
         self.command.classifier.classify = mock.MagicMock(return_value='pos')
 
         # call the method being tested
@@ -563,6 +753,8 @@ class CommandTestCase(TestCase):
         self.assertEquals(1.00, news_items[0].score)
         # publish is now set to true, because of the enable auto-publish setting
         self.assertEquals(True, news_items[0].published)
+        # the published news item is not neutral
+        publish_handler.publisher.publish.assert_not_called()
         # un-acknowledged the item got from the queue
         self.channel.basic_ack.assert_called_once()
         # info was logged that the classification was successful
@@ -571,29 +763,290 @@ class CommandTestCase(TestCase):
         self.logger.error.assert_not_called()
         self.logger.warning.assert_not_called()
 
-    def test_train_callback_purges_queue_and_trains_classifier(self):
+    def test_classify_callback_classifies_queue_item_of_legacy_message_format(self):
+        # make it look like there is a trained classifier that will return a positive class
+        self.command.classifier = mock.MagicMock(spec=['classify'])
+        self.command.classifier.classify = mock.MagicMock(return_value='pos')
+        properties = mock.MagicMock()
+        properties.headers = {'x-is-self-train': False}
+
+        # call the method being tested
+        self.command.classify_callback(self.channel, mock.MagicMock(), properties, self.serialized_news_item_legacy)
+
+        # the classifier was called with the enqueued news item title
+        self.command.classifier.classify.assert_called_once_with('foo')
+        # news item is updated in database with the score
+        news_items = NewsItem.objects.all()
+        self.assertEquals(1, len(list(news_items)))
+        self.assertEquals(1.00, news_items[0].score)
+        self.channel.basic_ack.assert_called_once()
+        self.logger.error.assert_not_called()
+
+    def test_classify_callback_waits_for_batch_to_fill_before_classifying(self):
+        classify.settings.CLASSIFY_BATCH_SIZE = 2
+        channel = mock.MagicMock()
+        # make it look like there is a trained classifier
+        self.command.classifier = mock.MagicMock(spec=['classify'])
+        self.command.classifier.classify = mock.MagicMock(return_value='pos')
+
+        # call the method being tested
+        self.command.classify_callback(channel, mock.MagicMock(), mock.MagicMock(), self.serialized_news_item)
+
+        # nothing classified yet, but a flush of the incomplete batch was scheduled
+        self.command.classifier.classify.assert_not_called()
+        channel.basic_ack.assert_not_called()
+        channel.connection.add_timeout.assert_called_once()
+        self.assertEquals(1, len(self.command.batch))
+
+    def test_classify_callback_classifies_and_acknowledges_full_batch_at_once(self):
+        classify.settings.CLASSIFY_BATCH_SIZE = 2
+        channel = mock.MagicMock()
+        # make it look like there is a trained classifier
+        self.command.classifier = mock.MagicMock(spec=['classify'])
+        self.command.classifier.classify = mock.MagicMock(return_value='pos')
+
+        # call the method being tested
+        method = mock.MagicMock()
+        method.delivery_tag = 1
+        self.command.classify_callback(channel, method, mock.MagicMock(), self.serialized_news_item)
+        method = mock.MagicMock()
+        method.delivery_tag = 2
+        self.command.classify_callback(channel, method, mock.MagicMock(), self.serialized_news_item)
+
+        # both items classified and acknowledged with a single ack, the same title only once
+        self.assertEquals(1, self.command.classifier.classify.call_count)
+        channel.basic_ack.assert_called_once_with(delivery_tag=2, multiple=True)
+        self.assertEquals([], self.command.batch)
+        self.assertEquals(1.00, NewsItem.objects.all()[0].score)
+
+    def test_classify_callback_classifies_full_batch_with_a_single_vectorized_call(self):
+        classify.settings.CLASSIFY_BATCH_SIZE = 2
+        channel = mock.MagicMock()
+        # make it look like there is a trained classifier able to classify many titles at once
+        self.command.classifier = mock.MagicMock(spec=['classify', 'classify_many'])
+        self.command.classifier.classify_many = mock.MagicMock(return_value=['pos', 'neg'])
+        self.serialized_news_item_other = ClassifyMessage.encode(NewsItem.objects.create(title='bar'), False)
+
+        # call the method being tested
+        self.command.classify_callback(channel, mock.MagicMock(), mock.MagicMock(), self.serialized_news_item)
+        self.command.classify_callback(channel, mock.MagicMock(), mock.MagicMock(), self.serialized_news_item_other)
+
+        # the whole batch was classified at once
+        self.command.classifier.classify_many.assert_called_once_with(['foo', 'bar'])
+        self.command.classifier.classify.assert_not_called()
+        channel.basic_ack.assert_called_once()
+        self.assertEquals(1.00, NewsItem.objects.get(title='foo').score)
+        self.assertEquals(0.00, NewsItem.objects.get(title='bar').score)
+
+    def test_classify_titles_skips_titles_classified_before_by_the_same_classifier(self):
+        classifier = mock.MagicMock(spec=['classify'])
+        classifier.classify = mock.MagicMock(return_value='pos')
+
+        # call the method being tested
+        self.command.classify_titles(classifier, 1, ['The Foo'])
+        classifications = self.command.classify_titles(classifier, 1, ['foo', 'Foo!'])
+
+        # the normalized title was classified once and then found in the cache
+        self.assertEquals(['pos', 'pos'], classifications)
+        classifier.classify.assert_called_once_with('foo')
+        self.assertEquals(1, self.command.result_cache.hits)
+        self.assertEquals(1, self.command.result_cache.misses)
+
+    def test_classify_titles_classifies_again_when_classifier_is_swapped(self):
+        classifier = mock.MagicMock(spec=['classify'])
+        classifier.classify = mock.MagicMock(return_value='pos')
+        self.command.classify_titles(classifier, 0, ['foo'])
+
+        # call the method being tested
+        self.command.swap_classifier(classifier)
+        self.command.classify_titles(classifier, self.command.classifier_version, ['foo'])
+
+        self.assertEquals(2, classifier.classify.call_count)
+        self.assertEquals(0, self.command.result_cache.hits)
+
+    def test_flush_batch_decorator_flushes_incomplete_batch_and_closes_connection(self):
+        classify.settings.CLASSIFY_BATCH_SIZE = 2
+        channel = mock.MagicMock()
+        # make it look like there is a trained classifier
+        self.command.classifier = mock.MagicMock(spec=['classify'])
+        self.command.classifier.classify = mock.MagicMock(return_value='neg')
+        self.command.classify_callback(channel, mock.MagicMock(), mock.MagicMock(), self.serialized_news_item)
+
+        # call the method being tested
+        self.command.flush_batch_decorator(channel)
+
+        # the single item was classified and acknowledged
+        self.command.classifier.classify.assert_called_once_with('foo')
+        channel.basic_ack.assert_called_once()
+        self.assertEquals(0.00, NewsItem.objects.all()[0].score)
+        self.db_connection.close.assert_called_once()
+
+    def test_train_callback_merges_pending_messages_and_retrains_classifier(self):
         # mock the method that trains the classifier
         self.command.get_classifier = mock.MagicMock()
+        # one more message is pending on the train queue
+        method_pending = mock.MagicMock()
+        method_pending.delivery_tag = 2
+        self.channel.basic_get = mock.MagicMock(side_effect=[
+            (method_pending, None, TrainMessage.encode([1])), (None, None, None)
+        ])
+        method = mock.MagicMock()
+        method.delivery_tag = 1
 
         # call the method being tested
-        self.command.train_callback(self.channel, mock.MagicMock(), None, None)
+        self.command.train_callback(self.channel, method, None, TrainMessage.encode())
 
-        # the train queue was purged
-        self.channel.queue_purge.assert_called_once_with(queue=settings.QUEUE_NAME_TRAIN)
+        # the pending messages were consumed and all of them acknowledged once trained
+        self.channel.basic_get.assert_called_with(queue=settings.QUEUE_NAME_TRAIN)
+        self.channel.basic_ack.assert_called_once_with(delivery_tag=2, multiple=True)
         # info was logged
         self.logger.info.assert_any_call('train_callback(): Starting training...')
-        # the training of the classifier was started
+        # the full training of the classifier was started
         self.command.get_classifier.assert_called_once()
         # info was logged
         self.logger.info.assert_any_call('train_callback(): Finished training!')
 
-    def test_get_stopwords_returns_not_filtered_stopword(self):
-        stopwords = self.command.get_stopwords()
-        self.assertTrue('ourselves' in stopwords)
+    def test_train_callback_updates_classifier_with_the_news_items_of_the_messages(self):
+        self.command.get_classifier = mock.MagicMock()
+        self.channel.basic_get = mock.MagicMock(side_effect=[
+            (mock.MagicMock(), None, TrainMessage.encode([2, 3])), (None, None, None)
+        ])
+        # a classifier that can be updated
+        self.command.classifier = classify.NaiveBayes.train([('foo', 'pos')])
+        self.command.classifier.training_set = classify.TrainingSet()
+        self.command.update_classifier = mock.MagicMock(return_value='updated')
+
+        # call the method being tested
+        self.command.train_callback(self.channel, mock.MagicMock(), None, TrainMessage.encode([1, 2]))
+
+        # the classifier was updated once with the news items of both messages
+        self.command.update_classifier.assert_called_once_with(mock.ANY, {1, 2, 3})
+        self.command.get_classifier.assert_not_called()
+        self.assertEquals('updated', self.command.classifier)
+
+    def test_train_callback_keeps_classifying_with_current_classifier_until_new_one_is_trained(self):
+        classifier_current = mock.MagicMock()
+        classifier_new = mock.MagicMock()
+        self.command.classifier = classifier_current
+        self.channel.basic_get = mock.MagicMock(return_value=(None, None, None))
+
+        # the current classifier is still there while the new one is trained
+        def get_classifier():
+            self.assertEquals(classifier_current, self.command.classifier)
+            return classifier_new
+        self.command.get_classifier = mock.MagicMock(side_effect=get_classifier)
+
+        # call the method being tested
+        self.command.train_callback(self.channel, mock.MagicMock(), None, TrainMessage.encode())
+
+        # the new classifier was swapped in with a new version
+        self.assertEquals(classifier_new, self.command.classifier)
+        self.assertEquals(1, self.command.classifier_version)
+        self.logger.info.assert_any_call('Swapped in classifier version %s.', 1)
+
+    def test_train_callback_keeps_current_classifier_when_training_fails(self):
+        classifier_current = mock.MagicMock()
+        self.command.classifier = classifier_current
+        self.command.model_version = mock.MagicMock()
+        self.command.model_version.value = 0
+        self.channel.basic_get = mock.MagicMock(return_value=(None, None, None))
+        self.command.get_classifier = mock.MagicMock(side_effect=DatabaseError('foo'))
+        # mock the time module
+        classify.time = mock.MagicMock()
+
+        method = mock.MagicMock()
+        method.delivery_tag = 1
+
+        # call the method being tested
+        self.command.train_callback(self.channel, method, None, TrainMessage.encode())
+
+        # the workers are not told to reload the classifier
+        self.assertEquals(classifier_current, self.command.classifier)
+        self.assertEquals(0, self.command.model_version.value)
+        self.logger.error.assert_called_once_with('Failed to train the classifier.')
+        # the messages are delivered again, to train once the database is back
+        self.channel.basic_ack.assert_not_called()
+        self.channel.basic_nack.assert_called_once_with(delivery_tag=1, multiple=True)
+        classify.time.sleep.assert_called_once()
+
+    def test_swap_classifier_shares_the_new_version_with_the_workers(self):
+        self.command.model_version = mock.MagicMock()
+        self.command.classifier_version = 3
+
+        # call the method being tested
+        self.command.swap_classifier('foo')
+
+        self.assertEquals('foo', self.command.classifier)
+        self.assertEquals(4, self.command.model_version.value)
+
+    def test_update_classifier_learns_added_and_forgets_removed_corpora(self):
+        news_items = list()
+        for title in ('foo good', 'bar bad', 'baz bad'):
+            news_item = NewsItem()
+            news_item.title = title
+            news_item.save()
+            news_items.append(news_item)
+
+            corpus = Corpus()
+            corpus.news_item = news_item
+            corpus.positive = title.endswith('good')
+            corpus.save()
+
+        classifier = self.command.get_classifier()
+        self.assertEquals(['neg', 'pos'], sorted(classifier.labels))
+
+        # the corpus of one news item flips, another one is deactivated
+        Corpus.objects.filter(news_item=news_items[1]).update(positive=True)
+        Corpus.objects.filter(news_item=news_items[2]).update(active=False)
+
+        # call the method being tested
+        classifier_updated = self.command.update_classifier(classifier, [news_items[1].id, news_items[2].id])
+
+        # the update is the same as a full retrain
+        classifier_trained = self.command.get_classifier()
+        self.assertEquals(sorted(classifier_trained.vocabulary), sorted(classifier_updated.vocabulary))
+        self.assertEquals(classifier_trained.labels, classifier_updated.labels)
+        self.assertEquals(list(classifier_trained.label_counts), list(classifier_updated.label_counts))
+        self.assertEquals(['pos'], classifier_updated.labels)
+        self.assertEquals(
+            {('foo good', 'pos'), ('bar bad', 'pos')}, set(classifier_updated.training_set.get_labeled_titles())
+        )
+
+    def test_update_classifier_keeps_training_set_when_dump_fails(self):
+        news_item = NewsItem()
+        news_item.title = 'foo good'
+        news_item.save()
+        corpus = Corpus()
+        corpus.news_item = news_item
+        corpus.positive = True
+        corpus.save()
+
+        classifier = self.command.get_classifier()
+        Corpus.objects.filter(news_item=news_item).update(positive=False)
+        self.command.dump_classifier = mock.MagicMock(side_effect=OSError('foo'))
+
+        # call the method being tested
+        with self.assertRaises(OSError):
+            self.command.update_classifier(classifier, [news_item.id])
+
+        # the training set still matches the current classifier
+        self.assertEquals([('foo good', 'pos')], classifier.training_set.get_labeled_titles())
+
+        # the update is computed again once the dump succeeds
+        self.command.dump_classifier = mock.MagicMock()
+        classifier_updated = self.command.update_classifier(classifier, [news_item.id])
+        self.assertEquals(['neg'], classifier_updated.labels)
+
+    def test_train_returns_false_when_dump_fails(self):
+        classifier_current = mock.MagicMock()
+        self.command.classifier = classifier_current
+        self.command.get_classifier = mock.MagicMock(side_effect=OSError('foo'))
+
+        # call the method being tested
+        self.assertEquals(False, self.command.train(None))
 
-    def test_get_stopwords_does_not_return_filtered_stopword(self):
-        stopwords = self.command.get_stopwords()
-        self.assertFalse('against' in stopwords)
+        self.assertEquals(classifier_current, self.command.classifier)
+        self.logger.error.assert_called_once_with('Failed to dump the classifier due to "%s"', 'foo')
 
     def test_reject_queue_item_does_not_handle_exception_when_non_exiting(self):
         # mock the deserialize method and force it to raise an exception
@@ -1,28 +1,28 @@
+import argparse
 import mock
 
 from django.conf import settings
 from django.contrib.admin.sites import AdminSite
 from django.test import TestCase
 
+from core.messaging.classify_message import ClassifyMessage
 from core.models.newsitem import NewsItem
-from cli.management.commands import classify_requeue
+from cli.management.commands import _requeue, classify_requeue
 
 
 class CommandTestCase(TestCase):
 
     def setUp(self):
         # retain the original imported packages
-        classify_requeue.pika_real = classify_requeue.pika
+        _requeue.publisher_real = _requeue.publisher
+        _requeue.time.sleep_real = _requeue.time.sleep
         classify_requeue.logging_real = classify_requeue.logging
 
-        # mock pika.BlockingConnection
-        self.connection = mock.MagicMock()
-        classify_requeue.pika.BlockingConnection = mock.MagicMock(return_value=self.connection)
-        # mock pika.BlockingConnection.channel
-        self.channel = mock.MagicMock()
-        self.connection.channel = mock.MagicMock(return_value=self.channel)
-        # mock ConnectionParameters
-        classify_requeue.pika.ConnectionParameters = mock.MagicMock()
+        # mock the publisher to the queue
+        self.publisher = mock.MagicMock()
+        _requeue.publisher = self.publisher
+        # mock the wait between chunks
+        _requeue.time.sleep = mock.MagicMock()
 
         # mock method used by logging
         self.logger = mock.MagicMock()
@@ -32,20 +32,29 @@ class CommandTestCase(TestCase):
 
     def tearDown(self):
         # revert the packages to the original imported
-        classify_requeue.pika = classify_requeue.pika_real
+        _requeue.publisher = _requeue.publisher_real
+        _requeue.time.sleep = _requeue.time.sleep_real
         classify_requeue.logging = classify_requeue.logging_real
 
     def test_handle_exits_when_no_newsitems(self):
         # the method being tested
-        self.command.handle()
+        self.command.handle(limit=None, since=None, rate=None)
 
-        classify_requeue.pika.BlockingConnection.assert_not_called()
-        classify_requeue.pika.ConnectionParameters.assert_not_called()
-        self.connection.channel.assert_not_called()
-        self.channel.queue_declare.assert_not_called()
-        self.channel.basic_publish.assert_not_called()
+        self.publisher.publish_many.assert_not_called()
         self.logger.info.assert_called_once_with('All news items are already classified!')
 
+    def create_news_items(self, count):
+        news_items = list()
+        for index in range(count):
+            news_item = NewsItem()
+            news_item.title = 'foo {}'.format(index)
+            news_item.save()
+            news_items.append(news_item)
+        return news_items
+
+    def get_published_bodies(self):
+        return [body for call in self.publisher.publish_many.call_args_list for body in call[0][1]]
+
     def test_handle_publishes_when_newsitems_exist(self):
         news_item = NewsItem()
         news_item.id = 1
@@ -53,13 +62,70 @@ class CommandTestCase(TestCase):
         news_item.save()
 
         # the method being tested
-        self.command.handle()
+        self.command.handle(limit=None, since=None, rate=None)
+
+        self.publisher.publish_many.assert_called_once_with(
+            settings.QUEUE_NAME_CLASSIFY,
+            [ClassifyMessage.encode(news_item, False)],
+            {'x-is-self-train': False}
+        )
+        self.publisher.close.assert_called_once()
+
+        self.logger.info.assert_any_call('Found news items that need to be classified.')
+        self.logger.info.assert_any_call('Successfully re-queued %s news items in %.1f seconds!', 1, mock.ANY)
+
+    def test_handle_publishes_unscored_newsitems_newest_first_in_chunks(self):
+        news_items = self.create_news_items(5)
+        news_items[2].score = 1
+        news_items[2].save()
+
+        with self.settings(QUEUE_REQUEUE_CHUNK_SIZE=2):
+            # the method being tested
+            self.command.handle(limit=None, since=None, rate=None)
+
+        self.assertEquals(2, self.publisher.publish_many.call_count)
+        self.assertEquals(
+            [ClassifyMessage.encode(news_items[index], False) for index in (4, 3, 1, 0)],
+            self.get_published_bodies()
+        )
+        # the progress is logged per chunk instead of per news item
+        self.logger.info.assert_any_call('Re-queued %s news items so far...', 2)
+        self.logger.info.assert_any_call('Re-queued %s news items so far...', 4)
+
+    def test_handle_publishes_at_most_limit_newsitems(self):
+        news_items = self.create_news_items(5)
+
+        with self.settings(QUEUE_REQUEUE_CHUNK_SIZE=2):
+            # the method being tested
+            self.command.handle(limit=3, since=None, rate=None)
+
+        self.assertEquals(
+            [ClassifyMessage.encode(news_items[index], False) for index in (4, 3, 2)],
+            self.get_published_bodies()
+        )
+
+    def test_handle_publishes_newsitems_added_since_date(self):
+        news_items = self.create_news_items(2)
+        news_items[0].added_at = _requeue.parse_since('2019-01-01')
+        news_items[0].save()
+
+        # the method being tested
+        self.command.handle(limit=None, since=_requeue.parse_since('2019-01-02'), rate=None)
+
+        self.assertEquals([ClassifyMessage.encode(news_items[1], False)], self.get_published_bodies())
+
+    def test_handle_waits_between_chunks_when_rate_is_set(self):
+        self.create_news_items(4)
+
+        # the method being tested
+        self.command.handle(limit=None, since=None, rate=2)
 
-        classify_requeue.pika.BlockingConnection.assert_called_once()
-        classify_requeue.pika.ConnectionParameters.assert_called_once()
-        self.connection.channel.assert_called_once()
-        self.channel.queue_declare.assert_called_once_with(queue=settings.QUEUE_NAME_CLASSIFY, durable=True)
-        self.channel.basic_publish.assert_called_once()
+        # the chunks are as big as the rate
+        self.assertEquals(2, self.publisher.publish_many.call_count)
+        self.assertEquals(2, _requeue.time.sleep.call_count)
 
-        self.logger.info.assert_any_call('Found %s news items that need to be classified.', 1)
-        self.logger.info.assert_any_call('Successfully re-queued #%s "%s"!', 1, 'foo')
+    def test_parse_since_parses_dates_and_datetimes(self):
+        self.assertEquals(2019, _requeue.parse_since('2019-01-02').year)
+        self.assertEquals(10, _requeue.parse_since('2019-01-02T10:00:00').hour)
+        with self.assertRaises(argparse.ArgumentTypeError):
+            _requeue.parse_since('2019-13-02')
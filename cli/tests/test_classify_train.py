@@ -0,0 +1,37 @@
+import mock
+
+from django.conf import settings
+from django.test import TestCase
+
+from cli.management.commands import classify_train
+
+
+class CommandTestCase(TestCase):
+
+    def setUp(self):
+        # retain the original imported packages
+        classify_train.publisher_real = classify_train.publisher
+        classify_train.logging_real = classify_train.logging
+
+        # mock the publisher to the queue
+        self.publisher = mock.MagicMock()
+        classify_train.publisher = self.publisher
+
+        # mock method used by logging
+        self.logger = mock.MagicMock()
+        classify_train.logging.getLogger = mock.MagicMock(return_value=self.logger)
+
+        self.command = classify_train.Command()
+
+    def tearDown(self):
+        # revert the packages to the original imported
+        classify_train.publisher = classify_train.publisher_real
+        classify_train.logging = classify_train.logging_real
+
+    def test_handle_publishes_full_retrain(self):
+        # the method being tested
+        self.command.handle()
+
+        self.publisher.publish.assert_called_once_with(settings.QUEUE_NAME_TRAIN, '')
+        self.publisher.close.assert_called_once()
+        self.logger.info.assert_called_once_with('Successfully queued a full retrain of the classifier!')
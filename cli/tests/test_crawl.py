@@ -1,7 +1,12 @@
 from datetime import datetime
+import hashlib
+from http.client import IncompleteRead
 import mock
+import socket
+from urllib.error import HTTPError
 from unittest.mock import patch
 
+from django.conf import settings
 from django.utils import timezone
 from django.test import TestCase
 
@@ -13,6 +18,8 @@ from cli.management.commands import crawl
 class CommandTestCase(TestCase):
 
     feed = {}
+    content = b'<rss></rss>'
+    fetched = {}
 
     def setUp(self):
         self.feed = {
@@ -27,56 +34,78 @@ class CommandTestCase(TestCase):
         }
 
         # retain the original imported packages
-        crawl.pika_real = crawl.pika
+        crawl.publisher_real = crawl.publisher
         crawl.logging_real = crawl.logging
-        crawl.NewsItem.exists_real = crawl.NewsItem.exists
+        crawl.NewsItem.find_latest_added_at_real = crawl.NewsItem.find_latest_added_at
         crawl.NewsItem.save_real = crawl.NewsItem.save
+        crawl.NewsItem.bulk_insert_real = crawl.NewsItem.bulk_insert
         crawl.Source.crawled_real = crawl.Source.crawled
         crawl.Source.crawling_real = crawl.Source.crawling
-        crawl.serializers.serialize_real = crawl.serializers.serialize
+        crawl.ClassifyMessage.encode_real = crawl.ClassifyMessage.encode
         crawl.feedparser.parse_real = crawl.feedparser.parse
+        crawl.urllib.request.urlopen_real = crawl.urllib.request.urlopen
+        crawl.urllib.request.Request_real = crawl.urllib.request.Request
 
-        # mock pika.BlockingConnection
-        self.connection = mock.MagicMock()
-        crawl.pika.BlockingConnection = mock.MagicMock(return_value=self.connection)
-        # mock pika.BlockingConnection.channel
-        self.channel = mock.MagicMock()
-        self.connection.channel = mock.MagicMock(return_value=self.channel)
-        # mock ConnectionParameters
-        crawl.pika.ConnectionParameters = mock.MagicMock()
+        # mock the publisher to the queue
+        self.publisher = mock.MagicMock()
+        crawl.publisher = self.publisher
 
         # mock method used by logging
         self.logger = mock.MagicMock()
         crawl.logging.getLogger = mock.MagicMock(return_value=self.logger)
 
         # mock model methods
-        crawl.NewsItem.exists = mock.MagicMock()
+        crawl.NewsItem.find_latest_added_at = mock.MagicMock(return_value={})
         crawl.NewsItem.save = mock.MagicMock()
+        crawl.NewsItem.bulk_insert = mock.MagicMock(side_effect=lambda news_items, batch_size: news_items)
         crawl.Source.crawled = mock.MagicMock()
         crawl.Source.crawling = mock.MagicMock()
 
-        # mock the serializer that serializes models
-        crawl.serializers.serialize = mock.MagicMock()
+        # mock the encoder of the queue messages
+        crawl.ClassifyMessage.encode = mock.MagicMock()
         # mock the rss feed parser
         crawl.feedparser.parse = mock.MagicMock(return_value=self.feed)
 
+        # mock the feed download
+        self.response = mock.MagicMock()
+        self.response.__enter__.return_value.status = 200
+        self.response.__enter__.return_value.headers = {}
+        self.response.__enter__.return_value.read.return_value = self.content
+        self.fetched = {
+            'status': 200,
+            'content': self.content,
+            'etag': None,
+            'last_modified': None
+        }
+        crawl.urllib.request.urlopen = mock.MagicMock(return_value=self.response)
+        crawl.urllib.request.Request = mock.MagicMock()
+
         self.command = crawl.Command()
 
     def tearDown(self):
         # revert the packages to the original imported
-        crawl.pika = crawl.pika_real
+        crawl.publisher = crawl.publisher_real
         crawl.logging = crawl.logging_real
-        crawl.NewsItem.exists = crawl.NewsItem.exists_real
+        crawl.NewsItem.find_latest_added_at = crawl.NewsItem.find_latest_added_at_real
         crawl.NewsItem.save = crawl.NewsItem.save_real
+        crawl.NewsItem.bulk_insert = crawl.NewsItem.bulk_insert_real
         crawl.Source.crawled = crawl.Source.crawled_real
         crawl.Source.crawling = crawl.Source.crawling_real
-        crawl.serializers.serialize = crawl.serializers.serialize_real
+        crawl.ClassifyMessage.encode = crawl.ClassifyMessage.encode_real
         crawl.feedparser.parse = crawl.feedparser.parse_real
+        crawl.urllib.request.urlopen = crawl.urllib.request.urlopen_real
+        crawl.urllib.request.Request = crawl.urllib.request.Request_real
 
     def test_add_arguments_adds_argument_to_command(self):
         parser = mock.MagicMock()
         self.command.add_arguments(parser)
-        parser.add_argument.assert_called_once_with('name', nargs='?', type=str)
+        parser.add_argument.assert_any_call('name', nargs='?', type=str)
+        parser.add_argument.assert_any_call(
+            '--concurrency',
+            type=int,
+            default=settings.RSS_CRAWL_CONCURRENCY,
+            help='Number of feeds downloaded in parallel'
+        )
 
     def test_handle_exits_when_source_name_option_is_set_and_no_sources_exist(self):
         self.command.crawl = mock.MagicMock()
@@ -87,10 +116,8 @@ class CommandTestCase(TestCase):
         # error logged
         self.logger.error.assert_called_once_with('No source(s) found.')
         # no interaction with the queue
-        crawl.pika.BlockingConnection.assert_not_called()
-        crawl.pika.ConnectionParameters.assert_not_called()
-        self.connection.channel.assert_not_called()
-        self.channel.queue_declare.assert_not_called()
+        self.publisher.publish_many.assert_not_called()
+        self.publisher.close.assert_not_called()
         # actual crawl not called
         self.command.crawl.assert_not_called()
 
@@ -107,10 +134,8 @@ class CommandTestCase(TestCase):
         # error logged
         self.logger.error.assert_called_once_with('No source(s) found.')
         # no interaction with the queue
-        crawl.pika.BlockingConnection.assert_not_called()
-        crawl.pika.ConnectionParameters.assert_not_called()
-        self.connection.channel.assert_not_called()
-        self.channel.queue_declare.assert_not_called()
+        self.publisher.publish_many.assert_not_called()
+        self.publisher.close.assert_not_called()
         # actual crawl not called
         self.command.crawl.assert_not_called()
 
@@ -128,10 +153,8 @@ class CommandTestCase(TestCase):
         # error logged
         self.logger.error.assert_called_once_with('No source(s) found.')
         # no interaction with the queue
-        crawl.pika.BlockingConnection.assert_not_called()
-        crawl.pika.ConnectionParameters.assert_not_called()
-        self.connection.channel.assert_not_called()
-        self.channel.queue_declare.assert_not_called()
+        self.publisher.publish_many.assert_not_called()
+        self.publisher.close.assert_not_called()
         # actual crawl not called
         self.command.crawl.assert_not_called()
 
@@ -147,13 +170,10 @@ class CommandTestCase(TestCase):
 
         # no error logged
         self.logger.error.assert_not_called()
-        # there is interaction with the queue
-        crawl.pika.BlockingConnection.assert_called_once()
-        crawl.pika.ConnectionParameters.assert_called_once()
-        self.connection.channel.assert_called_once()
-        self.channel.queue_declare.assert_called_once()
+        # the connection to the queue is closed once crawled
+        self.publisher.close.assert_called_once()
         # actual crawl called
-        self.command.crawl.assert_called_once_with(source, self.channel)
+        self.command.crawl.assert_called_once_with(source, self.fetched)
 
     def test_handle_exits_when_no_source_name_option_is_set_and_no_sources_exist(self):
         self.command.crawl = mock.MagicMock()
@@ -164,10 +184,8 @@ class CommandTestCase(TestCase):
         # error logged
         self.logger.error.assert_called_once_with('No source(s) found.')
         # no interaction with the queue
-        crawl.pika.BlockingConnection.assert_not_called()
-        crawl.pika.ConnectionParameters.assert_not_called()
-        self.connection.channel.assert_not_called()
-        self.channel.queue_declare.assert_not_called()
+        self.publisher.publish_many.assert_not_called()
+        self.publisher.close.assert_not_called()
         # actual crawl not called
         self.command.crawl.assert_not_called()
 
@@ -187,11 +205,8 @@ class CommandTestCase(TestCase):
 
         # no error logged
         self.logger.error.assert_not_called()
-        # interaction with the queue
-        crawl.pika.BlockingConnection.assert_called_once()
-        crawl.pika.ConnectionParameters.assert_called_once()
-        self.connection.channel.assert_called_once()
-        self.channel.queue_declare.assert_called_once()
+        # the connection to the queue is closed once crawled
+        self.publisher.close.assert_called_once()
         # crawl was called one for each source existing
         self.assertEquals(2, self.command.crawl.call_count)
 
@@ -212,11 +227,8 @@ class CommandTestCase(TestCase):
 
         # no error logged
         self.logger.error.assert_not_called()
-        # interaction with the queue
-        crawl.pika.BlockingConnection.assert_called_once()
-        crawl.pika.ConnectionParameters.assert_called_once()
-        self.connection.channel.assert_called_once()
-        self.channel.queue_declare.assert_called_once()
+        # the connection to the queue is closed once crawled
+        self.publisher.close.assert_called_once()
         # crawl was called one for each source existing
         self.assertEquals(1, self.command.crawl.call_count)
 
@@ -250,6 +262,227 @@ class CommandTestCase(TestCase):
         # actual crawl was called
         self.command.crawl.assert_called_once()
 
+    def test_handle_marks_sources_as_crawling_before_fetching_them(self):
+        source = Source()
+        source.name = 'foo'
+        source.save()
+
+        source = Source()
+        source.name = 'bar'
+        source.save()
+
+        self.command.crawl = mock.MagicMock()
+
+        # the method being tested
+        self.command.handle(name=None)
+
+        # both sources were marked as pending and fetched
+        self.assertEquals(2, crawl.Source.crawling.call_count)
+        self.assertEquals(2, crawl.urllib.request.urlopen.call_count)
+        # crawled in the order the sources were fetched
+        self.assertEquals(
+            ['foo', 'bar'],
+            [call[0][0].name for call in self.command.crawl.call_args_list]
+        )
+
+    def test_fetch_returns_feed_content(self):
+        source = Source()
+        source.name = 'foo'
+        source.url = 'https://www.foo.com/rss'
+
+        # the method being tested
+        response = self.command.fetch(source)
+
+        # the feed was downloaded with the configured timeout
+        self.assertEquals(self.fetched, response)
+        self.assertEquals(
+            settings.RSS_CRAWL_TIMEOUT,
+            crawl.urllib.request.urlopen.call_args[1]['timeout']
+        )
+        # no error logged
+        self.logger.error.assert_not_called()
+
+    def test_fetch_returns_none_when_download_fails(self):
+        crawl.urllib.request.urlopen = mock.MagicMock(side_effect=socket.timeout('timed out'))
+
+        source = Source()
+        source.name = 'foo'
+        source.url = 'https://www.foo.com/rss'
+
+        # the method being tested
+        response = self.command.fetch(source)
+
+        # nothing fetched and the error was logged
+        self.assertEquals(None, response)
+        self.logger.error.assert_called_once_with('Could not fetch \'%s\' due to "%s"', 'foo', 'timed out')
+
+    def test_fetch_returns_none_when_response_is_truncated(self):
+        # the server closed the connection before sending the whole feed
+        self.response.__enter__.return_value.read.side_effect = IncompleteRead(b'<rss>', 100)
+
+        source = Source()
+        source.name = 'foo'
+        source.url = 'https://www.foo.com/rss'
+
+        # the method being tested
+        response = self.command.fetch(source)
+
+        # nothing fetched and the error was logged
+        self.assertEquals(None, response)
+        self.logger.error.assert_called_once()
+
+    def test_fetch_sends_the_validators_of_the_previous_crawl(self):
+        source = Source()
+        source.name = 'foo'
+        source.url = 'https://www.foo.com/rss'
+        source.etag = '"abc"'
+        source.last_modified = 'Wed, 21 Oct 2015 07:28:00 GMT'
+
+        # the method being tested
+        self.command.fetch(source)
+
+        # the request was conditional
+        headers = crawl.urllib.request.Request.call_args[1]['headers']
+        self.assertEquals('"abc"', headers['If-None-Match'])
+        self.assertEquals('Wed, 21 Oct 2015 07:28:00 GMT', headers['If-Modified-Since'])
+
+    def test_fetch_returns_not_modified_response_when_feed_did_not_change(self):
+        crawl.urllib.request.urlopen = mock.MagicMock(
+            side_effect=HTTPError('https://www.foo.com/rss', 304, 'Not Modified', {}, None)
+        )
+
+        source = Source()
+        source.name = 'foo'
+        source.url = 'https://www.foo.com/rss'
+        source.etag = '"abc"'
+
+        # the method being tested
+        response = self.command.fetch(source)
+
+        # the response carries no content but keeps the validators
+        self.assertEquals(304, response['status'])
+        self.assertEquals(None, response['content'])
+        self.assertEquals('"abc"', response['etag'])
+        self.logger.error.assert_not_called()
+
+    def test_crawl_skips_parsing_when_feed_was_not_modified(self):
+        source = Source()
+        source.name = 'bar'
+
+        self.fetched['status'] = 304
+        self.fetched['content'] = None
+        self.fetched['etag'] = '"abc"'
+
+        # the method being tested
+        self.command.crawl(source, self.fetched)
+
+        # nothing parsed, but the source is marked as crawled with its validators
+        crawl.feedparser.parse.assert_not_called()
+        crawl.Source.crawled.assert_called_once()
+        self.assertEquals('"abc"', source.etag)
+        self.logger.info.assert_any_call('Feed of \'%s\' was not modified.', 'bar')
+
+    def test_crawl_skips_parsing_when_feed_content_hash_did_not_change(self):
+        source = Source()
+        source.name = 'bar'
+        source.content_hash = hashlib.sha256(self.content).hexdigest()
+
+        # the method being tested
+        self.command.crawl(source, self.fetched)
+
+        # nothing parsed, but the source is marked as crawled
+        crawl.feedparser.parse.assert_not_called()
+        crawl.Source.crawled.assert_called_once()
+
+    def test_crawl_stores_the_content_hash_of_the_crawled_feed(self):
+        crawl.NewsItem.find_latest_added_at = mock.MagicMock(
+            return_value={'foo': datetime.strptime('2018-12-14T19:00:00+0000', '%Y-%m-%dT%H:%M:%S%z')}
+        )
+
+        source = Source()
+        source.name = 'bar'
+
+        # the method being tested
+        self.command.crawl(source, self.fetched)
+
+        # the feed was parsed and its hash kept for the next crawl
+        crawl.feedparser.parse.assert_called_once_with(self.content)
+        self.assertEquals(hashlib.sha256(self.content).hexdigest(), source.content_hash)
+
+    def test_crawl_checks_existence_of_all_entries_with_one_lookup(self):
+        # a feed with an entry stored yesterday and a new one
+        self.feed['entries'].append({
+            'title': 'bar',
+            'summary': 'baz',
+            'updated': '2018-12-14T21:00:00+0000',
+            'link': 'https://www.google.com'
+        })
+        crawl.NewsItem.find_latest_added_at = mock.MagicMock(
+            return_value={'foo': datetime.strptime('2018-12-14T19:00:00+0000', '%Y-%m-%dT%H:%M:%S%z')}
+        )
+
+        source = Source()
+        source.name = 'bar'
+
+        # the method being tested
+        self.command.crawl(source, self.fetched)
+
+        # existence was checked once for all the titles, since a day before the oldest entry
+        crawl.NewsItem.find_latest_added_at.assert_called_once_with(
+            ['foo', 'bar'],
+            datetime.strptime('2018-12-13T20:00:00+0000', '%Y-%m-%dT%H:%M:%S%z'),
+            source
+        )
+        # only the new entry was stored
+        self.assertEquals(1, len(crawl.NewsItem.bulk_insert.call_args[0][0]))
+
+    def test_crawl_skips_duplicate_entries_of_the_same_feed(self):
+        self.feed['entries'].append(dict(self.feed['entries'][0]))
+
+        source = Source()
+        source.name = 'bar'
+
+        # the method being tested
+        self.command.crawl(source, self.fetched)
+
+        # the entry was stored only once
+        self.assertEquals(1, len(crawl.NewsItem.bulk_insert.call_args[0][0]))
+
+    def test_enqueue_publishes_news_items_at_once(self):
+        crawl.ClassifyMessage.encode = mock.MagicMock(return_value='foo')
+        news_items = list()
+        for index in range(5):
+            news_item = NewsItem()
+            news_item.title = 'foo'
+            news_items.append(news_item)
+
+        # the method being tested
+        self.command.enqueue(news_items)
+
+        # every news item was published, in the batches of the publisher
+        self.publisher.publish_many.assert_called_once_with(
+            settings.QUEUE_NAME_CLASSIFY,
+            mock.ANY,
+            {'x-is-self-train': False}
+        )
+        self.assertEquals(['foo'] * 5, list(self.publisher.publish_many.call_args[0][1]))
+
+    def test_crawl_exits_when_feed_was_not_fetched(self):
+        source = Source()
+        source.name = 'bar'
+
+        # the method being tested
+        self.command.crawl(source, None)
+
+        # error logged
+        self.logger.error.assert_any_call('Could not crawl \'%s\'.', 'bar')
+        # nothing parsed, stored or published
+        crawl.feedparser.parse.assert_not_called()
+        crawl.NewsItem.bulk_insert.assert_not_called()
+        self.publisher.publish_many.assert_not_called()
+        # source was not crawled, so don't update its last crawl date
+        crawl.Source.crawled.assert_not_called()
+
     def test_crawl_exits_when_feed_parse_fails(self):
         # make the parser raise an exception
         crawl.feedparser.parse = mock.MagicMock(side_effect=RuntimeError('foo'))
@@ -259,50 +492,53 @@ class CommandTestCase(TestCase):
         source.name = 'bar'
 
         # the method being tested
-        self.command.crawl(source, self.channel)
+        self.command.crawl(source, self.fetched)
 
         # logging the start of the crawling
         self.logger.info.assert_any_call('Crawling \'%s\'...', 'bar')
         # error logged
         self.logger.error.assert_any_call('Could not crawl \'%s\'.', 'bar')
         # no feed entries so no database transactions them
-        crawl.NewsItem.exists.assert_not_called()
-        crawl.NewsItem.save.assert_not_called()
+        crawl.NewsItem.find_latest_added_at.assert_not_called()
+        crawl.NewsItem.bulk_insert.assert_not_called()
         # no serialization and publish to the queue
-        crawl.serializers.serialize.assert_not_called()
-        self.channel.basic_publish.assert_not_called()
+        crawl.ClassifyMessage.encode.assert_not_called()
+        self.publisher.publish_many.assert_not_called()
         # source was not crawled, so don't update its last crawl date
         crawl.Source.crawled.assert_not_called()
 
     def test_crawl_skips_existing_newsitem(self):
-        # force exists() to return that the news item already exists to database
-        crawl.NewsItem.exists = mock.MagicMock(return_value=True)
+        # force find_latest_added_at() to return that the news item already exists to database
+        crawl.NewsItem.find_latest_added_at = mock.MagicMock(
+            return_value={'foo': datetime.strptime('2018-12-14T19:00:00+0000', '%Y-%m-%dT%H:%M:%S%z')}
+        )
         self.command = crawl.Command()
 
         source = Source()
         source.name = 'bar'
 
         # the method being tested
-        self.command.crawl(source, self.channel)
+        self.command.crawl(source, self.fetched)
 
         # logging the start of the crawling
         self.logger.info.assert_any_call('Crawling \'%s\'...', 'bar')
         # no error logged
         self.logger.error.assert_not_called()
         # existence of news item was performed
-        crawl.NewsItem.exists.assert_called_once()
+        crawl.NewsItem.find_latest_added_at.assert_called_once()
         # feed entry not saved nor published to queue
-        crawl.NewsItem.save.assert_not_called()
-        crawl.serializers.serialize.assert_not_called()
-        self.channel.basic_publish.assert_not_called()
+        self.assertEquals([], crawl.NewsItem.bulk_insert.call_args[0][0])
+        crawl.ClassifyMessage.encode.assert_not_called()
+        self.publisher.publish_many.assert_not_called()
         # mark source as crawled
         crawl.Source.crawled.assert_called_once()
 
     def test_crawl_sets_newsitem_description_to_summary_value_when_exists(self):
-        # force exists() to return that the news item does not exist to database
-        crawl.NewsItem.exists = mock.MagicMock(return_value=False)
-        # revert mocking the save method of the news item model
+        # force find_latest_added_at() to return that the news item does not exist to database
+        crawl.NewsItem.find_latest_added_at = mock.MagicMock(return_value={})
+        # revert mocking the insert methods of the news item model
         crawl.NewsItem.save = crawl.NewsItem.save_real
+        crawl.NewsItem.bulk_insert = crawl.NewsItem.bulk_insert_real
         self.command = crawl.Command()
 
         # create a fake source to crawl
@@ -311,7 +547,7 @@ class CommandTestCase(TestCase):
         source.save()
 
         # the method being tested
-        self.command.crawl(source, self.channel)
+        self.command.crawl(source, self.fetched)
 
         # logging the start of the crawling
         self.logger.info.assert_any_call('Crawling \'%s\'...', 'bar')
@@ -327,10 +563,11 @@ class CommandTestCase(TestCase):
     def test_crawl_sets_newsitem_description_to_title_value_when_summary_does_not_exist(self):
         # delete the summary from the fake feed entry
         del(self.feed['entries'][0]['summary'])
-        # force exists() to return that the news item does not exist to database
-        crawl.NewsItem.exists = mock.MagicMock(return_value=False)
-        # revert mocking the save method of the news item model
+        # force find_latest_added_at() to return that the news item does not exist to database
+        crawl.NewsItem.find_latest_added_at = mock.MagicMock(return_value={})
+        # revert mocking the insert methods of the news item model
         crawl.NewsItem.save = crawl.NewsItem.save_real
+        crawl.NewsItem.bulk_insert = crawl.NewsItem.bulk_insert_real
         # mock the parser to return the fake feed entries
         crawl.feedparser.parse = mock.MagicMock(return_value=self.feed)
         self.command = crawl.Command()
@@ -341,7 +578,7 @@ class CommandTestCase(TestCase):
         source.save()
 
         # the method being tested
-        self.command.crawl(source, self.channel)
+        self.command.crawl(source, self.fetched)
 
         # logging the start of the crawling
         self.logger.info.assert_any_call('Crawling \'%s\'...', 'bar')
@@ -358,10 +595,11 @@ class CommandTestCase(TestCase):
         # set a new field for the date to the fake feed entry
         self.feed['entries'][0]['published'] = self.feed['entries'][0]['updated']
         self.feed['entries'][0]['updated'] = datetime.now().isoformat()
-        # force exists() to return that the news item does not exist to database
-        crawl.NewsItem.exists = mock.MagicMock(return_value=False)
-        # revert mocking the save method of the news item model
+        # force find_latest_added_at() to return that the news item does not exist to database
+        crawl.NewsItem.find_latest_added_at = mock.MagicMock(return_value={})
+        # revert mocking the insert methods of the news item model
         crawl.NewsItem.save = crawl.NewsItem.save_real
+        crawl.NewsItem.bulk_insert = crawl.NewsItem.bulk_insert_real
         # mock the parser to return the fake feed entries
         crawl.feedparser.parse = mock.MagicMock(return_value=self.feed)
         self.command = crawl.Command()
@@ -372,7 +610,7 @@ class CommandTestCase(TestCase):
         source.save()
 
         # the method being tested
-        self.command.crawl(source, self.channel)
+        self.command.crawl(source, self.fetched)
 
         # logging the start of the crawling
         self.logger.info.assert_any_call('Crawling \'%s\'...', 'bar')
@@ -389,10 +627,11 @@ class CommandTestCase(TestCase):
         )
 
     def test_crawl_sets_newsitem_publish_date_to_updated_value_when_updated_exists(self):
-        # force exists() to return that the news item does not exist to database
-        crawl.NewsItem.exists = mock.MagicMock(return_value=False)
-        # revert mocking the save method of the news item model
+        # force find_latest_added_at() to return that the news item does not exist to database
+        crawl.NewsItem.find_latest_added_at = mock.MagicMock(return_value={})
+        # revert mocking the insert methods of the news item model
         crawl.NewsItem.save = crawl.NewsItem.save_real
+        crawl.NewsItem.bulk_insert = crawl.NewsItem.bulk_insert_real
         # mock the parser to return the fake feed entries
         crawl.feedparser.parse = mock.MagicMock(return_value=self.feed)
         self.command = crawl.Command()
@@ -403,7 +642,7 @@ class CommandTestCase(TestCase):
         source.save()
 
         # the method being tested
-        self.command.crawl(source, self.channel)
+        self.command.crawl(source, self.fetched)
 
         # logging the start of the crawling
         self.logger.info.assert_any_call('Crawling \'%s\'...', 'bar')
@@ -422,10 +661,11 @@ class CommandTestCase(TestCase):
     def test_crawl_sets_newsitem_publish_date_to_now_when_published_and_updated_do_not_exist(self):
         # delete the updated field from fake feed entry
         del(self.feed['entries'][0]['updated'])
-        # force exists() to return that the news item does not exist to database
-        crawl.NewsItem.exists = mock.MagicMock(return_value=False)
-        # revert mocking the save method of the news item model
+        # force find_latest_added_at() to return that the news item does not exist to database
+        crawl.NewsItem.find_latest_added_at = mock.MagicMock(return_value={})
+        # revert mocking the insert methods of the news item model
         crawl.NewsItem.save = crawl.NewsItem.save_real
+        crawl.NewsItem.bulk_insert = crawl.NewsItem.bulk_insert_real
         # mock the parser to return the fake feed entries
         crawl.feedparser.parse = mock.MagicMock(return_value=self.feed)
         self.command = crawl.Command()
@@ -436,7 +676,7 @@ class CommandTestCase(TestCase):
         source.save()
 
         # the method being tested
-        self.command.crawl(source, self.channel)
+        self.command.crawl(source, self.fetched)
 
         # logging the start of the crawling
         self.logger.info.assert_any_call('Crawling \'%s\'...', 'bar')
@@ -450,8 +690,8 @@ class CommandTestCase(TestCase):
         self.assertEquals(timezone.now().date(), news_items[0].added_at.date())
 
     def test_crawl_enqueues_classification_of_newsitem_and_marks_source_as_crawled(self):
-        # force exists() to return that the news item does not exist to database
-        crawl.NewsItem.exists = mock.MagicMock(return_value=False)
+        # force find_latest_added_at() to return that the news item does not exist to database
+        crawl.NewsItem.find_latest_added_at = mock.MagicMock(return_value={})
         self.command = crawl.Command()
 
         # create a fake source to crawl
@@ -463,7 +703,7 @@ class CommandTestCase(TestCase):
         self.assertEquals(None, source.last_crawl)
 
         # the method being tested
-        self.command.crawl(source, self.channel)
+        self.command.crawl(source, self.fetched)
 
         # logging the start of the crawling
         self.logger.info.assert_any_call('Crawling \'%s\'...', 'bar')
@@ -471,9 +711,7 @@ class CommandTestCase(TestCase):
         self.logger.error.assert_not_called()
 
         # the feed entry was saved and enqueued for classification
-        crawl.NewsItem.save.assert_called_once()
-        self.channel.basic_publish.assert_called_once()
-        # the source was marked as pending for crawl
-        crawl.Source.crawling.assert_called_once()
+        self.assertEquals(1, len(crawl.NewsItem.bulk_insert.call_args[0][0]))
+        self.publisher.publish_many.assert_called_once()
         # the source is marked as crawled
         crawl.Source.crawled.assert_called_once()
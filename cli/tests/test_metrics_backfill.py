@@ -0,0 +1,26 @@
+import datetime
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from core.models.newsitem import NewsItem
+from core.models.newsitem_daily_metric import NewsItemDailyMetric
+from core.models.source import Source
+
+
+class CommandTestCase(TestCase):
+
+    def test_handle_counts_daily_metrics_since_date(self):
+        source = Source.objects.create(name='foo')
+        now = timezone.now()
+        for days in (0, 1, 10):
+            NewsItem.objects.create(
+                title='foo', source=source, score=1, added_at=now - datetime.timedelta(days=days)
+            )
+
+        # the method being tested
+        call_command('metrics_backfill', '--since', (now - datetime.timedelta(days=1)).strftime('%Y-%m-%d'))
+
+        metrics = NewsItemDailyMetric.objects.filter(scored_count__gt=0)
+        self.assertEquals(2, metrics.count())
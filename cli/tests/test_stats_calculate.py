@@ -0,0 +1,111 @@
+import datetime
+import mock
+
+from django.conf import settings
+from django.core.cache import caches
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from core.models.newsitem import NewsItem
+from core.models.source import Source
+from core.models.statistic import Statistic
+from cli.management.commands import stats_calculate
+
+
+@override_settings(CACHES={
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+    # not the file based caches shared with the running application
+    'news': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'news'},
+    'stats': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'stats'},
+})
+class CommandTestCase(TestCase):
+
+    def setUp(self):
+        # retain the original imported packages
+        stats_calculate.publisher_real = stats_calculate.publisher
+
+        stats_calculate.publisher = mock.MagicMock()
+        stats_calculate.publisher.get_message_count.return_value = 3
+
+        self.source = Source.objects.create(name='foo')
+        self.command = stats_calculate.Command()
+
+    def tearDown(self):
+        # revert the packages to the original imported
+        stats_calculate.publisher = stats_calculate.publisher_real
+        caches['stats'].clear()
+
+    def create_news_items(self, count):
+        for _ in range(count):
+            NewsItem.objects.create(title='foo', source=self.source, added_at=timezone.now())
+
+    def test_handle_counts_all_news_items_when_no_stats_exist(self):
+        self.create_news_items(2)
+
+        # the method being tested
+        self.command.handle(full=False)
+
+        statistic = Statistic.objects.get()
+        news_item_id_max = NewsItem.objects.order_by('-id').first().id
+        self.assertEquals(2, statistic.news_items_count)
+        self.assertEquals(2, statistic.news_items_not_scored_count)
+        self.assertEquals(3, statistic.pending_classify_count)
+        # the recent news items are not settled yet
+        self.assertEquals(max(news_item_id_max - settings.STATS_NEWS_ITEMS_RECOUNT_IDS, 0), statistic.news_item_id_settled)
+        self.assertIsNone(statistic.accuracy_total)
+        # the about page reads the stats without querying
+        self.assertEquals(statistic.id, Statistic.get_latest().id)
+
+    @override_settings(STATS_NEWS_ITEMS_RECOUNT_IDS=1)
+    def test_handle_counts_only_news_items_added_since_last_stats(self):
+        self.create_news_items(3)
+        self.command.handle(full=False)
+        self.create_news_items(1)
+        # the count of the settled news items of the last stats is trusted
+        Statistic.objects.update(news_items_settled_count=10)
+
+        # the method being tested
+        with self.assertNumQueries(10):
+            self.command.handle(full=False)
+
+        statistic = Statistic.objects.order_by('-id').first()
+        self.assertEquals(11, statistic.news_items_settled_count)
+        self.assertEquals(12, statistic.news_items_count)
+
+    @override_settings(STATS_NEWS_ITEMS_RECOUNT_IDS=2)
+    def test_handle_counts_news_items_committed_after_ones_with_greater_id(self):
+        news_item = NewsItem.objects.create(title='foo', source=self.source, added_at=timezone.now())
+        NewsItem.objects.create(id=news_item.id + 2, title='foo', source=self.source, added_at=timezone.now())
+        self.command.handle(full=False)
+        self.assertEquals(2, Statistic.objects.get().news_items_count)
+
+        # the news item of a crawl transaction committed last
+        NewsItem.objects.create(id=news_item.id + 1, title='foo', source=self.source, added_at=timezone.now())
+
+        # the method being tested
+        self.command.handle(full=False)
+
+        self.assertEquals(3, Statistic.objects.order_by('-id').first().news_items_count)
+
+    def test_handle_counts_all_news_items_again_when_full(self):
+        self.create_news_items(2)
+        self.command.handle(full=False)
+        Statistic.objects.update(news_items_settled_count=10)
+
+        # the method being tested
+        self.command.handle(full=True)
+
+        self.assertEquals(2, Statistic.objects.order_by('-id').first().news_items_count)
+
+    def test_handle_deletes_stats_older_than_retention(self):
+        statistic_old = Statistic.objects.create(
+            created_at=timezone.now() - datetime.timedelta(days=settings.STATS_RETENTION_DAYS + 1)
+        )
+        statistic_recent = Statistic.objects.create(created_at=timezone.now() - datetime.timedelta(days=1))
+
+        # the method being tested
+        self.command.handle(full=False)
+
+        self.assertFalse(Statistic.objects.filter(id=statistic_old.id).exists())
+        self.assertTrue(Statistic.objects.filter(id=statistic_recent.id).exists())
+        self.assertEquals(2, Statistic.objects.count())
@@ -0,0 +1,40 @@
+import json
+
+from django.core import serializers
+from django.core.serializers.base import DeserializationError
+
+from core.models.newsitem import NewsItem
+
+
+class ClassifyMessage:
+
+    VERSION = 2
+
+    @staticmethod
+    def encode(news_item, is_self_train):
+        return json.dumps({
+            'v': ClassifyMessage.VERSION,
+            'id': news_item.id,
+            'title': news_item.title,
+            'self_train': is_self_train
+        })
+
+    @staticmethod
+    def decode(body, headers):
+        try:
+            message = json.loads(body)
+        except (TypeError, ValueError) as ex_json:
+            raise DeserializationError(str(ex_json))
+
+        # the full django serialization of the news item, published before the versioned messages
+        if isinstance(message, list):
+            queue_items = serializers.deserialize('json', body)
+            queue_item = next(queue_items).object
+            is_self_train = bool(headers and headers.get('x-is-self-train'))
+            return queue_item, is_self_train
+
+        if not isinstance(message, dict) or message.get('v') != ClassifyMessage.VERSION:
+            raise DeserializationError('Unsupported message version.')
+
+        queue_item = NewsItem(id=message['id'], title=message['title'])
+        return queue_item, bool(message['self_train'])
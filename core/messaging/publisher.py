@@ -0,0 +1,107 @@
+import itertools
+import os
+import threading
+
+from django.conf import settings
+import pika
+from pika.exceptions import AMQPChannelError, AMQPConnectionError
+
+
+class Publisher:
+    # Publishes to the queues over a long-lived connection for each thread, since pika connections
+    # are not thread safe. The connection is opened on the first publish and opened again when the
+    # broker closed it. Every batch is committed in a transaction, so the broker confirms a batch at
+    # once instead of each message.
+
+    def __init__(self):
+        self.local = threading.local()
+
+    @staticmethod
+    def get_connection_parameters():
+        # the connection only publishes, so it stays open between publishes without heartbeats
+        return pika.ConnectionParameters(
+            host=settings.QUEUE_HOSTNAME,
+            heartbeat=0,
+            blocked_connection_timeout=300
+        )
+
+    def get_channel(self):
+        channel = getattr(self.local, 'channel', None)
+        # a forked process does not share the connection of its parent
+        if channel is not None and channel.is_open and self.local.pid == os.getpid():
+            return channel
+
+        self.close()
+        connection = pika.BlockingConnection(self.get_connection_parameters())
+        channel = connection.channel()
+        channel.tx_select()
+
+        self.local.connection = connection
+        self.local.channel = channel
+        self.local.pid = os.getpid()
+        self.local.queues = dict()
+        return channel
+
+    def declare(self, channel, queue):
+        # a queue is declared once for each connection
+        if queue not in self.local.queues:
+            self.local.queues[queue] = channel.queue_declare(queue=queue, durable=True)
+        return self.local.queues[queue]
+
+    def publish(self, queue, body, headers=None):
+        return self.publish_many(queue, [body], headers)
+
+    def publish_many(self, queue, bodies, headers=None):
+        properties = pika.BasicProperties(delivery_mode=2, headers=headers)
+        bodies = iter(bodies)
+        count = 0
+
+        while True:
+            batch = list(itertools.islice(bodies, settings.QUEUE_PUBLISH_BATCH_SIZE))
+            if not batch:
+                return count
+
+            self.retry(self.publish_batch, queue, batch, properties)
+            count += len(batch)
+
+    def publish_batch(self, queue, batch, properties):
+        channel = self.get_channel()
+        self.declare(channel, queue)
+        for body in batch:
+            channel.basic_publish(exchange='', routing_key=queue, body=body, properties=properties)
+        channel.tx_commit()
+
+    def get_message_count(self, queue):
+        def get_message_count():
+            channel = self.get_channel()
+            # declared again, since the count is the one at the moment of the declaration
+            self.local.queues.pop(queue, None)
+            return self.declare(channel, queue).method.message_count
+
+        return self.retry(get_message_count)
+
+    def retry(self, method, *args):
+        # the broker rolls back the uncommitted messages of a lost connection, so they are
+        # published again over a new one
+        try:
+            return method(*args)
+        except (AMQPConnectionError, AMQPChannelError):
+            self.close()
+            return method(*args)
+
+    def close(self):
+        connection = getattr(self.local, 'connection', None)
+        self.local.connection = None
+        self.local.channel = None
+
+        if connection is None or self.local.pid != os.getpid():
+            return
+
+        try:
+            if connection.is_open:
+                connection.close()
+        except (AMQPConnectionError, AMQPChannelError):
+            pass
+
+
+publisher = Publisher()
@@ -0,0 +1,34 @@
+import json
+
+from django.core.serializers.base import DeserializationError
+
+
+class TrainMessage:
+
+    VERSION = 1
+
+    @staticmethod
+    def encode(news_item_ids=None):
+        # an empty message asks for a full retrain, like the messages published before the versioned ones
+        if news_item_ids is None:
+            return ''
+
+        return json.dumps({
+            'v': TrainMessage.VERSION,
+            'news_item_ids': sorted(set(news_item_ids))
+        })
+
+    @staticmethod
+    def decode(body):
+        if not body:
+            return None
+
+        try:
+            message = json.loads(body)
+        except (TypeError, ValueError) as ex_json:
+            raise DeserializationError(str(ex_json))
+
+        if not isinstance(message, dict) or message.get('v') != TrainMessage.VERSION:
+            raise DeserializationError('Unsupported message version.')
+
+        return [int(news_item_id) for news_item_id in message['news_item_ids']]
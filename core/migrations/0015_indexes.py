@@ -0,0 +1,41 @@
+# Generated by Django 3.1.3 on 2026-10-18 10:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0014_source_validators'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='corpus',
+            index=models.Index(fields=['news_item', 'positive'], name='corpus_news_item_positive_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='corpus',
+            index=models.Index(fields=['active', 'positive', 'added_at'], name='corpus_active_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='newsitem',
+            index=models.Index(fields=['source', 'title', 'added_at'], name='news_item_source_title_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='newsitem',
+            index=models.Index(fields=['published', 'added_at'], name='news_item_published_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='newsitem',
+            index=models.Index(fields=['score'], name='news_item_score_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='newsitem',
+            index=models.Index(fields=['added_at', 'score'], name='news_item_added_at_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='statistic',
+            index=models.Index(fields=['created_at'], name='statistics_created_at_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 3.1.3 on 2026-10-18 11:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0016_newsitem_daily_metric'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='statistic',
+            name='news_item_id_max',
+            field=models.PositiveIntegerField(null=True),
+        ),
+    ]
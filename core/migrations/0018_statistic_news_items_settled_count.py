@@ -0,0 +1,23 @@
+# Generated by Django 3.1.3 on 2026-10-18 15:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0017_statistic_news_item_id_max'),
+    ]
+
+    operations = [
+        migrations.RenameField(
+            model_name='statistic',
+            old_name='news_item_id_max',
+            new_name='news_item_id_settled',
+        ),
+        migrations.AddField(
+            model_name='statistic',
+            name='news_items_settled_count',
+            field=models.PositiveIntegerField(null=True),
+        ),
+    ]
@@ -10,6 +10,12 @@ class Corpus(models.Model):
         db_table = 'corpus'
         verbose_name = 'corpus'
         verbose_name_plural = 'corpora'
+        indexes = [
+            # news items excluded from or included in the homepage by their corpus
+            models.Index(fields=['news_item', 'positive'], name='corpus_news_item_positive_idx'),
+            # training set and corpora metrics
+            models.Index(fields=['active', 'positive', 'added_at'], name='corpus_active_idx'),
+        ]
 
     news_item = models.ForeignKey(NewsItem, null=False, on_delete=models.DO_NOTHING)
     positive = models.BooleanField(default=False, null=False)
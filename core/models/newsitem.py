@@ -1,6 +1,7 @@
 import datetime
 
 from django.db import models
+from django.db.models import Exists, Max, OuterRef, Q
 from django.utils import timezone
 from core.models.source import Source
 
@@ -9,6 +10,16 @@ class NewsItem(models.Model):
 
     class Meta:
         db_table = 'news_item'
+        indexes = [
+            # duplicates check of the crawler
+            models.Index(fields=['source', 'title', 'added_at'], name='news_item_source_title_idx'),
+            # newest published news items of the homepage and the feed
+            models.Index(fields=['published', 'added_at'], name='news_item_published_idx'),
+            # unscored news items, paginated by id
+            models.Index(fields=['score'], name='news_item_score_idx'),
+            # accuracy metrics and admin date filters
+            models.Index(fields=['added_at', 'score'], name='news_item_added_at_idx'),
+        ]
 
     title = models.CharField(max_length=300)
     description = models.TextField()
@@ -25,58 +36,82 @@ class NewsItem(models.Model):
             added_at__gt=added_at-datetime.timedelta(hours=24),
             source=source
         )
-        return len(news_items_existing) > 0
+        return news_items_existing.exists()
+
+    @staticmethod
+    def find_latest_added_at(titles, added_at_from, source):
+        news_items_existing = NewsItem.objects.filter(
+            title__in=titles,
+            added_at__gt=added_at_from,
+            source=source
+        ).values('title').annotate(added_at_latest=Max('added_at'))
+
+        # titles are compared case insensitively, like the database collation does
+        latest_added_at = dict()
+        for news_item in news_items_existing:
+            title = news_item['title'].lower()
+            if title not in latest_added_at or latest_added_at[title] < news_item['added_at_latest']:
+                latest_added_at[title] = news_item['added_at_latest']
+        return latest_added_at
+
+    @staticmethod
+    def bulk_insert(news_items, batch_size):
+        if not news_items:
+            return []
+
+        NewsItem.objects.bulk_create(news_items, batch_size=batch_size)
+        if all(news_item.pk for news_item in news_items):
+            return news_items
+
+        # the database backend did not return the primary keys, so find them by their natural key
+        keys = set(
+            (news_item.source_id, news_item.title, news_item.added_at) for news_item in news_items
+        )
+        news_items_inserted = NewsItem.objects.filter(
+            source_id__in=set(key[0] for key in keys),
+            title__in=set(key[1] for key in keys),
+            added_at__in=set(key[2] for key in keys)
+        ).order_by('id')
+        return [
+            news_item for news_item in news_items_inserted
+            if (news_item.source_id, news_item.title, news_item.added_at) in keys
+        ]
+
+    @staticmethod
+    def get_corpora(positive):
+        # imported here, since the corpus model depends on this one
+        from core.models.corpus import Corpus
+
+        # looked up per news item on the (news_item_id, positive) index, so the cost does not grow with the corpora
+        return Exists(Corpus.objects.filter(news_item=OuterRef('pk'), positive=positive))
 
     @staticmethod
     def find_positive(score_threshold, news_items_count):
-        return NewsItem.objects.raw('''
-            SELECT *
-            FROM news_item
-            WHERE (
-                score > %s
-                AND id NOT IN (
-                    SELECT news_item_id
-                    FROM corpus
-                    WHERE positive = 0
-                )
-                AND published = 1
-            ) OR id IN (
-                SELECT news_item_id
-                FROM corpus
-                WHERE positive = 1
-            )
-            AND published = 1
-            ORDER BY added_at DESC
-            LIMIT %s
-        ''', [score_threshold, news_items_count])
+        # published, and either scored positive without a negative corpus or with a positive corpus
+        return NewsItem.objects.annotate(
+            corpus_positive=NewsItem.get_corpora(True),
+            corpus_negative=NewsItem.get_corpora(False)
+        ).filter(
+            Q(score__gt=score_threshold, corpus_negative=False) | Q(corpus_positive=True),
+            published=True
+        ).select_related('source').order_by('-added_at')[:news_items_count]
 
     @staticmethod
-    def find_neutral():
-        return NewsItem.objects.raw('''
-            SELECT *
-            FROM news_item
-            WHERE published = 0
-            AND score = 1
-            AND id NOT IN (
-                SELECT news_item_id
-                FROM corpus
-            )
-        ''')
+    def find_neutral(news_item_ids=None):
+        news_items = NewsItem.objects.filter(published=False, score=1, corpus__isnull=True)
+        if news_item_ids is not None:
+            news_items = news_items.filter(id__in=news_item_ids)
+        return news_items
 
     @staticmethod
     def find_negative(score_threshold):
-        return NewsItem.objects.raw('''
-            SELECT *
-            FROM news_item
-            WHERE score < %s
-            AND id NOT IN (
-                SELECT news_item_id
-                FROM corpus
-                WHERE positive = 1
-            )
-            AND published = 0
-            ORDER BY added_at DESC;
-        ''', [score_threshold])
+        return NewsItem.objects.annotate(
+            corpus_positive=NewsItem.get_corpora(True)
+        ).filter(
+            score__lt=score_threshold,
+            published=False,
+            corpus_positive=False
+        ).order_by('-added_at')
 
     def __str__(self):
         return self.title
@@ -0,0 +1,96 @@
+import datetime
+
+from django.conf import settings
+from django.db import models
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from core.models.corpus import Corpus
+from core.models.newsitem import NewsItem
+
+
+class NewsItemDailyMetric(models.Model):
+
+    class Meta:
+        db_table = 'news_item_daily_metric'
+
+    # the day the news items were added, in UTC
+    date = models.DateField(unique=True)
+    scored_count = models.PositiveIntegerField(default=0)
+    positive_count = models.PositiveIntegerField(default=0)
+    negative_count = models.PositiveIntegerField(default=0)
+    # the scored news items corrected by the editors, once however many corpora they have
+    corpora_count = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    @staticmethod
+    def get_date(added_at):
+        if timezone.is_aware(added_at):
+            added_at = added_at.astimezone(datetime.timezone.utc)
+        return added_at.date()
+
+    @staticmethod
+    def refresh(dates):
+        # the counts of a day are counted again from its news items, so a refresh never drifts
+        for date in sorted(set(dates)):
+            added_at_from = datetime.datetime.combine(date, datetime.time(), tzinfo=datetime.timezone.utc)
+            added_at_to = added_at_from + datetime.timedelta(days=1)
+            news_items = NewsItem.objects.filter(
+                added_at__gte=added_at_from,
+                added_at__lt=added_at_to,
+                score__isnull=False
+            )
+
+            counts = news_items.aggregate(
+                scored_count=Count('id'),
+                positive_count=Count('id', filter=Q(score__gte=settings.SENTIMENT_POLARITY_THRESHOLD)),
+                negative_count=Count('id', filter=Q(score__lt=settings.SENTIMENT_POLARITY_THRESHOLD))
+            )
+            counts.update(Corpus.objects.filter(
+                news_item__added_at__gte=added_at_from,
+                news_item__added_at__lt=added_at_to,
+                news_item__score__isnull=False
+            ).aggregate(corpora_count=Count('news_item', distinct=True)))
+
+            NewsItemDailyMetric.objects.update_or_create(date=date, defaults=counts)
+
+    @staticmethod
+    def refresh_news_items(news_item_ids):
+        # the news items of the queue know only their id and title, so the days are found in the database
+        added_at = NewsItem.objects.filter(id__in=set(news_item_ids)).values_list('added_at', flat=True)
+        NewsItemDailyMetric.refresh(NewsItemDailyMetric.get_date(value) for value in added_at)
+
+    @staticmethod
+    def backfill(date_from=None):
+        added_at_first = NewsItem.objects.order_by('added_at').values_list('added_at', flat=True).first()
+        if added_at_first is None:
+            return 0
+
+        date = max(NewsItemDailyMetric.get_date(added_at_first), date_from or datetime.date.min)
+        date_to = NewsItemDailyMetric.get_date(timezone.now())
+        days = 0
+        while date <= date_to:
+            NewsItemDailyMetric.refresh([date])
+            date += datetime.timedelta(days=1)
+            days += 1
+        return days
+
+    @staticmethod
+    def filter_date_range(date_range):
+        # only the days the range covers whole are counted, like the range of the raw news items did
+        date_from = datetime.datetime.strptime(date_range['date_from'], '%Y-%m-%d %H:%M:%S')
+        date_to = datetime.datetime.strptime(date_range['date_to'], '%Y-%m-%d %H:%M:%S')
+        if date_from.time() != datetime.time():
+            date_from += datetime.timedelta(days=1)
+        if date_to.time() != datetime.time(23, 59, 59):
+            date_to -= datetime.timedelta(days=1)
+
+        return NewsItemDailyMetric.objects.filter(
+            date__gte=date_from.date(),
+            date__lte=date_to.date(),
+            scored_count__gt=0
+        )
+
+    @staticmethod
+    def get_accuracy(scored_count, corpora_count):
+        return 100 - round(corpora_count / scored_count * 100, 2)
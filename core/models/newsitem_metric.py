@@ -1,5 +1,6 @@
-from django.db import connection
+from django.db.models import Sum
 from core.models.newsitem import NewsItem
+from core.models.newsitem_daily_metric import NewsItemDailyMetric
 
 
 class NewsItemMetric(NewsItem):
@@ -18,58 +19,21 @@ class NewsItemMetric(NewsItem):
         ]
 
     def get_accuracy(self, date_range):
-        with connection.cursor() as cursor:
-            cursor.execute('''
-                SELECT (
-                    100 - ROUND(errors.error, 2)
-                ) AS accuracy,
-                added_at
-                FROM (
-                    SELECT (
-                        (counts.corpus_count / counts.news_count) * 100
-                    ) AS error,
-                    added_at
-                    FROM (
-                        SELECT
-                        COUNT(news_and_corpora.news_item_id) AS news_count,
-                        COUNT(news_and_corpora.corpus_id) AS corpus_count,
-                        added_at
-                        FROM (
-                            SELECT ni.id AS news_item_id, c.id AS corpus_id, DATE_FORMAT(ni.added_at, "%%Y-%%m-%%d") AS added_at
-                            FROM news_item AS ni
-                            LEFT JOIN corpus AS c ON c.news_item_id = ni.id
-                            WHERE ni.added_at BETWEEN %s AND %s
-                            AND NOT ni.score IS NULL
-                        ) AS news_and_corpora
-                        GROUP BY added_at
-                    ) AS counts
-                    GROUP BY added_at
-                ) AS errors;
-            ''', (date_range['date_from'], date_range['date_to']))
-            return self.to_dict(cursor)
+        metrics = NewsItemDailyMetric.filter_date_range(date_range).order_by('date')
+        return [
+            {
+                'accuracy': NewsItemDailyMetric.get_accuracy(metric.scored_count, metric.corpora_count),
+                'added_at': metric.date.strftime('%Y-%m-%d')
+            }
+            for metric in metrics
+        ]
 
     def get_accuracy_total(self, date_range):
-        with connection.cursor() as cursor:
-            cursor.execute('''
-                SELECT (
-                    100 - ROUND(errors.error, 2)
-                ) AS accuracy
-                FROM (
-                    SELECT (
-                        (counts.corpus_count / counts.news_count) * 100
-                    ) AS error
-                    FROM (
-                        SELECT
-                        COUNT(news_and_corpora.news_item_id) AS news_count,
-                        COUNT(news_and_corpora.corpus_id) AS corpus_count
-                        FROM (
-                            SELECT ni.id AS news_item_id, c.id AS corpus_id
-                            FROM news_item AS ni
-                            LEFT JOIN corpus AS c ON c.news_item_id = ni.id
-                            WHERE ni.added_at BETWEEN %s AND %s
-                            AND NOT ni.score IS NULL
-                        ) AS news_and_corpora
-                    ) AS counts
-                ) AS errors;
-            ''', (date_range['date_from'], date_range['date_to']))
-            return self.to_dict(cursor)[0]['accuracy']
+        counts = NewsItemDailyMetric.filter_date_range(date_range).aggregate(
+            scored_count=Sum('scored_count'),
+            corpora_count=Sum('corpora_count')
+        )
+        if not counts['scored_count']:
+            return None
+
+        return NewsItemDailyMetric.get_accuracy(counts['scored_count'], counts['corpora_count'])
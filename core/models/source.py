@@ -14,6 +14,9 @@ class Source(models.Model):
     last_crawl = models.DateTimeField(blank=True, null=True)
     pending = models.BooleanField(blank=False, null=False, default=False)
     active = models.BooleanField(blank=False, null=False, default=True)
+    etag = models.CharField(max_length=255, blank=True, null=True)
+    last_modified = models.CharField(max_length=100, blank=True, null=True)
+    content_hash = models.CharField(max_length=64, blank=True, null=True)
 
     def get_minutes_since_last_crawl(self):
         if self.last_crawl is None:
@@ -21,6 +24,14 @@ class Source(models.Model):
 
         return abs((timezone.now() - self.last_crawl).seconds / 60)
 
+    def get_conditional_headers(self):
+        headers = dict()
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
     def crawling(self):
         self.pending = True
         self.save()
@@ -1,3 +1,5 @@
+from django.conf import settings
+from django.core.cache import caches
 from django.db import models
 from django.utils import timezone
 
@@ -6,6 +8,9 @@ class Statistic(models.Model):
 
     class Meta:
         db_table = 'statistics'
+        indexes = [
+            models.Index(fields=['created_at'], name='statistics_created_at_idx'),
+        ]
 
     accuracy_total = models.SmallIntegerField(null=True)
     news_items_count = models.PositiveIntegerField(null=True)
@@ -13,4 +18,23 @@ class Statistic(models.Model):
     news_items_not_scored_count = models.PositiveIntegerField(null=True)
     corpora_count = models.IntegerField(null=True)
     sources_count = models.SmallIntegerField(null=True)
+    # the news items up to this id are in news_items_settled_count, so the next run counts only the ones
+    # after, the recent ones being counted again each run as they may be committed out of id order
+    news_item_id_settled = models.PositiveIntegerField(null=True)
+    news_items_settled_count = models.PositiveIntegerField(null=True)
     created_at = models.DateTimeField(default=timezone.now)
+
+    @staticmethod
+    def get_latest():
+        cache = caches['stats']
+        statistic = cache.get('latest')
+        if statistic is None:
+            # the newest statistic, even of a previous day, until stats_calculate runs again
+            statistic = Statistic.objects.order_by('-created_at').first()
+            if statistic is not None:
+                cache.set('latest', statistic, settings.WEB_STATS_CACHE_TIMEOUT)
+        return statistic
+
+    @staticmethod
+    def set_latest(statistic):
+        caches['stats'].set('latest', statistic, settings.WEB_STATS_CACHE_TIMEOUT)
@@ -0,0 +1,76 @@
+import functools
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+# The pages listing the positive news items are cached until the published news items change. Every
+# change stores a new version, which is part of the keys of the pages, their ETag and Last-Modified.
+# The pages show how long ago the news items were added, so they are also rendered again every
+# WEB_NEWS_CACHE_TIMEOUT seconds, the period being part of the keys as well.
+KEY_VERSION = 'version'
+
+
+def get_cache():
+    return caches['news']
+
+
+def get_version():
+    cache = get_cache()
+    version = cache.get(KEY_VERSION)
+    if version is None:
+        # the cache was cleared, so the pages cached before are not known to be current
+        cache.add(KEY_VERSION, int(time.time()), None)
+        version = cache.get(KEY_VERSION)
+    return version
+
+
+def invalidate():
+    # the versions are whole seconds, as Last-Modified, and always increase, so two changes
+    # within a second still get different Last-Modified values
+    cache = get_cache()
+    version = cache.get(KEY_VERSION) or 0
+    cache.set(KEY_VERSION, max(int(time.time()), int(version) + 1), None)
+
+
+def cached(name):
+    def decorator(view):
+        @functools.wraps(view)
+        def view_cached(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return view(request, *args, **kwargs)
+
+            version = get_version()
+            now = int(time.time())
+            period = now - now % settings.WEB_NEWS_CACHE_TIMEOUT
+            etag = '"{}-{}-{}"'.format(name, version, period)
+            last_modified = max(version, period)
+
+            response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+            if response is not None:
+                response['ETag'] = etag
+                response['Last-Modified'] = http_date(last_modified)
+                return response
+
+            cache = get_cache()
+            key = '{}:{}:{}'.format(name, version, period)
+            page = cache.get(key)
+            if page is None:
+                response = view(request, *args, **kwargs)
+                if response.status_code != 200 or response.streaming:
+                    return response
+
+                page = (response.content, response['Content-Type'])
+                cache.set(key, page, settings.WEB_NEWS_CACHE_TIMEOUT)
+
+            response = HttpResponse(page[0], content_type=page[1])
+            response['ETag'] = etag
+            response['Last-Modified'] = http_date(last_modified)
+            return response
+
+        return view_cached
+
+    return decorator
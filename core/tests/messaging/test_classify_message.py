@@ -0,0 +1,54 @@
+import json
+
+from django.core import serializers
+from django.core.serializers.base import DeserializationError
+from django.test import TestCase
+
+from core.messaging.classify_message import ClassifyMessage
+from core.models.newsitem import NewsItem
+
+
+class ClassifyMessageTestCase(TestCase):
+
+    news_item = None
+
+    def setUp(self):
+        self.news_item = NewsItem()
+        self.news_item.id = 1
+        self.news_item.title = 'foo'
+        self.news_item.description = 'a long description that does not get enqueued'
+
+    def test_encode_returns_versioned_message_without_description(self):
+        message = json.loads(ClassifyMessage.encode(self.news_item, True))
+
+        self.assertEquals({'v': 2, 'id': 1, 'title': 'foo', 'self_train': True}, message)
+
+    def test_decode_returns_news_item_and_self_train_flag(self):
+        body = ClassifyMessage.encode(self.news_item, True)
+
+        queue_item, is_self_train = ClassifyMessage.decode(body.encode(), {})
+
+        self.assertEquals(1, queue_item.id)
+        self.assertEquals('foo', queue_item.title)
+        self.assertEquals(True, is_self_train)
+
+    def test_decode_returns_news_item_of_legacy_message(self):
+        body = serializers.serialize('json', [self.news_item])
+
+        queue_item, is_self_train = ClassifyMessage.decode(body, {'x-is-self-train': True})
+
+        self.assertEquals(1, queue_item.id)
+        self.assertEquals('foo', queue_item.title)
+        self.assertEquals(True, is_self_train)
+
+    def test_decode_raises_exception_when_body_is_not_json(self):
+        with self.assertRaises(DeserializationError):
+            ClassifyMessage.decode('foo', {})
+
+    def test_decode_raises_exception_when_version_is_not_supported(self):
+        with self.assertRaises(DeserializationError):
+            ClassifyMessage.decode(json.dumps({'v': 99, 'id': 1}), {})
+
+    def test_decode_raises_exception_when_legacy_message_is_empty(self):
+        with self.assertRaises(StopIteration):
+            ClassifyMessage.decode('[]', {})
@@ -0,0 +1,116 @@
+import mock
+
+from django.conf import settings
+from django.test import TestCase
+from pika.exceptions import ConnectionClosed
+
+from core.messaging import publisher
+
+
+class PublisherTestCase(TestCase):
+
+    def setUp(self):
+        # retain the original imported packages
+        publisher.pika_real = publisher.pika
+
+        publisher.pika = mock.MagicMock()
+        self.connections = list()
+        publisher.pika.BlockingConnection = mock.MagicMock(side_effect=self.connect)
+
+        self.publisher = publisher.Publisher()
+
+    def tearDown(self):
+        # revert the packages to the original imported
+        publisher.pika = publisher.pika_real
+
+    def connect(self, parameters):
+        connection = mock.MagicMock()
+        connection.channel.return_value.is_open = True
+        self.connections.append(connection)
+        return connection
+
+    def test_publish_many_commits_once_per_batch(self):
+        with self.settings(QUEUE_PUBLISH_BATCH_SIZE=2):
+            # the method being tested
+            count = self.publisher.publish_many('foo', (str(index) for index in range(5)), {'bar': True})
+
+        self.assertEquals(5, count)
+        channel = self.connections[0].channel.return_value
+        channel.tx_select.assert_called_once()
+        channel.queue_declare.assert_called_once_with(queue='foo', durable=True)
+        self.assertEquals(
+            ['0', '1', '2', '3', '4'],
+            [call[1]['body'] for call in channel.basic_publish.call_args_list]
+        )
+        self.assertEquals(3, channel.tx_commit.call_count)
+        publisher.pika.BasicProperties.assert_called_once_with(delivery_mode=2, headers={'bar': True})
+
+    def test_publish_reuses_connection(self):
+        # the method being tested
+        self.publisher.publish(settings.QUEUE_NAME_TRAIN, 'foo')
+        self.publisher.publish(settings.QUEUE_NAME_TRAIN, 'bar')
+
+        self.assertEquals(1, len(self.connections))
+        channel = self.connections[0].channel.return_value
+        channel.queue_declare.assert_called_once()
+        self.assertEquals(2, channel.basic_publish.call_count)
+        self.assertEquals(2, channel.tx_commit.call_count)
+
+    def test_publish_reconnects_when_connection_was_closed(self):
+        self.publisher.publish(settings.QUEUE_NAME_TRAIN, 'foo')
+        # the broker closed the connection since
+        self.connections[0].channel.return_value.is_open = False
+
+        # the method being tested
+        self.publisher.publish(settings.QUEUE_NAME_TRAIN, 'bar')
+
+        self.assertEquals(2, len(self.connections))
+        self.connections[1].channel.return_value.queue_declare.assert_called_once()
+        self.connections[1].channel.return_value.basic_publish.assert_called_once()
+
+    def test_publish_publishes_batch_again_when_connection_is_lost(self):
+        self.publisher.publish(settings.QUEUE_NAME_TRAIN, 'foo')
+        channel = self.connections[0].channel.return_value
+        channel.basic_publish.side_effect = ConnectionClosed()
+
+        # the method being tested
+        self.publisher.publish(settings.QUEUE_NAME_TRAIN, 'bar')
+
+        self.assertEquals(2, len(self.connections))
+        self.connections[1].channel.return_value.basic_publish.assert_called_once_with(
+            exchange='',
+            routing_key=settings.QUEUE_NAME_TRAIN,
+            body='bar',
+            properties=mock.ANY
+        )
+        self.connections[1].channel.return_value.tx_commit.assert_called_once()
+
+    def test_publish_raises_when_reconnecting_fails(self):
+        publisher.pika.BlockingConnection = mock.MagicMock(side_effect=ConnectionClosed())
+
+        with self.assertRaises(ConnectionClosed):
+            # the method being tested
+            self.publisher.publish(settings.QUEUE_NAME_TRAIN, 'foo')
+
+        self.assertEquals(2, publisher.pika.BlockingConnection.call_count)
+
+    def test_get_message_count_returns_count_of_queue(self):
+        self.publisher.publish(settings.QUEUE_NAME_CLASSIFY, 'foo')
+        channel = self.connections[0].channel.return_value
+        channel.queue_declare.return_value.method.message_count = 3
+
+        # the method being tested
+        self.assertEquals(3, self.publisher.get_message_count(settings.QUEUE_NAME_CLASSIFY))
+
+        # declared again for the current count
+        self.assertEquals(2, channel.queue_declare.call_count)
+
+    def test_close_closes_connection(self):
+        self.publisher.publish(settings.QUEUE_NAME_TRAIN, 'foo')
+
+        # the method being tested
+        self.publisher.close()
+        self.publisher.publish(settings.QUEUE_NAME_TRAIN, 'bar')
+
+        self.connections[0].close.assert_called_once()
+        self.assertEquals(2, len(self.connections))
@@ -0,0 +1,33 @@
+import json
+
+from django.core.serializers.base import DeserializationError
+from django.test import TestCase
+
+from core.messaging.train_message import TrainMessage
+
+
+class TrainMessageTestCase(TestCase):
+
+    def test_encode_returns_empty_message_for_full_retrain(self):
+        self.assertEquals('', TrainMessage.encode())
+
+    def test_encode_returns_versioned_message_with_unique_news_item_ids(self):
+        message = json.loads(TrainMessage.encode([2, 1, 2]))
+
+        self.assertEquals({'v': 1, 'news_item_ids': [1, 2]}, message)
+
+    def test_decode_returns_none_for_empty_message(self):
+        self.assertEquals(None, TrainMessage.decode(b''))
+
+    def test_decode_returns_news_item_ids(self):
+        body = TrainMessage.encode([1, 2])
+
+        self.assertEquals([1, 2], TrainMessage.decode(body.encode()))
+
+    def test_decode_raises_deserialization_error_when_message_is_not_json(self):
+        with self.assertRaises(DeserializationError):
+            TrainMessage.decode(b'foo')
+
+    def test_decode_raises_deserialization_error_when_version_is_not_supported(self):
+        with self.assertRaises(DeserializationError):
+            TrainMessage.decode(json.dumps({'v': 99, 'news_item_ids': [1]}))
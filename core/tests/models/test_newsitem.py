@@ -3,6 +3,7 @@ import datetime
 from django.conf import settings
 from django.test import TestCase
 from django.utils import timezone
+from core.models.corpus import Corpus
 from core.models.newsitem import NewsItem
 from core.models.source import Source
 
@@ -68,6 +69,58 @@ class NewsItemTestCase(TestCase):
 
         self.assertEquals(False, exists)
 
+    def test_find_latest_added_at_returns_empty_dict_when_no_newsitem_exists(self):
+        source = Source()
+        source.name = 'foo'
+        source.save()
+
+        latest_added_at = NewsItem.find_latest_added_at(
+            ['foo'], timezone.now() - datetime.timedelta(hours=24), source
+        )
+
+        self.assertEquals({}, latest_added_at)
+
+    def test_find_latest_added_at_returns_latest_date_of_each_existing_title(self):
+        source = Source()
+        source.name = 'foo'
+        source.save()
+
+        now = timezone.now()
+        for title, hours in [('foo', 1), ('Foo', 2), ('bar', 30), ('baz', 1)]:
+            news_item = NewsItem()
+            news_item.title = title
+            news_item.added_at = now - datetime.timedelta(hours=hours)
+            news_item.source = source
+            news_item.save()
+
+        latest_added_at = NewsItem.find_latest_added_at(
+            ['foo', 'Foo', 'bar'], now - datetime.timedelta(hours=24), source
+        )
+
+        # titles are case insensitive, out of range and not requested titles are ignored
+        self.assertEquals({'foo': now - datetime.timedelta(hours=1)}, latest_added_at)
+
+    def test_bulk_insert_returns_empty_list_when_no_newsitems(self):
+        self.assertEquals([], NewsItem.bulk_insert([], 100))
+
+    def test_bulk_insert_stores_newsitems_and_returns_them_with_primary_keys(self):
+        source = Source()
+        source.name = 'foo'
+        source.save()
+
+        news_items = list()
+        for title in ['foo', 'bar']:
+            news_item = NewsItem()
+            news_item.title = title
+            news_item.source = source
+            news_items.append(news_item)
+
+        news_items = NewsItem.bulk_insert(news_items, 1)
+
+        self.assertEquals(2, NewsItem.objects.count())
+        self.assertEquals(['foo', 'bar'], [news_item.title for news_item in news_items])
+        self.assertTrue(all(news_item.pk for news_item in news_items))
+
     def test_find_positive_returns_empty_list_when_no_newsitems_exist(self):
         news_items = self.news_item.find_positive(
             settings.SENTIMENT_POLARITY_THRESHOLD,
@@ -138,6 +191,80 @@ class NewsItemTestCase(TestCase):
 
         self.assertEquals([], list(news_items))
 
+    def create_news_item(self, title, score, published, corpora=(), minutes_ago=0):
+        news_item = NewsItem()
+        news_item.title = title
+        news_item.score = score
+        news_item.published = published
+        news_item.added_at = timezone.now() - datetime.timedelta(minutes=minutes_ago)
+        news_item.save()
+
+        for positive in corpora:
+            corpus = Corpus()
+            corpus.news_item = news_item
+            corpus.positive = positive
+            corpus.save()
+        return news_item
+
+    def test_find_positive_returns_published_newsitems_positive_by_score_or_corpus(self):
+        self.create_news_item('positive', 1, True)
+        self.create_news_item('positive with negative corpus', 1, True, [False])
+        self.create_news_item('negative with positive corpus', 0, True, [True])
+        self.create_news_item('unscored with positive corpus', None, True, [True])
+        self.create_news_item('positive with both corpora', 1, True, [False, True])
+        self.create_news_item('unpublished with positive corpus', 0, False, [True])
+        self.create_news_item('unpublished positive', 1, False)
+        self.create_news_item('negative', 0, True)
+        self.create_news_item('negative with negative corpus', 0, True, [False])
+
+        news_items = NewsItem.find_positive(settings.SENTIMENT_POLARITY_THRESHOLD, settings.RSS_FEED_NEWS_ITEMS_COUNT)
+
+        self.assertEquals(
+            {'positive', 'negative with positive corpus', 'unscored with positive corpus', 'positive with both corpora'},
+            set(news_item.title for news_item in news_items)
+        )
+
+    def test_find_positive_returns_newest_newsitems_up_to_count(self):
+        self.create_news_item('foo', 1, True, minutes_ago=3)
+        self.create_news_item('bar', 1, True, minutes_ago=1)
+        self.create_news_item('baz', 0, True, [True], minutes_ago=2)
+
+        news_items = NewsItem.find_positive(settings.SENTIMENT_POLARITY_THRESHOLD, 2)
+
+        self.assertEquals(['bar', 'baz'], [news_item.title for news_item in news_items])
+
+    def test_find_positive_does_not_duplicate_newsitems_with_many_corpora(self):
+        self.create_news_item('foo', 1, True, [True, True, True])
+
+        news_items = NewsItem.find_positive(settings.SENTIMENT_POLARITY_THRESHOLD, settings.RSS_FEED_NEWS_ITEMS_COUNT)
+
+        self.assertEquals(['foo'], [news_item.title for news_item in news_items])
+
+    def test_find_negative_returns_unpublished_negative_newsitems_without_positive_corpus(self):
+        self.create_news_item('negative', 0, False, minutes_ago=2)
+        self.create_news_item('negative with negative corpus', 0, False, [False], minutes_ago=1)
+        self.create_news_item('negative with positive corpus', 0, False, [True])
+        self.create_news_item('published negative', 0, True)
+        self.create_news_item('positive', 1, False)
+        self.create_news_item('unscored', None, False)
+
+        news_items = NewsItem.find_negative(settings.SENTIMENT_POLARITY_THRESHOLD)
+
+        self.assertEquals(
+            ['negative with negative corpus', 'negative'],
+            [news_item.title for news_item in news_items]
+        )
+
+    def test_find_neutral_returns_unpublished_positive_newsitems_without_corpus(self):
+        news_item = self.create_news_item('neutral', 1, False)
+        self.create_news_item('neutral with corpus', 1, False, [True])
+        self.create_news_item('published positive', 1, True)
+        self.create_news_item('negative', 0, False)
+
+        self.assertEquals(['neutral'], [news_item.title for news_item in NewsItem.find_neutral()])
+        self.assertEquals(['neutral'], [news_item.title for news_item in NewsItem.find_neutral([news_item.id])])
+        self.assertEquals([], list(NewsItem.find_neutral([news_item.id + 100])))
+
     def test_str_returns_title_when_title_is_set(self):
         self.news_item.title = 'foo'
         self.assertEquals('foo', str(self.news_item))
@@ -0,0 +1,98 @@
+import datetime
+
+from django.test import TestCase
+from core.models.corpus import Corpus
+from core.models.newsitem import NewsItem
+from core.models.newsitem_daily_metric import NewsItemDailyMetric
+from core.models.source import Source
+
+
+class NewsItemDailyMetricTestCase(TestCase):
+
+    def setUp(self):
+        self.source = Source.objects.create(name='foo')
+
+    def create_news_item(self, score, added_at):
+        return NewsItem.objects.create(
+            title='foo',
+            source=self.source,
+            score=score,
+            added_at=added_at
+        )
+
+    def test_refresh_news_items_counts_scored_news_items_and_corpora_of_their_day(self):
+        added_at = datetime.datetime(2018, 12, 3, 10, 0, 0, tzinfo=datetime.timezone.utc)
+        news_item_positive = self.create_news_item(1, added_at)
+        news_item_negative = self.create_news_item(0, added_at + datetime.timedelta(hours=1))
+        self.create_news_item(None, added_at)
+        # a news item of the day after
+        self.create_news_item(1, added_at + datetime.timedelta(days=1))
+        Corpus.objects.create(news_item=news_item_negative, positive=True)
+
+        # the method being tested
+        NewsItemDailyMetric.refresh_news_items([news_item_positive.id, news_item_negative.id])
+
+        metric = NewsItemDailyMetric.objects.get()
+        self.assertEquals(datetime.date(2018, 12, 3), metric.date)
+        self.assertEquals(2, metric.scored_count)
+        self.assertEquals(1, metric.positive_count)
+        self.assertEquals(1, metric.negative_count)
+        self.assertEquals(1, metric.corpora_count)
+
+    def test_refresh_counts_news_item_with_several_corpora_once(self):
+        added_at = datetime.datetime(2018, 12, 3, 10, 0, 0, tzinfo=datetime.timezone.utc)
+        news_item = self.create_news_item(1, added_at)
+        Corpus.objects.create(news_item=news_item, positive=True)
+        Corpus.objects.create(news_item=news_item, positive=False)
+
+        # the method being tested
+        NewsItemDailyMetric.refresh([added_at.date()])
+
+        metric = NewsItemDailyMetric.objects.get()
+        self.assertEquals(1, metric.scored_count)
+        self.assertEquals(1, metric.corpora_count)
+        self.assertEquals(0, NewsItemDailyMetric.get_accuracy(metric.scored_count, metric.corpora_count))
+
+    def test_refresh_counts_again_when_news_items_change(self):
+        added_at = datetime.datetime(2018, 12, 3, 10, 0, 0, tzinfo=datetime.timezone.utc)
+        news_item = self.create_news_item(1, added_at)
+        NewsItemDailyMetric.refresh([added_at.date()])
+
+        news_item.delete()
+
+        # the method being tested
+        NewsItemDailyMetric.refresh([added_at.date()])
+
+        metric = NewsItemDailyMetric.objects.get()
+        self.assertEquals(0, metric.scored_count)
+        self.assertEquals(0, metric.positive_count)
+
+    def test_backfill_counts_every_day_since_date(self):
+        added_at = datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(days=5)
+        self.create_news_item(1, added_at)
+
+        # the method being tested
+        days = NewsItemDailyMetric.backfill(added_at.date() + datetime.timedelta(days=2))
+
+        self.assertEquals(4, days)
+        self.assertEquals(4, NewsItemDailyMetric.objects.count())
+        self.assertEquals(0, NewsItemDailyMetric.objects.filter(scored_count__gt=0).count())
+
+    def test_backfill_returns_zero_when_no_newsitems_exist(self):
+        # the method being tested
+        self.assertEquals(0, NewsItemDailyMetric.backfill())
+
+    def test_filter_date_range_excludes_days_not_covered_whole(self):
+        for day in (2, 3, 4):
+            NewsItemDailyMetric.objects.create(date=datetime.date(2018, 12, day), scored_count=1)
+
+        # the method being tested
+        metrics = NewsItemDailyMetric.filter_date_range({
+            'date_from': '2018-12-02 12:00:00',
+            'date_to': '2018-12-04 23:59:59'
+        })
+
+        self.assertEquals(
+            [datetime.date(2018, 12, 3), datetime.date(2018, 12, 4)],
+            [metric.date for metric in metrics.order_by('date')]
+        )
@@ -4,6 +4,7 @@ from django.test import TestCase
 from django.utils import timezone
 from core.models.corpus import Corpus
 from core.models.newsitem import NewsItem
+from core.models.newsitem_daily_metric import NewsItemDailyMetric
 from core.models.newsitem_metric import NewsItemMetric
 from core.models.source import Source
 
@@ -19,6 +20,10 @@ class NewsItemMetricTestCase(TestCase):
     def setUp(self):
         self.newsitem_metric = NewsItemMetric()
 
+    @staticmethod
+    def refresh_daily_metrics():
+        NewsItemDailyMetric.refresh_news_items(NewsItem.objects.values_list('id', flat=True))
+
     def test_to_dict_returns_empty_list_when_cursor_with_no_results(self):
         with connection.cursor() as cursor:
             cursor.execute('SELECT * FROM news_item')
@@ -79,6 +84,7 @@ class NewsItemMetricTestCase(TestCase):
         self.assertEquals(dict, type(results[1]))
 
     def test_get_accuracy_returns_empty_list_when_no_newsitems_at_all(self):
+        self.refresh_daily_metrics()
         metrics = self.newsitem_metric.get_accuracy(self.date_range)
         self.assertEquals([], metrics)
 
@@ -94,6 +100,7 @@ class NewsItemMetricTestCase(TestCase):
         news_item.added_at = '2018-11-24 02:00:00+00:00'
         news_item.save()
 
+        self.refresh_daily_metrics()
         metrics = self.newsitem_metric.get_accuracy(self.date_range)
         self.assertEquals([], metrics)
 
@@ -108,6 +115,7 @@ class NewsItemMetricTestCase(TestCase):
         news_item.added_at = '2018-11-26 01:00:00+00:00'
         news_item.save()
 
+        self.refresh_daily_metrics()
         metrics = self.newsitem_metric.get_accuracy(self.date_range)
         self.assertEquals([], metrics)
 
@@ -117,6 +125,7 @@ class NewsItemMetricTestCase(TestCase):
         news_item.added_at = '2018-11-24 01:00:00+00:00'
         news_item.save()
 
+        self.refresh_daily_metrics()
         metrics = self.newsitem_metric.get_accuracy(self.date_range)
         self.assertEquals(1, len(metrics))
         self.assertEquals(100, metrics[0]['accuracy'])
@@ -138,6 +147,7 @@ class NewsItemMetricTestCase(TestCase):
         news_item.added_at = '2018-11-24 02:00:00+00:00'
         news_item.save()
 
+        self.refresh_daily_metrics()
         metrics = self.newsitem_metric.get_accuracy(self.date_range)
         self.assertEquals(1, len(metrics))
         self.assertEquals(50, metrics[0]['accuracy'])
@@ -154,6 +164,7 @@ class NewsItemMetricTestCase(TestCase):
         corpus.positive = False
         corpus.save()
 
+        self.refresh_daily_metrics()
         metrics = self.newsitem_metric.get_accuracy(self.date_range)
         self.assertEquals(1, len(metrics))
         self.assertEquals(0, metrics[0]['accuracy'])
@@ -175,6 +186,7 @@ class NewsItemMetricTestCase(TestCase):
         news_item.added_at = '2018-11-25 01:00:00+00:00'
         news_item.save()
 
+        self.refresh_daily_metrics()
         metrics = self.newsitem_metric.get_accuracy(self.date_range)
         self.assertEquals(2, len(metrics))
         self.assertEquals('2018-11-24', metrics[0]['added_at'])
@@ -183,6 +195,7 @@ class NewsItemMetricTestCase(TestCase):
         self.assertEquals(100, metrics[1]['accuracy'])
 
     def test_get_accuracy_total_returns_none_when_no_newsitems_at_all(self):
+        self.refresh_daily_metrics()
         metrics = self.newsitem_metric.get_accuracy_total(self.date_range)
         self.assertEquals(None, metrics)
 
@@ -198,6 +211,7 @@ class NewsItemMetricTestCase(TestCase):
         news_item.added_at = '2018-11-24 02:00:00+00:00'
         news_item.save()
 
+        self.refresh_daily_metrics()
         accuracy = self.newsitem_metric.get_accuracy_total(self.date_range)
         self.assertEquals(None, accuracy)
 
@@ -212,6 +226,7 @@ class NewsItemMetricTestCase(TestCase):
         news_item.added_at = '2018-11-26 01:00:00+00:00'
         news_item.save()
 
+        self.refresh_daily_metrics()
         accuracy = self.newsitem_metric.get_accuracy_total(self.date_range)
         self.assertEquals(None, accuracy)
 
@@ -221,6 +236,7 @@ class NewsItemMetricTestCase(TestCase):
         news_item.added_at = '2018-11-24 01:00:00+00:00'
         news_item.save()
 
+        self.refresh_daily_metrics()
         accuracy = self.newsitem_metric.get_accuracy_total(self.date_range)
         self.assertEquals(100, accuracy)
 
@@ -240,6 +256,7 @@ class NewsItemMetricTestCase(TestCase):
         news_item.added_at = '2018-11-24 02:00:00+00:00'
         news_item.save()
 
+        self.refresh_daily_metrics()
         accuracy = self.newsitem_metric.get_accuracy_total(self.date_range)
         self.assertEquals(50.0, accuracy)
 
@@ -254,6 +271,7 @@ class NewsItemMetricTestCase(TestCase):
         corpus.positive = False
         corpus.save()
 
+        self.refresh_daily_metrics()
         accuracy = self.newsitem_metric.get_accuracy_total(self.date_range)
         self.assertEquals(0.0, accuracy)
 
@@ -273,5 +291,6 @@ class NewsItemMetricTestCase(TestCase):
         news_item.added_at = '2018-11-25 01:00:00+00:00'
         news_item.save()
 
+        self.refresh_daily_metrics()
         accuracy = self.newsitem_metric.get_accuracy_total(self.date_range)
         self.assertEquals(50.0, accuracy)
@@ -33,6 +33,18 @@ class SourceTestCase(TestCase):
 
         self.assertEquals(30, self.source.get_minutes_since_last_crawl())
 
+    def test_get_conditional_headers_returns_empty_dict_when_never_crawled(self):
+        self.assertEquals({}, self.source.get_conditional_headers())
+
+    def test_get_conditional_headers_returns_validators_of_last_crawl(self):
+        self.source.etag = '"abc"'
+        self.source.last_modified = 'Wed, 21 Oct 2015 07:28:00 GMT'
+
+        self.assertEquals(
+            {'If-None-Match': '"abc"', 'If-Modified-Since': 'Wed, 21 Oct 2015 07:28:00 GMT'},
+            self.source.get_conditional_headers()
+        )
+
     def test_crawling_sets_pending_to_true(self):
         self.assertEquals(False, self.source.pending)
 
@@ -0,0 +1,107 @@
+import mock
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseNotFound
+from django.test import TestCase, override_settings
+from django.test.client import RequestFactory
+
+from core import news_cache
+
+
+@override_settings(CACHES={
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+    # not the file based caches shared with the running application
+    'news': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'news'},
+    'stats': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'stats'},
+})
+class NewsCacheTestCase(TestCase):
+
+    def setUp(self):
+        news_cache.get_cache().clear()
+        news_cache.time_real = news_cache.time
+        # mock the clock, at the start of a period of the cached pages
+        news_cache.time = mock.MagicMock()
+        news_cache.time.time.return_value = 1600000020.5
+        self.factory = RequestFactory()
+        self.view = mock.MagicMock(return_value=HttpResponse('foo', content_type='text/plain'))
+        self.view.__name__ = 'view'
+        self.view_cached = news_cache.cached('foo')(self.view)
+
+    def tearDown(self):
+        news_cache.time = news_cache.time_real
+        news_cache.get_cache().clear()
+
+    def test_cached_renders_view_once_until_invalidated(self):
+        response_first = self.view_cached(self.factory.get('/'))
+        response_second = self.view_cached(self.factory.get('/'))
+
+        self.view.assert_called_once()
+        self.assertEquals(b'foo', response_second.content)
+        self.assertEquals('text/plain', response_second['Content-Type'])
+        self.assertEquals(response_first['ETag'], response_second['ETag'])
+
+        news_cache.invalidate()
+        response_third = self.view_cached(self.factory.get('/'))
+
+        self.assertEquals(2, self.view.call_count)
+        self.assertNotEquals(response_first['ETag'], response_third['ETag'])
+
+    def test_cached_returns_not_modified_when_etag_matches(self):
+        response = self.view_cached(self.factory.get('/'))
+
+        response_conditional = self.view_cached(self.factory.get('/', HTTP_IF_NONE_MATCH=response['ETag']))
+
+        self.assertEquals(304, response_conditional.status_code)
+        self.assertEquals(response['ETag'], response_conditional['ETag'])
+        self.view.assert_called_once()
+
+    def test_cached_returns_not_modified_when_not_modified_since(self):
+        response = self.view_cached(self.factory.get('/'))
+
+        response_conditional = self.view_cached(
+            self.factory.get('/', HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        )
+
+        self.assertEquals(304, response_conditional.status_code)
+
+    def test_cached_returns_page_when_invalidated_within_same_second(self):
+        # a version not older than the clock, as after another change of the same second
+        news_cache.get_cache().set(news_cache.KEY_VERSION, 1600000020 + 10, None)
+        response = self.view_cached(self.factory.get('/'))
+        news_cache.invalidate()
+
+        response_conditional = self.view_cached(
+            self.factory.get('/', HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        )
+
+        self.assertEquals(200, response_conditional.status_code)
+        self.assertNotEquals(response['Last-Modified'], response_conditional['Last-Modified'])
+
+    def test_cached_renders_view_again_after_timeout(self):
+        response = self.view_cached(self.factory.get('/'))
+        # the time since the news items were added is shown again
+        news_cache.time.time.return_value += settings.WEB_NEWS_CACHE_TIMEOUT
+
+        response_conditional = self.view_cached(self.factory.get('/', HTTP_IF_NONE_MATCH=response['ETag']))
+
+        self.assertEquals(200, response_conditional.status_code)
+        self.assertEquals(2, self.view.call_count)
+        self.assertNotEquals(response['Last-Modified'], response_conditional['Last-Modified'])
+
+    def test_cached_returns_page_when_etag_is_stale(self):
+        response = self.view_cached(self.factory.get('/'))
+        news_cache.invalidate()
+
+        response_conditional = self.view_cached(self.factory.get('/', HTTP_IF_NONE_MATCH=response['ETag']))
+
+        self.assertEquals(200, response_conditional.status_code)
+        self.assertEquals(b'foo', response_conditional.content)
+
+    def test_cached_does_not_cache_failed_responses(self):
+        self.view.return_value = HttpResponseNotFound()
+
+        self.view_cached(self.factory.get('/'))
+        response = self.view_cached(self.factory.get('/'))
+
+        self.assertEquals(404, response.status_code)
+        self.assertEquals(2, self.view.call_count)
@@ -92,6 +92,25 @@ DATABASES = {
     }
 }
 
+# Cache
+# https://docs.djangoproject.com/en/2.2/topics/cache/
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    # shared through the project directory by the app and the classifier, which invalidates it
+    'news': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.path.join(BASE_DIR, 'data/cache/news'),
+    },
+    # shared with the cron job of stats_calculate, which stores the latest statistic
+    'stats': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.path.join(BASE_DIR, 'data/cache/stats'),
+    }
+}
+
 # Password validation
 # https://docs.djangoproject.com/en/1.11/ref/settings/#auth-password-validators
 
@@ -194,12 +213,32 @@ LOGGING = {
 RSS_FEED_TITLE = 'Ojah, the positive news aggregator'
 RSS_FEED_DESCRIPTION = 'Most positive news of the internet in one feed!'
 RSS_FEED_NEWS_ITEMS_COUNT = 250
+RSS_CRAWL_CONCURRENCY = 10
+RSS_CRAWL_TIMEOUT = 30
+RSS_CRAWL_INSERT_BATCH_SIZE = 500
 RSS_CRAWL_USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/69.0.3497.100 Safari/537.36'
 SENTIMENT_POLARITY_THRESHOLD = 0.5
 AUTO_PUBLISH = True
 QUEUE_HOSTNAME = 'rabbitmq'
 QUEUE_NAME_CLASSIFY = 'classify'
 QUEUE_NAME_TRAIN = 'train'
+QUEUE_PUBLISH_BATCH_SIZE = 100
+QUEUE_REQUEUE_CHUNK_SIZE = 1000
+CLASSIFY_BATCH_SIZE = 50
+CLASSIFY_BATCH_MAX_WAIT = 2
+CLASSIFY_RESULT_CACHE_SIZE = 10000
+CLASSIFY_WORKERS = 1
+CLASSIFY_WORKERS_SUPERVISE_INTERVAL = 5
+CLASSIFY_ASYNCIO = False
 WEB_NEWS_ITEMS_COUNT = 50
+WEB_NEWS_CACHE_TIMEOUT = 60
+WEB_ADMIN_METRICS_CACHE_TIMEOUT = 60
+WEB_STATS_CACHE_TIMEOUT = 60 * 60
 SOURCE_CRAWL_STALE_MINUTES_THRESHOLD = 1
-CLASSIFIER_DUMP_FILEPATH = 'data/classifier/dump.pickle'
+STATS_NEWS_ITEMS_RECOUNT_IDS = 10000
+STATS_RETENTION_DAYS = 7
+# either 'naive_bayes' or 'textblob'
+CLASSIFIER_BACKEND = 'naive_bayes'
+CLASSIFIER_DUMP_FILEPATH = 'data/classifier/dump.bin'
+CLASSIFIER_TOKEN_CACHE_SIZE = 10000
+CLASSIFIER_TRAINING_CHUNK_SIZE = 2000
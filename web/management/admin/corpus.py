@@ -1,8 +1,11 @@
-import pika
-
 from django.conf import settings
 from django.contrib import admin
 
+from core import news_cache
+from core.messaging.publisher import publisher
+from core.messaging.train_message import TrainMessage
+from core.models.newsitem_daily_metric import NewsItemDailyMetric
+
 
 def corpus_activate(model_admin, request, query_set):
     for corpus in query_set:
@@ -15,7 +18,8 @@ def corpus_activate(model_admin, request, query_set):
         corpus.save()
 
     if query_set:
-        enqueue_train()
+        news_cache.invalidate()
+        enqueue_train([corpus.news_item_id for corpus in query_set])
 
 corpus_activate.short_description = 'Activate'
 
@@ -26,7 +30,7 @@ def corpus_deactivate(model_admin, request, query_set):
         corpus.save()
 
     if query_set:
-        enqueue_train()
+        enqueue_train([corpus.news_item_id for corpus in query_set])
 
 corpus_deactivate.short_description = 'Deactivate'
 
@@ -42,7 +46,8 @@ def corpus_convert_to_positive(model_admin, request, query_set):
             any_published = True
 
     if any_published:
-        enqueue_train()
+        news_cache.invalidate()
+        enqueue_train([corpus.news_item_id for corpus in query_set])
 
 corpus_convert_to_positive.short_description = 'Convert to positive'
 
@@ -58,21 +63,14 @@ def corpus_convert_to_negative(model_admin, request, query_set):
             any_published = True
 
     if any_published:
-        enqueue_train()
+        news_cache.invalidate()
+        enqueue_train([corpus.news_item_id for corpus in query_set])
 
 corpus_convert_to_negative.short_description = 'Convert to negative'
 
 
-def enqueue_train():
-    connection = pika.BlockingConnection(pika.ConnectionParameters(host=settings.QUEUE_HOSTNAME))
-    channel = connection.channel()
-    channel.queue_declare(queue=settings.QUEUE_NAME_TRAIN, durable=True)
-    channel.basic_publish(
-        exchange='',
-        routing_key=settings.QUEUE_NAME_TRAIN,
-        body='',
-        properties=pika.BasicProperties(delivery_mode=2)
-    )
+def enqueue_train(news_item_ids=None):
+    publisher.publish(settings.QUEUE_NAME_TRAIN, TrainMessage.encode(news_item_ids))
 
 
 class CorpusAdmin(admin.ModelAdmin):
@@ -92,3 +90,24 @@ class CorpusAdmin(admin.ModelAdmin):
         corpus_convert_to_positive,
         corpus_convert_to_negative
     ]
+
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        news_cache.invalidate()
+        NewsItemDailyMetric.refresh_news_items([obj.news_item_id])
+        enqueue_train([obj.news_item_id])
+
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        news_cache.invalidate()
+        NewsItemDailyMetric.refresh_news_items([obj.news_item_id])
+        # the classifier forgets the corpora not found any more
+        enqueue_train([obj.news_item_id])
+
+    def delete_queryset(self, request, queryset):
+        news_item_ids = list(queryset.values_list('news_item_id', flat=True))
+        super().delete_queryset(request, queryset)
+        news_cache.invalidate()
+        NewsItemDailyMetric.refresh_news_items(news_item_ids)
+        if news_item_ids:
+            enqueue_train(news_item_ids)
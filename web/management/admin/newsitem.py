@@ -1,24 +1,28 @@
 from django.contrib import admin
 from django.conf import settings
 from rangefilter.filter import DateRangeFilter
-import pika
 
+from core import news_cache
+from core.messaging.publisher import publisher
+from core.messaging.train_message import TrainMessage
 from core.models.corpus import Corpus
+from core.models.newsitem_daily_metric import NewsItemDailyMetric
 
 
 def news_item_publish(model_admin, request, query_set):
-    for news_item in query_set:
-        news_item.published = True
-        news_item.save()
+    set_published(query_set, True)
+    # the classifier is trained with the unpublished positive news items as neutral
+    if query_set:
+        enqueue_corpus_creation([news_item.id for news_item in query_set])
 
 
 news_item_publish.short_description = 'Publish'
 
 
 def news_item_unpublish(model_admin, request, query_set):
-    for news_item in query_set:
-        news_item.published = False
-        news_item.save()
+    set_published(query_set, False)
+    if query_set:
+        enqueue_corpus_creation([news_item.id for news_item in query_set])
 
 
 news_item_unpublish.short_description = 'Unpublish'
@@ -32,7 +36,9 @@ def corpus_create_positive(model_admin, request, query_set):
         corpus.save()
 
     if query_set:
-        enqueue_corpus_creation()
+        news_cache.invalidate()
+        NewsItemDailyMetric.refresh_news_items([news_item.id for news_item in query_set])
+        enqueue_corpus_creation([news_item.id for news_item in query_set])
 
 
 corpus_create_positive.short_description = 'Corpus - Create positive'
@@ -46,15 +52,18 @@ def corpus_create_negative(model_admin, request, query_set):
         corpus.save()
 
     if query_set:
-        enqueue_corpus_creation()
+        news_cache.invalidate()
+        NewsItemDailyMetric.refresh_news_items([news_item.id for news_item in query_set])
+        enqueue_corpus_creation([news_item.id for news_item in query_set])
 
 
 corpus_create_negative.short_description = 'Corpus - Create negative'
 
 
 def news_item_publish_and_corpus_create_positive(model_admin, request, query_set):
+    # the news items are trained once, with their corpora
+    set_published(query_set, True)
     corpus_create_positive(model_admin, request, query_set)
-    news_item_publish(model_admin, request, query_set)
 
 
 news_item_publish_and_corpus_create_positive.short_description = '''
@@ -63,8 +72,8 @@ Publish and create positive Corpus
 
 
 def news_item_unpublish_and_corpus_create_negative(model_admin, request, query_set):
+    set_published(query_set, False)
     corpus_create_negative(model_admin, request, query_set)
-    news_item_unpublish(model_admin, request, query_set)
 
 
 news_item_unpublish_and_corpus_create_negative.short_description = '''
@@ -72,16 +81,16 @@ Unpublish and create negative Corpus
 '''
 
 
-def enqueue_corpus_creation():
-    connection = pika.BlockingConnection(pika.ConnectionParameters(host=settings.QUEUE_HOSTNAME))
-    channel = connection.channel()
-    channel.queue_declare(queue=settings.QUEUE_NAME_TRAIN, durable=True)
-    channel.basic_publish(
-        exchange='',
-        routing_key=settings.QUEUE_NAME_TRAIN,
-        body='',
-        properties=pika.BasicProperties(delivery_mode=2)
-    )
+def set_published(query_set, published):
+    for news_item in query_set:
+        news_item.published = published
+        news_item.save()
+
+    news_cache.invalidate()
+
+
+def enqueue_corpus_creation(news_item_ids=None):
+    publisher.publish(settings.QUEUE_NAME_TRAIN, TrainMessage.encode(news_item_ids))
 
 
 class NewsItemAdmin(admin.ModelAdmin):
@@ -97,3 +106,25 @@ class NewsItemAdmin(admin.ModelAdmin):
         news_item_publish_and_corpus_create_positive,
         news_item_unpublish_and_corpus_create_negative
     ]
+
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        news_cache.invalidate()
+        NewsItemDailyMetric.refresh_news_items([obj.id])
+        enqueue_corpus_creation([obj.id])
+
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        news_cache.invalidate()
+        NewsItemDailyMetric.refresh([NewsItemDailyMetric.get_date(obj.added_at)])
+        # the classifier forgets the news items not found any more
+        enqueue_corpus_creation([obj.id])
+
+    def delete_queryset(self, request, queryset):
+        # the days are found before their news items are deleted
+        news_items = list(queryset.values_list('id', 'added_at'))
+        super().delete_queryset(request, queryset)
+        news_cache.invalidate()
+        NewsItemDailyMetric.refresh([NewsItemDailyMetric.get_date(added_at) for _, added_at in news_items])
+        if news_items:
+            enqueue_corpus_creation([news_item_id for news_item_id, _ in news_items])
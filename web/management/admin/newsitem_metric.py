@@ -3,6 +3,9 @@ from datetime import datetime
 
 from django.contrib import admin
 from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Q
+from django.utils.http import urlencode
 
 from core.models.newsitem import NewsItem
 from core.models.newsitem_metric import NewsItemMetric
@@ -54,6 +57,38 @@ class NewsItemMetricAdmin(admin.ModelAdmin):
             )
         }
 
+    @staticmethod
+    def get_cache_key(params):
+        return 'newsitem_metric:{}'.format(urlencode(sorted(params.items())))
+
+    def get_metrics(self, params):
+        # editors keep the page open, so the counts of a filter are reused for a short while
+        key = self.get_cache_key(params)
+        metrics = cache.get(key)
+        if metrics is not None:
+            return metrics
+
+        # count the news items as initially scored, in a single query
+        news_items_count = NewsItem.objects.filter(**params).aggregate(
+            total_count=Count('id'),
+            positive_count=Count('id', filter=Q(score__gte=settings.SENTIMENT_POLARITY_THRESHOLD)),
+            negative_count=Count('id', filter=Q(score__lt=settings.SENTIMENT_POLARITY_THRESHOLD))
+        )
+
+        # count the active corpora, in a single query
+        corpus_count = Corpus.objects.filter(active=True, **params).aggregate(
+            positive_count=Count('id', filter=Q(positive=True)),
+            negative_count=Count('id', filter=Q(positive=False))
+        )
+
+        metrics = {
+            'news_items_count': news_items_count,
+            'corpus_count': corpus_count,
+            'accuracy': NewsItemMetric().get_accuracy(self.get_date_range(params))
+        }
+        cache.set(key, metrics, settings.WEB_ADMIN_METRICS_CACHE_TIMEOUT)
+        return metrics
+
     def changelist_view(self, request, extra_context=None):
         response = super().changelist_view(
             request,
@@ -62,17 +97,11 @@ class NewsItemMetricAdmin(admin.ModelAdmin):
 
         # get url query parameters
         params = self.get_request_params(request)
+        metrics = self.get_metrics(params)
 
-        # query for the news items as initially scored
-        params_positive = dict(params)
-        params_positive['score__gte'] = settings.SENTIMENT_POLARITY_THRESHOLD
-        news_items_count_positive = NewsItem.objects.filter(**params_positive).count()
-        params_negative = dict(params)
-        params_negative['score__lt'] = settings.SENTIMENT_POLARITY_THRESHOLD
-        news_items_count_negative = NewsItem.objects.filter(**params_negative).count()
-
-        # query for all news items and calculate possible unclassified
-        news_items_count = NewsItem.objects.filter(**params).count()
+        news_items_count = metrics['news_items_count']['total_count']
+        news_items_count_positive = metrics['news_items_count']['positive_count']
+        news_items_count_negative = metrics['news_items_count']['negative_count']
         response.context_data['news_items_count'] = news_items_count
 
         news_items_count_unclassified = (
@@ -85,13 +114,8 @@ class NewsItemMetricAdmin(admin.ModelAdmin):
             'negative': news_items_count_negative,
         }
 
-        # query for corpora
-        params_corpus = dict(params)
-        params_corpus['positive'] = True
-        params_corpus['active'] = True
-        corpus_count_positive = Corpus.objects.filter(**params_corpus).count()
-        params_corpus['positive'] = False
-        corpus_count_negative = Corpus.objects.filter(**params_corpus).count()
+        corpus_count_positive = metrics['corpus_count']['positive_count']
+        corpus_count_negative = metrics['corpus_count']['negative_count']
         response.context_data['corpus_count'] = {
             'positive': corpus_count_positive,
             'negative': corpus_count_negative
@@ -107,8 +131,7 @@ class NewsItemMetricAdmin(admin.ModelAdmin):
             ),
         }
 
-        # calculate accuracy over time
-        date_range = self.get_date_range(params)
-        response.context_data['accuracy'] = NewsItemMetric().get_accuracy(date_range)
+        # accuracy over time
+        response.context_data['accuracy'] = metrics['accuracy']
 
         return response
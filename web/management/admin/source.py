@@ -1,6 +1,41 @@
+from django.conf import settings
 from django.contrib import admin
 
+from core import news_cache
+from core.messaging.publisher import publisher
+from core.messaging.train_message import TrainMessage
+from core.models.newsitem import NewsItem
+from core.models.newsitem_daily_metric import NewsItemDailyMetric
+
+
+def enqueue_train(news_item_ids=None):
+    publisher.publish(settings.QUEUE_NAME_TRAIN, TrainMessage.encode(news_item_ids))
+
 
 class SourceAdmin(admin.ModelAdmin):
     list_display = ('name', 'last_crawl')
     ordering = ['-last_crawl']
+
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        # the news pages show the name and homepage of the sources
+        news_cache.invalidate()
+
+    def delete_model(self, request, obj):
+        news_items = list(NewsItem.objects.filter(source=obj).values_list('id', 'added_at'))
+        super().delete_model(request, obj)
+        self.deleted_news_items(news_items)
+
+    def delete_queryset(self, request, queryset):
+        # the news items of the sources are found before the sources are deleted
+        news_items = list(NewsItem.objects.filter(source__in=queryset).values_list('id', 'added_at'))
+        super().delete_queryset(request, queryset)
+        self.deleted_news_items(news_items)
+
+    @staticmethod
+    def deleted_news_items(news_items):
+        news_cache.invalidate()
+        if news_items:
+            NewsItemDailyMetric.refresh([NewsItemDailyMetric.get_date(added_at) for _, added_at in news_items])
+            # the classifier forgets the news items not found any more
+            enqueue_train([news_item_id for news_item_id, _ in news_items])
@@ -1,5 +1,7 @@
 from django.test import TestCase
 from django.contrib.admin.sites import AdminSite
+import mock
+from web.management.admin import corpus
 from web.management.admin.corpus import CorpusAdmin
 from core.models.corpus import Corpus
 from core.models.newsitem import NewsItem
@@ -7,6 +9,31 @@ from core.models.newsitem import NewsItem
 
 class CorpusAdminTestCase(TestCase):
 
+    def setUp(self):
+        self.corpus = corpus
+        self.corpus.enqueue_train_real = self.corpus.enqueue_train
+        self.corpus.enqueue_train = mock.MagicMock()
+        self.corpus.news_cache_real = self.corpus.news_cache
+        # mock the cache of the news pages
+        self.corpus.news_cache = mock.MagicMock()
+
+        self.admin = CorpusAdmin(Corpus, AdminSite())
+
+    def tearDown(self):
+        self.corpus.enqueue_train = self.corpus.enqueue_train_real
+        self.corpus.news_cache = self.corpus.news_cache_real
+
+    def create_corpus(self, positive):
+        news_item = NewsItem()
+        news_item.title = 'foo'
+        news_item.save()
+
+        corpus = Corpus()
+        corpus.news_item = news_item
+        corpus.positive = positive
+        corpus.save()
+        return corpus
+
     def test_get_newsitem_title_returns_title_when_news_item_is_not_none(self):
         news_item = NewsItem()
         news_item.title = 'foo'
@@ -15,3 +42,39 @@ class CorpusAdminTestCase(TestCase):
 
         admin = CorpusAdmin(Corpus, AdminSite())
         self.assertEquals('foo', admin.get_news_item_title(corpus))
+
+    def test_save_model_enqueues_news_item_to_train_classifier(self):
+        corpus = self.create_corpus(True)
+        corpus.positive = False
+
+        self.admin.save_model(None, corpus, None, True)
+
+        self.assertEquals(False, Corpus.objects.get(id=corpus.id).positive)
+        self.corpus.news_cache.invalidate.assert_called_once()
+        self.corpus.enqueue_train.assert_called_once_with([corpus.news_item_id])
+
+    def test_delete_model_enqueues_news_item_to_train_classifier(self):
+        corpus = self.create_corpus(True)
+
+        self.admin.delete_model(None, corpus)
+
+        self.assertEquals(0, Corpus.objects.count())
+        self.corpus.enqueue_train.assert_called_once_with([corpus.news_item_id])
+
+    def test_delete_queryset_enqueues_news_items_to_train_classifier(self):
+        corpus_positive = self.create_corpus(True)
+        corpus_negative = self.create_corpus(False)
+
+        self.admin.delete_queryset(None, Corpus.objects.all())
+
+        self.assertEquals(0, Corpus.objects.count())
+        self.corpus.enqueue_train.assert_called_once()
+        self.assertCountEqual(
+            [corpus_positive.news_item_id, corpus_negative.news_item_id],
+            self.corpus.enqueue_train.call_args[0][0]
+        )
+
+    def test_delete_queryset_does_not_enqueue_when_no_corpora_in_query_set(self):
+        self.admin.delete_queryset(None, Corpus.objects.none())
+
+        self.corpus.enqueue_train.assert_not_called()
@@ -2,6 +2,7 @@ from django.conf import settings
 from django.test import TestCase
 import mock
 from web.management.admin import newsitem
+from core.messaging.train_message import TrainMessage
 from core.models.corpus import Corpus
 from core.models.newsitem import NewsItem
 
@@ -13,19 +14,18 @@ class NewsItemAdminTestCase(TestCase):
         self.newsitem.enqueue_corpus_creation_real = self.newsitem.enqueue_corpus_creation
         self.newsitem.enqueue_corpus_creation = mock.MagicMock()
 
-        self.newsitem.pika_real = self.newsitem.pika
-        # mock pika.BlockingConnection
-        self.connection = mock.MagicMock()
-        self.newsitem.pika.BlockingConnection = mock.MagicMock(return_value=self.connection)
-        # mock pika.BlockingConnection.channel
-        self.channel = mock.MagicMock()
-        self.connection.channel = mock.MagicMock(return_value=self.channel)
-        # mock ConnectionParameters
-        self.newsitem.pika.ConnectionParameters = mock.MagicMock()
+        self.newsitem.publisher_real = self.newsitem.publisher
+        self.newsitem.news_cache_real = self.newsitem.news_cache
+        # mock the cache of the news pages
+        self.newsitem.news_cache = mock.MagicMock()
+        # mock the publisher to the queue
+        self.publisher = mock.MagicMock()
+        self.newsitem.publisher = self.publisher
 
     def tearDown(self):
         self.newsitem.enqueue_corpus_creation = self.newsitem.enqueue_corpus_creation_real
-        self.newsitem.pika = self.newsitem.pika_real
+        self.newsitem.publisher = self.newsitem.publisher_real
+        self.newsitem.news_cache = self.newsitem.news_cache_real
 
     def test_news_item_publish_throws_no_error_when_no_newsitems_in_query_set(self):
         query_set = []
@@ -51,6 +51,10 @@ class NewsItemAdminTestCase(TestCase):
         news_items = NewsItem.objects.all()
         self.assertEquals(1, len(news_items))
         self.assertEquals(True, news_items[0].published)
+        # the cached news pages are rendered again
+        self.newsitem.news_cache.invalidate.assert_called_once()
+        # the classifier learns the news item is not neutral any more
+        self.newsitem.enqueue_corpus_creation.assert_called_once_with([news_items[0].id])
 
     def test_news_item_unpublish_throws_no_error_when_no_newsitems_in_query_set(self):
         query_set = []
@@ -76,6 +80,7 @@ class NewsItemAdminTestCase(TestCase):
         news_items = NewsItem.objects.all()
         self.assertEquals(1, len(news_items))
         self.assertEquals(False, news_items[0].published)
+        self.newsitem.enqueue_corpus_creation.assert_called_once_with([news_items[0].id])
 
     def test_corpus_create_positive_throws_no_error_when_no_newsitems_in_query_set(self):
         query_set = []
@@ -102,7 +107,8 @@ class NewsItemAdminTestCase(TestCase):
 
         self.newsitem.corpus_create_positive(None, None, query_set)
 
-        self.newsitem.enqueue_corpus_creation.assert_called_once()
+        # only the news item of the new corpus has to be learnt
+        self.newsitem.enqueue_corpus_creation.assert_called_once_with([news_item.id])
         corpora = Corpus.objects.all()
         self.assertEquals(1, len(corpora))
         self.assertEquals(True, corpora[0].positive)
@@ -208,8 +214,12 @@ class NewsItemAdminTestCase(TestCase):
         self.newsitem.enqueue_corpus_creation = self.newsitem.enqueue_corpus_creation_real
         self.newsitem.enqueue_corpus_creation()
 
-        self.newsitem.pika.BlockingConnection.assert_called_once()
-        self.newsitem.pika.ConnectionParameters.assert_called_once()
-        self.connection.channel.assert_called_once()
-        self.channel.queue_declare.assert_called_once_with(queue=settings.QUEUE_NAME_TRAIN, durable=True)
-        self.channel.basic_publish.assert_called_once()
+        self.publisher.publish.assert_called_once_with(settings.QUEUE_NAME_TRAIN, TrainMessage.encode())
+        # the connection is kept open for the next actions
+        self.publisher.close.assert_not_called()
+
+    def test_enqueue_corpus_creation_enqueues_news_item_ids_to_queue(self):
+        self.newsitem.enqueue_corpus_creation = self.newsitem.enqueue_corpus_creation_real
+        self.newsitem.enqueue_corpus_creation([2, 1])
+
+        self.publisher.publish.assert_called_once_with(settings.QUEUE_NAME_TRAIN, TrainMessage.encode([1, 2]))
@@ -5,10 +5,12 @@ from django.test.client import RequestFactory
 from django.contrib.admin.options import ModelAdmin
 from django.contrib.admin.sites import AdminSite
 from django.contrib.auth.models import User
+from django.core.cache import cache
 from django.core.handlers.wsgi import WSGIRequest
 from web.management.admin.newsitem_metric import NewsItemMetricAdmin
 from core.models.corpus import Corpus
 from core.models.newsitem import NewsItem
+from core.models.newsitem_daily_metric import NewsItemDailyMetric
 from core.models.newsitem_metric import NewsItemMetric
 
 
@@ -19,6 +21,14 @@ class NewsItemMetricAdminTestCase(TestCase):
 
     def setUp(self):
         self.admin = NewsItemMetricAdmin(NewsItemMetric, AdminSite())
+        cache.clear()
+
+    def tearDown(self):
+        cache.clear()
+
+    @staticmethod
+    def refresh_daily_metrics():
+        NewsItemDailyMetric.refresh_news_items(NewsItem.objects.values_list('id', flat=True))
 
     def create_superuser(self, username):
         return User.objects.create_superuser(username=username, email='foo@bar.baz', password='qwerty')
@@ -99,6 +109,7 @@ class NewsItemMetricAdminTestCase(TestCase):
     def test_changelist_view_returns_zero_metrics_when_no_newsitems_and_no_corpora_exist(self):
         superuser = self.create_superuser('superuser')
         request = self.mocked_authenticated_request('/admin/rss/newsitemmetric/', superuser)
+        self.refresh_daily_metrics()
         response = self.admin.changelist_view(request)
 
         self.assertEquals(0, response.context_data['news_items_count'])
@@ -120,6 +131,7 @@ class NewsItemMetricAdminTestCase(TestCase):
 
         superuser = self.create_superuser('superuser')
         request = self.mocked_authenticated_request('/admin/rss/newsitemmetric/', superuser)
+        self.refresh_daily_metrics()
         response = self.admin.changelist_view(request)
 
         self.assertEquals(1, response.context_data['news_items_count'])
@@ -147,6 +159,7 @@ class NewsItemMetricAdminTestCase(TestCase):
 
         superuser = self.create_superuser('superuser')
         request = self.mocked_authenticated_request('/admin/rss/newsitemmetric/', superuser)
+        self.refresh_daily_metrics()
         response = self.admin.changelist_view(request)
 
         self.assertEquals(2, response.context_data['news_items_count'])
@@ -168,6 +181,7 @@ class NewsItemMetricAdminTestCase(TestCase):
 
         superuser = self.create_superuser('superuser')
         request = self.mocked_authenticated_request('/admin/rss/newsitemmetric/?added_at__month=11&added_at__year=2018', superuser)
+        self.refresh_daily_metrics()
         response = self.admin.changelist_view(request)
 
         self.assertEquals(0, response.context_data['news_items_count'])
@@ -189,6 +203,7 @@ class NewsItemMetricAdminTestCase(TestCase):
 
         superuser = self.create_superuser('superuser')
         request = self.mocked_authenticated_request('/admin/rss/newsitemmetric/?added_at__month=12&added_at__year=2018', superuser)
+        self.refresh_daily_metrics()
         response = self.admin.changelist_view(request)
 
         self.assertEquals(1, response.context_data['news_items_count'])
@@ -215,6 +230,7 @@ class NewsItemMetricAdminTestCase(TestCase):
 
         superuser = self.create_superuser('superuser')
         request = self.mocked_authenticated_request('/admin/rss/newsitemmetric/', superuser)
+        self.refresh_daily_metrics()
         response = self.admin.changelist_view(request)
 
         self.assertEquals(1, response.context_data['news_items_count'])
@@ -241,6 +257,7 @@ class NewsItemMetricAdminTestCase(TestCase):
 
         superuser = self.create_superuser('superuser')
         request = self.mocked_authenticated_request('/admin/rss/newsitemmetric/', superuser)
+        self.refresh_daily_metrics()
         response = self.admin.changelist_view(request)
 
         self.assertEquals(1, response.context_data['news_items_count'])
@@ -273,6 +290,7 @@ class NewsItemMetricAdminTestCase(TestCase):
 
         superuser = self.create_superuser('superuser')
         request = self.mocked_authenticated_request('/admin/rss/newsitemmetric/', superuser)
+        self.refresh_daily_metrics()
         response = self.admin.changelist_view(request)
 
         self.assertEquals(2, response.context_data['news_items_count'])
@@ -305,6 +323,7 @@ class NewsItemMetricAdminTestCase(TestCase):
 
         superuser = self.create_superuser('superuser')
         request = self.mocked_authenticated_request('/admin/rss/newsitemmetric/', superuser)
+        self.refresh_daily_metrics()
         response = self.admin.changelist_view(request)
 
         self.assertEquals(2, response.context_data['news_items_count'])
@@ -316,3 +335,27 @@ class NewsItemMetricAdminTestCase(TestCase):
         self.assertEquals(0, response.context_data['corpus_count']['positive'])
         self.assertEquals(1, response.context_data['corpus_count']['negative'])
         self.assertEquals([{'accuracy': 50, 'added_at': '2018-12-03'}], response.context_data['accuracy'])
+
+    def test_changelist_view_counts_each_model_in_one_query_and_reuses_counts_of_same_filter(self):
+        news_item = NewsItem()
+        news_item.title = 'foo'
+        news_item.score = 1
+        news_item.added_at = '2018-12-03 21:00:00+00:00'
+        news_item.save()
+
+        superuser = self.create_superuser('superuser')
+        request = self.mocked_authenticated_request('/admin/rss/newsitemmetric/?added_at__year=2018&added_at__month=12', superuser)
+        self.refresh_daily_metrics()
+
+        # the news items, the corpora and the daily metrics
+        with self.assertNumQueries(3):
+            self.admin.get_metrics(self.admin.get_request_params(request))
+
+        # the method being tested
+        response = self.admin.changelist_view(request)
+
+        self.assertEquals(1, response.context_data['news_items_count'])
+        self.assertEquals(1, response.context_data['classification_initial']['positive'])
+        self.assertEquals([{'accuracy': 100.0, 'added_at': '2018-12-03'}], response.context_data['accuracy'])
+        with self.assertNumQueries(0):
+            self.admin.get_metrics({'added_at__year': '2018', 'added_at__month': '12'})
@@ -0,0 +1,89 @@
+import datetime
+
+from django.contrib.admin.sites import AdminSite
+from django.test import TestCase
+from django.utils import timezone
+import mock
+from web.management.admin import source
+from web.management.admin.source import SourceAdmin
+from core.models.newsitem import NewsItem
+from core.models.source import Source
+
+
+class SourceAdminTestCase(TestCase):
+
+    def setUp(self):
+        self.source = source
+        self.source.enqueue_train_real = self.source.enqueue_train
+        self.source.enqueue_train = mock.MagicMock()
+        self.source.news_cache_real = self.source.news_cache
+        # mock the cache of the news pages
+        self.source.news_cache = mock.MagicMock()
+        self.source.NewsItemDailyMetric_real = self.source.NewsItemDailyMetric
+        self.source.NewsItemDailyMetric = mock.MagicMock()
+
+        self.admin = SourceAdmin(Source, AdminSite())
+
+    def tearDown(self):
+        self.source.enqueue_train = self.source.enqueue_train_real
+        self.source.news_cache = self.source.news_cache_real
+        self.source.NewsItemDailyMetric = self.source.NewsItemDailyMetric_real
+
+    def create_source(self, name):
+        source = Source()
+        source.name = name
+        source.save()
+        return source
+
+    def create_news_item(self, source):
+        news_item = NewsItem()
+        news_item.title = 'foo'
+        news_item.source = source
+        news_item.added_at = timezone.make_aware(datetime.datetime(2020, 5, 1, 12))
+        news_item.save()
+        return news_item
+
+    def test_save_model_invalidates_news_pages(self):
+        source = Source()
+        source.name = 'foo'
+
+        self.admin.save_model(None, source, None, False)
+
+        self.source.news_cache.invalidate.assert_called_once()
+        self.source.enqueue_train.assert_not_called()
+
+    def test_delete_model_invalidates_news_pages_when_source_has_no_news_items(self):
+        source = self.create_source('foo')
+
+        self.admin.delete_model(None, source)
+
+        self.assertEquals(0, Source.objects.count())
+        self.source.news_cache.invalidate.assert_called_once()
+        self.source.enqueue_train.assert_not_called()
+
+    def test_delete_model_enqueues_news_items_of_source(self):
+        source = self.create_source('foo')
+        news_item = self.create_news_item(source)
+        self.create_news_item(self.create_source('bar'))
+
+        self.admin.delete_model(None, source)
+        # as the database deletes the news items with their source
+        NewsItem.objects.filter(id=news_item.id).delete()
+
+        self.source.news_cache.invalidate.assert_called_once()
+        self.source.NewsItemDailyMetric.refresh.assert_called_once()
+        self.source.enqueue_train.assert_called_once_with([news_item.id])
+
+    def test_delete_queryset_enqueues_news_items_of_sources(self):
+        source_foo = self.create_source('foo')
+        source_bar = self.create_source('bar')
+        news_item_foo = self.create_news_item(source_foo)
+        news_item_bar = self.create_news_item(source_bar)
+
+        self.admin.delete_queryset(None, Source.objects.filter(id__in=[source_foo.id, source_bar.id]))
+        NewsItem.objects.all().delete()
+
+        self.assertEquals(0, Source.objects.count())
+        self.source.news_cache.invalidate.assert_called_once()
+        self.source.enqueue_train.assert_called_once()
+        self.assertCountEqual([news_item_foo.id, news_item_bar.id], self.source.enqueue_train.call_args[0][0])
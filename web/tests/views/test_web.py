@@ -1,12 +1,38 @@
+import datetime
+import mock
+
+from django.core.cache import caches
 from django.http.response import HttpResponse
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from django.test.client import RequestFactory
+from django.utils import timezone
+from core import news_cache
 from core.models.newsitem import NewsItem
 from core.models.source import Source
+from core.models.statistic import Statistic
 
 
+@override_settings(CACHES={
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+    # not the file based caches shared with the running application
+    'news': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'news'},
+    'stats': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'stats'},
+})
 class WebTestCase(TestCase):
 
+    def setUp(self):
+        news_cache.get_cache().clear()
+        caches['stats'].clear()
+        news_cache.time_real = news_cache.time
+        # mock the clock, so the cached pages are not rendered again within a test
+        news_cache.time = mock.MagicMock()
+        news_cache.time.time.return_value = 1600000020.5
+
+    def tearDown(self):
+        news_cache.time = news_cache.time_real
+        news_cache.get_cache().clear()
+        caches['stats'].clear()
+
     def get_news(self):
         headers = { 'user_agent': 'test-browser' }
         response = self.client.get('/web/', **headers)
@@ -73,6 +99,68 @@ class WebTestCase(TestCase):
         content = response.getvalue()
         self.assertTrue('news-item' in str(content))
 
+    def test_news_returns_cached_page_until_published_newsitems_change(self):
+        self.get_news()
+
+        news_item = NewsItem()
+        news_item.title = 'foo'
+        news_item.score = 1
+        news_item.published = True
+        news_item.save()
+
+        # the page cached before the news item was published, without querying the database
+        with self.assertNumQueries(0):
+            response = self.get_news()
+        self.assertFalse('news-item' in str(response.getvalue()))
+
+        news_cache.invalidate()
+        response = self.get_news()
+        self.assertTrue('news-item' in str(response.getvalue()))
+
+    def test_news_returns_not_modified_when_etag_matches(self):
+        response = self.get_news()
+
+        response = self.client.get('/web/', HTTP_IF_NONE_MATCH=response['ETag'])
+
+        self.assertEquals(304, response.status_code)
+
+    def test_rss_returns_not_modified_when_etag_matches(self):
+        response = self.client.get('/rss/')
+        self.assertEquals(200, response.status_code)
+
+        with self.assertNumQueries(0):
+            response = self.client.get('/rss/', HTTP_IF_NONE_MATCH=response['ETag'])
+
+        self.assertEquals(304, response.status_code)
+
+    def create_positive_news_items(self, count):
+        for index in range(count):
+            source = Source()
+            source.name = 'source {}'.format(index)
+            source.save()
+
+            news_item = NewsItem()
+            news_item.title = 'foo {}'.format(index)
+            news_item.source = source
+            news_item.score = 1
+            news_item.published = True
+            news_item.save()
+
+    def test_news_queries_sources_with_newsitems(self):
+        self.create_positive_news_items(5)
+
+        # a single query, whatever the number of news items and sources
+        with self.assertNumQueries(1):
+            response = self.get_news()
+        self.assertTrue('source 4' in str(response.getvalue()))
+
+    def test_rss_queries_sources_with_newsitems(self):
+        self.create_positive_news_items(5)
+
+        with self.assertNumQueries(1):
+            response = self.client.get('/rss/')
+        self.assertTrue('foo 4' in str(response.getvalue()))
+
     def test_about_returns_http_response_with_stats(self):
         # create a news item
         news_item = NewsItem()
@@ -96,6 +184,14 @@ class WebTestCase(TestCase):
         source.active = False
         source.save()
 
+        # the stats as pre-calculated by stats_calculate
+        statistic = Statistic()
+        statistic.accuracy_total = 100
+        statistic.news_items_count = 1
+        statistic.corpora_count = 0
+        statistic.sources_count = 1
+        statistic.save()
+
         # make request to news view
         response = self.get_about()
 
@@ -111,3 +207,38 @@ class WebTestCase(TestCase):
         self.assertTrue('News classified</strong>: 1' in str(content))
         self.assertTrue('Corpora created</strong>: 0' in str(content))
         self.assertTrue('Classification accuracy</strong>: 100%' in str(content))
+
+    def test_about_returns_http_response_without_stats_when_no_stats_exist(self):
+        # make request to about view
+        response = self.get_about()
+
+        self.assertEquals(200, response.status_code)
+        self.assertTrue('Sources crawled</strong>: None' in str(response.getvalue()))
+
+    def test_about_returns_newest_stats_and_reuses_them(self):
+        statistic = Statistic()
+        statistic.sources_count = 1
+        statistic.created_at = timezone.now() - datetime.timedelta(days=2)
+        statistic.save()
+        statistic = Statistic()
+        statistic.sources_count = 2
+        statistic.created_at = timezone.now() - datetime.timedelta(days=1)
+        statistic.save()
+
+        with self.assertNumQueries(1):
+            self.get_about()
+        with self.assertNumQueries(0):
+            response = self.get_about()
+
+        self.assertTrue('Sources crawled</strong>: 2' in str(response.getvalue()))
+
+    def test_about_returns_stats_stored_by_stats_calculate_without_queries(self):
+        statistic = Statistic()
+        statistic.sources_count = 3
+        statistic.save()
+        Statistic.set_latest(statistic)
+
+        with self.assertNumQueries(0):
+            response = self.get_about()
+
+        self.assertTrue('Sources crawled</strong>: 3' in str(response.getvalue()))
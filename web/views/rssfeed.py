@@ -1,7 +1,9 @@
 from django.urls import reverse_lazy
 from django.conf import settings
 from django.contrib.syndication.views import Feed
+from django.utils.decorators import method_decorator
 from django.utils.feedgenerator import Rss201rev2Feed
+from core import news_cache
 from core.models.newsitem import NewsItem
 
 
@@ -12,6 +14,10 @@ class RssFeed(Feed):
     description = settings.RSS_FEED_DESCRIPTION
     link = reverse_lazy('web:feed')
 
+    @method_decorator(news_cache.cached('rss'))
+    def __call__(self, request, *args, **kwargs):
+        return super().__call__(request, *args, **kwargs)
+
     @staticmethod
     def items():
         return NewsItem.find_positive(
@@ -1,13 +1,13 @@
-from datetime import datetime
-
 from django.conf import settings
 from django.http import HttpResponse
 from django.template import loader
 
+from core import news_cache
 from core.models.newsitem import NewsItem
 from core.models.statistic import Statistic
 
 
+@news_cache.cached('web')
 def news(request):
     template = loader.get_template('web/news.html')
 
@@ -26,21 +26,21 @@ def news(request):
 def about(request):
     template = loader.get_template('web/about.html')
 
-    now = datetime.now()
-    today_midnight = '{}-{:02d}-{:02d} 00:00:00'.format(now.year, int(now.month), int(now.day))
-    # get the latest of the created statistics for today
-    statistics = Statistic.objects.filter(created_at__gte=today_midnight).order_by('-created_at')
+    statistic = Statistic.get_latest()
+    if statistic is None:
+        # stats_calculate has not run yet
+        statistic = Statistic(created_at=None)
 
-    accuracy_total = '{}%'.format(statistics[0].accuracy_total) if statistics[0].accuracy_total else None
+    accuracy_total = '{}%'.format(statistic.accuracy_total) if statistic.accuracy_total else None
 
     context = {
         'accuracy_total': accuracy_total,
-        'news_items_count': statistics[0].news_items_count,
-        'pending_classify_count': statistics[0].pending_classify_count,
-        'news_items_not_scored_count': statistics[0].news_items_not_scored_count,
-        'corpora_count': statistics[0].corpora_count,
-        'sources_count': statistics[0].sources_count,
-        'created_at': statistics[0].created_at
+        'news_items_count': statistic.news_items_count,
+        'pending_classify_count': statistic.pending_classify_count,
+        'news_items_not_scored_count': statistic.news_items_not_scored_count,
+        'corpora_count': statistic.corpora_count,
+        'sources_count': statistic.sources_count,
+        'created_at': statistic.created_at
     }
 
     return HttpResponse(template.render(context))